@@ -1,10 +1,22 @@
 from flask import Flask
 from app.routes.routes import main
+from app.models import db_pool
+from app.utils import config, metrics
 
-app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
-app.secret_key = 'sua-chave-secreta-aqui'  # Necessário para sessões e flash
 
-app.register_blueprint(main)
+def create_app():
+    """App Flask configurado pelo ambiente (ver app/utils/config.py)"""
+    app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
+    config.configurar(app)  # SECRET_KEY e cookie de sessão vêm do .env
+
+    db_pool.init_app(app)
+    metrics.init_app(app)
+    app.register_blueprint(main)
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Servidor de desenvolvimento; em produção: gunicorn -c gunicorn.conf.py wsgi:app
+    app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,13 +1,36 @@
 """Controllers - Camada de lógica de negócio"""
 
 from app.models.models import (
-    Usuario, 
+    Usuario,
+    DatabaseUnavailableError,
     buscar_tarefas_por_usuario,
-    registrar_ponto as model_registrar_ponto,
-    registrar_auditoria
+    contar_tarefas_por_usuario,
+    buscar_tarefas_periodo,
+    listar_historico_ponto,
+    contar_pontos_usuario,
+    registrar_entrada,
+    sincronizar_pontos,
+    registrar_auditoria,
+    iterar_tarefas_periodo,
+    COLUNAS_RELATORIO_TAREFAS
 )
+from app.utils import face_matching, export_stream
+from app.utils.pagination import Keyset, InvalidCursorError, page_size
+from app.utils.ttl_cache import TTLCache
+from app.models import resumos
+from app.utils.face_gallery import face_gallery
+from app.utils.face_executor import face_executor, FaceExecutorError
 from datetime import datetime
 import json
+import os
+
+# Ordenação das listagens paginadas (a última coluna desempata)
+KEYSET_USUARIOS = Keyset('usuarios', 'nome', 'id', descending=False)
+KEYSET_TAREFAS = Keyset('tarefas', 't.data_criacao', 't.id')
+KEYSET_PONTO = Keyset('ponto', 'data', 'id')
+
+# Registros aceitos por chamada da sincronização de ponto
+PONTO_SYNC_MAX = int(os.getenv('PONTO_SYNC_MAX', 500))
 
 
 class UsuarioController:
@@ -35,45 +58,178 @@ class UsuarioController:
         }
     
     @staticmethod
-    def criar_usuario(nome, email, senha, cargo, departamento, status='ATIVO', rosto=None):
-        """Cria um novo usuário com validações"""
-        # Validações
+    def obter_id_por_email(email):
+        """Id do usuário cadastrado com o e-mail (None se não houver), guardado na sessão do login"""
+        try:
+            usuario = Usuario.buscar_por_email(email, ('id',))
+            return {'success': True, 'id': usuario.id if usuario else None}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao buscar usuário: {str(e)}'}
+    
+    @staticmethod
+    def validar_dados(nome, email, senha, cargo, departamento, status='ATIVO'):
+        """
+        Regras de cadastro de usuário (formulário e importação em lote)
+        
+        Returns:
+            str: mensagem do primeiro erro encontrado, ou None se os dados são válidos
+        """
         if not all([nome, email, senha, cargo, departamento, status]):
-            return {'success': False, 'message': 'Preencha todos os campos obrigatórios.'}
+            return 'Preencha todos os campos obrigatórios.'
         
         if cargo not in ['FUNCIONARIO', 'SUPERVISOR', 'MASTER']:
-            return {'success': False, 'message': 'Cargo inválido.'}
+            return 'Cargo inválido.'
         
         if status not in ['ATIVO', 'INATIVO', 'PENDENTE']:
-            return {'success': False, 'message': 'Status inválido.'}
+            return 'Status inválido.'
         
         if '@' not in email or '.' not in email:
-            return {'success': False, 'message': 'Email inválido.'}
+            return 'Email inválido.'
         
         if len(senha) < 6:
-            return {'success': False, 'message': 'A senha deve ter pelo menos 6 caracteres.'}
+            return 'A senha deve ter pelo menos 6 caracteres.'
+        
+        return None
+    
+    @staticmethod
+    def criar_usuario(nome, email, senha, cargo, departamento, status='ATIVO', rosto=None):
+        """Cria um novo usuário com validações"""
+        erro = UsuarioController.validar_dados(nome, email, senha, cargo, departamento, status)
+        if erro:
+            return {'success': False, 'message': erro}
         
         try:
             Usuario.criar(nome, email, senha, cargo, departamento, rosto)
             return {'success': True, 'message': 'Usuário cadastrado com sucesso!'}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao cadastrar usuário: {str(e)}'}
     
     @staticmethod
-    def listar_usuarios():
-        """Lista todos os usuários"""
+    def importar_usuarios(registros, tamanho_lote=500, simular=False):
+        """
+        Importa usuários em lote a partir de linhas de planilha
+        
+        Cada lote é validado com as mesmas regras de criar_usuario, checa e-mails
+        já cadastrados com uma única consulta e é inserido em uma transação.
+        
+        Args:
+            registros: iterável de (número da linha, dict com nome, email, senha,
+                       cargo, departamento e status opcional)
+            tamanho_lote: linhas por consulta de duplicidade/transação
+            simular: valida sem gravar
+        
+        Returns:
+            dict: {'success': bool, 'message': str, 'total': int, 'criados': int,
+                   'erros': [{'linha': int, 'email': str, 'message': str}],
+                   'erros_lote': [{'linhas': [int, ...], 'message': str}],
+                   'erro_planilha': str (só se a leitura parou no meio do arquivo)}
+            success é False se algum lote não foi gravado ou a planilha não pôde
+            ser lida até o fim; o que já foi gravado continua no relatório.
+        """
+        relatorio = {'success': True, 'total': 0, 'criados': 0, 'erros': [], 'erros_lote': []}
+        vistos = set()
+        lote = []
+        
+        def gravar(lote):
+            existentes = Usuario.emails_existentes([email for _, email, _ in lote])
+            novos = []
+            for numero, email, dados in lote:
+                if email in existentes:
+                    relatorio['erros'].append({'linha': numero, 'email': email, 'message': 'Email já cadastrado.'})
+                else:
+                    novos.append((numero, email, dados))
+            if not novos or simular:
+                relatorio['criados'] += len(novos)
+                return
+            try:
+                Usuario.criar_em_lote([dados for _, _, dados in novos])
+                relatorio['criados'] += len(novos)
+            except DatabaseUnavailableError:
+                raise
+            except Exception as e:
+                relatorio['success'] = False
+                relatorio['erros_lote'].append(
+                    {'linhas': [numero for numero, _, _ in novos], 'message': f'Erro ao gravar lote: {str(e)}'}
+                )
+                relatorio['erros'].extend(
+                    {'linha': numero, 'email': email, 'message': f'Erro ao gravar lote: {str(e)}'}
+                    for numero, email, _ in novos
+                )
+        
+        linhas = iter(registros)
+        while True:
+            # Só a leitura da planilha fica no try: erro de gravação é tratado em gravar()
+            try:
+                numero, linha = next(linhas)
+            except StopIteration:
+                break
+            except Exception as e:
+                relatorio['success'] = False
+                relatorio['erro_planilha'] = f'Não foi possível ler a planilha: {str(e)}'
+                break
+            relatorio['total'] += 1
+            nome = linha.get('nome', '')
+            email = linha.get('email', '').lower()
+            senha = linha.get('senha', '')
+            cargo = linha.get('cargo', '').upper()
+            departamento = linha.get('departamento', '')
+            status = linha.get('status', '').upper() or 'ATIVO'
+            
+            erro = UsuarioController.validar_dados(nome, email, senha, cargo, departamento, status)
+            if not erro and email in vistos:
+                erro = 'Email repetido na planilha.'
+            if erro:
+                relatorio['erros'].append({'linha': numero, 'email': email, 'message': erro})
+                continue
+            
+            vistos.add(email)
+            lote.append((numero, email, (nome, email, senha, cargo, departamento, status)))
+            if len(lote) >= tamanho_lote:
+                gravar(lote)
+                lote = []
+        
+        if lote:
+            gravar(lote)
+        acao = 'válidos' if simular else 'importados'
+        relatorio['message'] = f"{relatorio['criados']} de {relatorio['total']} usuários {acao}."
+        if relatorio['erros_lote']:
+            relatorio['message'] += f" {len(relatorio['erros_lote'])} lote(s) não gravado(s): {relatorio['erros_lote'][0]['message']}"
+        if 'erro_planilha' in relatorio:
+            relatorio['message'] += f" {relatorio['erro_planilha']}"
+        return relatorio
+    
+    @staticmethod
+    def listar_usuarios(cursor_token=None, limite=None, incluir_total=False):
+        """
+        Lista usuários por nome, uma página por vez
+        
+        Returns:
+            dict: {'success', 'usuarios', 'next_cursor', 'total' (se incluir_total)}
+        """
         try:
-            conn = Usuario.get_db()
-            if not conn:
-                return {'success': False, 'usuarios': [], 'message': 'Falha na conexão com o banco de dados.'}
+            limite = page_size(limite)
+            filtro, params = KEYSET_USUARIOS.where(cursor_token, prefix='WHERE')
+            
+            usuarios = Usuario.listar(
+                Usuario.COLUNAS_RESUMO, filtro, params, KEYSET_USUARIOS.order_by(), limite + 1
+            )
+            usuarios, proximo = KEYSET_USUARIOS.page(
+                [usuario.para_dict(Usuario.COLUNAS_RESUMO) for usuario in usuarios], limite
+            )
             
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT id, nome, cargo, departamento FROM usuario")
-            usuarios = cursor.fetchall()
-            cursor.close()
-            conn.close()
+            result = {'success': True, 'usuarios': usuarios, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = Usuario.contar()
             
-            return {'success': True, 'usuarios': usuarios}
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'usuarios': [], 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'usuarios': [], 'message': f'Erro ao listar usuários: {str(e)}'}
     
@@ -83,6 +239,8 @@ class UsuarioController:
         try:
             Usuario.atualizar(id, **kwargs)
             return {'success': True, 'message': 'Usuário atualizado com sucesso!'}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao atualizar usuário: {str(e)}'}
     
@@ -92,6 +250,8 @@ class UsuarioController:
         try:
             Usuario.deletar(id)
             return {'success': True, 'message': 'Usuário deletado com sucesso!'}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao deletar usuário: {str(e)}'}
 
@@ -100,26 +260,34 @@ class TarefaController:
     """Controller para operações de tarefas"""
     
     @staticmethod
-    def listar_tarefas_usuario(usuario_id):
-        """Lista tarefas de um usuário específico"""
+    def listar_tarefas_usuario(usuario_id, cursor_token=None, limite=None, incluir_total=False):
+        """
+        Lista tarefas de um usuário específico (mais recentes primeiro), uma página por vez
+        
+        Returns:
+            dict: {'success', 'tarefas', 'next_cursor', 'total' (se incluir_total)}
+        """
         if not usuario_id:
             return {'success': False, 'message': 'usuario_id é obrigatório.'}
         
         try:
-            conn = Usuario.get_db()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT t.id, t.titulo, t.status, t.data_criacao, t.data_conclusao
-                FROM tarefa t
-                JOIN funcionario_tarefa ft ON t.id = ft.tarefa_id
-                WHERE ft.funcionario_id = %s
-                ORDER BY t.data_criacao DESC
-            """, (usuario_id,))
-            tarefas = cursor.fetchall()
-            cursor.close()
-            conn.close()
+            limite = page_size(limite)
+            filtro, params = KEYSET_TAREFAS.where(cursor_token)
+            
+            tarefas, proximo = KEYSET_TAREFAS.page(
+                buscar_tarefas_por_usuario(usuario_id, filtro, params, KEYSET_TAREFAS.order_by(), limite + 1),
+                limite
+            )
+            
+            result = {'success': True, 'tarefas': tarefas, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = contar_tarefas_por_usuario(usuario_id)
             
-            return {'success': True, 'tarefas': tarefas}
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao buscar tarefas: {str(e)}'}
 
@@ -128,24 +296,34 @@ class PontoController:
     """Controller para operações de ponto eletrônico"""
     
     @staticmethod
-    def listar_historico(usuario_id):
-        """Lista histórico de ponto de um usuário"""
+    def listar_historico(usuario_id, cursor_token=None, limite=None, incluir_total=False):
+        """
+        Lista histórico de ponto de um usuário (mais recente primeiro), uma página por vez
+        
+        Returns:
+            dict: {'success', 'historico', 'next_cursor', 'total' (se incluir_total)}
+        """
         if not usuario_id:
             return {'success': False, 'message': 'usuario_id é obrigatório.'}
         
         try:
-            conn = Usuario.get_db()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT id, data, hora_entrada, hora_saida, total_horas, status "
-                "FROM ponto WHERE usuario_id=%s ORDER BY data DESC",
-                (usuario_id,)
+            limite = page_size(limite)
+            filtro, params = KEYSET_PONTO.where(cursor_token)
+            
+            pontos, proximo = KEYSET_PONTO.page(
+                listar_historico_ponto(usuario_id, filtro, params, KEYSET_PONTO.order_by(), limite + 1),
+                limite
             )
-            pontos = cursor.fetchall()
-            cursor.close()
-            conn.close()
             
-            return {'success': True, 'historico': pontos}
+            result = {'success': True, 'historico': pontos, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = contar_pontos_usuario(usuario_id)
+            
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao buscar histórico: {str(e)}'}
     
@@ -156,51 +334,165 @@ class PontoController:
             return {'success': False, 'message': 'Campos obrigatórios ausentes.'}
         
         try:
-            conn = Usuario.get_db()
-            cursor = conn.cursor(dictionary=True)
-            
-            # Verifica duplicidade
-            cursor.execute(
-                "SELECT id FROM ponto WHERE usuario_id=%s AND data=%s",
-                (usuario_id, data_ponto)
-            )
-            if cursor.fetchone():
-                cursor.close()
-                conn.close()
+            # INSERT único: a chave ponto(usuario_id, data) barra a duplicidade
+            if not registrar_entrada(usuario_id, data_ponto, hora_entrada):
                 return {'success': False, 'message': 'Ponto já registrado para este usuário e data.'}
             
-            # Insere registro de ponto
-            cursor.execute(
-                "INSERT INTO ponto (usuario_id, data, hora_entrada, status) VALUES (%s, %s, %s, 'REGISTRADO')",
-                (usuario_id, data_ponto, hora_entrada)
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
             return {'success': True, 'message': 'Ponto registrado com sucesso.'}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao registrar ponto: {str(e)}'}
 
+    
+    @staticmethod
+    def sincronizar_pontos(registros):
+        """
+        Aplica um lote de pontos (sincronização offline ou registro da equipe)
+        
+        Cada registro traz uma chave de idempotência gerada pelo dispositivo:
+        reenviar o mesmo lote não duplica pontos.
+        
+        Args:
+            registros: lista de dicts {'chave', 'usuario_id', 'data' (AAAA-MM-DD),
+                       'hora_entrada' (HH:MM ou HH:MM:SS)}
+        
+        Returns:
+            dict: {'success', 'resultados': [{'indice', 'chave', 'situacao', 'message'}],
+                   'criados', 'duplicados', 'rejeitados'}
+        """
+        erro, resultados, validos = PontoController._preparar_lote(registros)
+        if erro:
+            return {'success': False, 'message': erro}
+        
+        try:
+            aplicados = sincronizar_pontos(validos) if validos else {}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao sincronizar pontos: {str(e)}'}
+        
+        return PontoController._consolidar(resultados, aplicados)
+    
+    @staticmethod
+    def _preparar_lote(registros):
+        """
+        Valida o lote da sincronização sem ir ao banco
+        
+        Returns:
+            tuple: (erro do lote ou None, resultados por índice (os rejeitados já
+                   com situação), registros válidos para models.sincronizar_pontos)
+        """
+        if not isinstance(registros, list) or not registros:
+            return 'Envie a lista de registros.', None, None
+        if len(registros) > PONTO_SYNC_MAX:
+            return f'Envie no máximo {PONTO_SYNC_MAX} registros por vez.', None, None
+        
+        resultados = []
+        validos = {}
+        for indice, registro in enumerate(registros):
+            chave, dados, erro = PontoController._validar_registro(registro)
+            item = {'indice': indice, 'chave': chave}
+            if erro:
+                item.update(situacao='rejeitado', message=erro)
+            elif chave in validos:
+                item.update(situacao='duplicado', message='Chave repetida no lote.')
+            else:
+                validos[chave] = dados
+            resultados.append(item)
+        return None, resultados, list(validos.values())
+    
+    @staticmethod
+    def _consolidar(resultados, aplicados):
+        """Resposta da sincronização: situação de cada registro e as contagens"""
+        contagem = {'criado': 0, 'duplicado': 0, 'rejeitado': 0}
+        for item in resultados:
+            if 'situacao' not in item:
+                item['situacao'], item['message'] = aplicados[item['chave']]
+            contagem[item['situacao']] += 1
+        
+        return {
+            'success': True,
+            'resultados': resultados,
+            'criados': contagem['criado'],
+            'duplicados': contagem['duplicado'],
+            'rejeitados': contagem['rejeitado'],
+        }
+    
+    @staticmethod
+    def _validar_registro(registro):
+        """(chave, (chave, usuario_id, data, hora_entrada), erro) de um registro da sincronização"""
+        if not isinstance(registro, dict):
+            return None, None, 'Registro inválido.'
+        
+        chave = registro.get('chave')
+        if not isinstance(chave, str) or not chave.strip() or len(chave) > 64:
+            return None, None, 'Chave de idempotência ausente ou maior que 64 caracteres.'
+        chave = chave.strip()
+        
+        try:
+            usuario_id = int(registro.get('usuario_id'))
+        except (TypeError, ValueError):
+            return chave, None, 'usuario_id inválido.'
+        
+        try:
+            data_ponto = datetime.strptime(str(registro.get('data')), '%Y-%m-%d').date()
+        except ValueError:
+            return chave, None, 'Data inválida (use AAAA-MM-DD).'
+        
+        hora = str(registro.get('hora_entrada') or '')
+        for formato in ('%H:%M:%S', '%H:%M'):
+            try:
+                hora_entrada = datetime.strptime(hora, formato).strftime('%H:%M:%S')
+                break
+            except ValueError:
+                continue
+        else:
+            return chave, None, 'Hora de entrada inválida (use HH:MM).'
+        
+        return chave, (chave, usuario_id, data_ponto, hora_entrada), None
+
 
 class DashboardController:
     """Controller para dados do dashboard"""
     
+    # Snapshot por papel, lido das tabelas de resumo e reaproveitado por alguns segundos
+    _cache = TTLCache(ttl=float(os.getenv('DASHBOARD_CACHE_TTL', 30)))
+    
     @staticmethod
     def obter_dados_dashboard(user_role):
         """Retorna dados do dashboard baseado no papel do usuário"""
+        gestor = user_role in ['GOVERNANTE', 'SUPERVISOR']
+        return dict(DashboardController._cache.get_or_set(
+            user_role, lambda: DashboardController._montar_snapshot(user_role, gestor)
+        ))
+    
+    @staticmethod
+    def _montar_snapshot(user_role, gestor):
+        # Indicadores reais vêm dos resumos por dia/departamento (custo constante)
+        indicadores = resumos.ler_snapshot(por_departamento=gestor)
+        return DashboardController._dados(user_role, gestor, indicadores)
+    
+    @staticmethod
+    def _dados(user_role, gestor, indicadores):
+        """Resposta do dashboard para o papel a partir dos indicadores dos resumos"""
         import time
         
         # Dados base para todos os usuários
         data = {
-            'activeUsers': 42,
-            'efficiency': 87,
+            'activeUsers': indicadores['activeUsers'],
+            'efficiency': indicadores['efficiency'],
             'timestamp': time.time()
         }
         
         # Dados adicionais para GOVERNANTE e SUPERVISOR
-        if user_role in ['GOVERNANTE', 'SUPERVISOR']:
+        if gestor:
             data.update({
+                'absences': indicadores['absences'],
+                'tasksCreated': indicadores['tasksCreated'],
+                'tasksCompleted': indicadores['tasksCompleted'],
+                'departments': indicadores['departments'],
+                # Sem fonte no banco ainda (sensores ambientais)
                 'environmentImpact': 76,
                 'criticalAlerts': 3
             })
@@ -221,8 +513,13 @@ class RelatorioController:
     """Controller para geração de relatórios"""
     
     @staticmethod
-    def gerar_relatorio(period='week', start=None, end=None):
-        """Gera relatório de tarefas por período"""
+    def _intervalo(period='week', start=None, end=None):
+        """
+        Converte o período do filtro em (data inicial, data final)
+        
+        Raises:
+            ValueError: período personalizado sem as duas datas, ou com data inválida
+        """
         from datetime import datetime, timedelta
         
         now = datetime.now()
@@ -240,34 +537,74 @@ class RelatorioController:
         elif period == 'year':
             start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
             end_date = now
-        elif period == 'custom' and start and end:
-            start_date = datetime.strptime(start, '%Y-%m-%d')
-            end_date = datetime.strptime(end, '%Y-%m-%d')
+        elif period == 'custom':
+            if not (start and end):
+                raise ValueError('Informe as datas inicial e final do período personalizado.')
+            try:
+                start_date = datetime.strptime(start, '%Y-%m-%d')
+                end_date = datetime.strptime(end, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError('Datas inválidas. Use o formato AAAA-MM-DD')
         else:
             start_date = now - timedelta(days=7)
             end_date = now
         
+        return start_date, end_date
+    
+    @staticmethod
+    def gerar_relatorio(period='week', start=None, end=None):
+        """Gera relatório de tarefas por período"""
+        try:
+            start_date, end_date = RelatorioController._intervalo(period, start, end)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}
+        
         try:
-            conn = Usuario.get_db()
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("""
-                SELECT t.id, t.titulo, t.status, t.data_criacao, t.data_conclusao, u.nome as gerente
-                FROM tarefa t
-                LEFT JOIN usuario u ON t.gerente_id = u.id
-                WHERE t.data_criacao >= %s AND t.data_criacao <= %s
-            """, (start_date, end_date))
-            tarefas = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-            return {'success': True, 'tarefas': tarefas}
+            return {'success': True, 'tarefas': buscar_tarefas_periodo(start_date, end_date)}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro ao gerar relatório: {str(e)}'}
+    
+    @staticmethod
+    def exportar_relatorio(period='week', start=None, end=None, formato='xlsx'):
+        """
+        Prepara o download do relatório de tarefas (CSV ou Excel) em streaming
+        
+        Nada é lido do banco aqui: o gerador devolvido executa a consulta e
+        escreve o arquivo à medida que a resposta é enviada.
+        
+        Returns:
+            dict: {'success': bool, 'stream': gerador de bytes, 'filename': str,
+                   'mimetype': str} ou {'success': False, 'message': str}
+        """
+        if formato not in export_stream.FORMATOS:
+            return {'success': False, 'message': 'Formato inválido. Use csv ou xlsx'}
+        
+        try:
+            start_date, end_date = RelatorioController._intervalo(period, start, end)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}
+        
+        linhas = iterar_tarefas_periodo(start_date, end_date)
+        return {
+            'success': True,
+            'stream': export_stream.stream(formato, COLUNAS_RELATORIO_TAREFAS, linhas),
+            'filename': f"relatorio_tarefas_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{formato}",
+            'mimetype': export_stream.FORMATOS[formato]
+        }
 
 
 class AuditoriaController:
     """Controller para auditoria"""
     
+    @staticmethod
+    def registrar_evento(usuario_id, acao, ip, sucesso=True):
+        """Registra um evento na trilha de auditoria (enfileirado, sem ida ao banco)"""
+        if not usuario_id:
+            return
+        registrar_auditoria(usuario_id, acao, ip, 'SUCESSO' if sucesso else 'FALHA')
+    
     @staticmethod
     def listar_registros(usuario=None, data_inicial=None, data_final=None):
         """Lista registros de auditoria com filtros"""
@@ -306,6 +643,8 @@ class AuditoriaController:
 class FaceIDController:
     """Controller para operações de reconhecimento facial"""
     
+    MAX_FRAMES = 8  # frames aceitos por rajada no login
+    
     @staticmethod
     def registrar_faceid(user_id, image_base64):
         """Registra FaceID de um usuário"""
@@ -313,18 +652,21 @@ class FaceIDController:
             return {'success': False, 'message': 'user_id e image são obrigatórios'}
         
         # Verifica se usuário existe
-        user = Usuario.buscar_por_id(user_id)
+        user = Usuario.buscar_dados_login(user_id)
         if not user:
             return {'success': False, 'message': 'Usuário não encontrado'}
         
         try:
-            # TODO: Implementar sistema de reconhecimento facial
-            # from app.utils.face_recognition_utils import face_system
-            # result = face_system.register_face(image_base64)
-            
-            # Por enquanto, retorna sucesso simulado
-            # Usuario.atualizar_face_encoding(user_id, result['encoding'])
+            # Pipeline único (decodifica, detecta uma vez, valida e gera o encoding)
+            # executado no pool de processos, fora da thread da requisição
+            result = face_executor.register_face(image_base64)
+            if not result['success']:
+                return {'success': False, 'message': result['message'], 'code': result.get('code')}
+
+            Usuario.atualizar_face_encoding(user_id, result['encoding'])
             return {'success': True, 'message': 'FaceID cadastrado com sucesso!'}
+        except (DatabaseUnavailableError, FaceExecutorError):
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro no servidor: {str(e)}'}
     
@@ -335,32 +677,75 @@ class FaceIDController:
             return {'success': False, 'message': 'Imagem é obrigatória'}
         
         try:
-            users_with_faceid = Usuario.buscar_usuarios_com_faceid()
-            
-            if not users_with_faceid:
+            if len(face_gallery) == 0:
                 return {
                     'success': False,
                     'message': 'Nenhum usuário com FaceID cadastrado. Use login tradicional.'
                 }
             
-            # TODO: Implementar reconhecimento facial real
-            # from app.utils.face_recognition_utils import face_system
-            # best_match = None
-            # best_confidence = 0
-            # 
-            # for user in users_with_faceid:
-            #     result = face_system.authenticate_face(image_base64, user['rosto'])
-            #     if result['success'] and result['confidence'] > best_confidence:
-            #         best_confidence = result['confidence']
-            #         best_match = user
+            # O probe é codificado uma vez (no pool de processos) e comparado
+            # com a galeria em cache de uma só vez
+            probe, error = face_executor.extract_encoding(image_base64)
+            if probe is None:
+                return {'success': False, 'message': error or 'Nenhum rosto detectado'}
+
+            return FaceIDController._identificar([probe])
+        except (DatabaseUnavailableError, FaceExecutorError):
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro no servidor: {str(e)}'}
+    
+    @staticmethod
+    def autenticar_faceid_frames(frames):
+        """
+        Autentica usuário via FaceID a partir de uma rajada de frames
+
+        Os frames recebem uma nota barata (nitidez, tamanho do rosto, brilho)
+        e só os dois melhores passam pelo encoding completo.
+        """
+        if not frames or not isinstance(frames, list):
+            return {'success': False, 'message': 'Envie ao menos um frame'}
+        
+        try:
+            if len(face_gallery) == 0:
+                return {
+                    'success': False,
+                    'message': 'Nenhum usuário com FaceID cadastrado. Use login tradicional.'
+                }
             
-            # Por enquanto, retorna erro
-            return {
-                'success': False,
-                'message': 'Rosto não reconhecido. Tente novamente ou use login tradicional.'
-            }
+            candidates, error = face_executor.extract_best_encodings(frames[:FaceIDController.MAX_FRAMES])
+            if not candidates:
+                return {'success': False, 'message': error or 'Nenhum rosto detectado'}
+
+            return FaceIDController._identificar([encoding for encoding, _ in candidates])
+        except (DatabaseUnavailableError, FaceExecutorError):
+            raise
         except Exception as e:
             return {'success': False, 'message': f'Erro no servidor: {str(e)}'}
+
+    @staticmethod
+    def _identificar(probes):
+        """Compara os probes com a galeria e devolve a decisão de login do mais próximo"""
+        results = [
+            face_matching.decide(face_matching.summarize(*face_gallery.search(probe, k=2)))
+            for probe in probes
+        ]
+
+        matches = [r for r in results if r['success']]
+        if not matches:
+            return {'success': False, 'message': results[0]['message']}
+
+        result = min(matches, key=lambda r: r['distance'])
+        user = Usuario.buscar_dados_login(result['user_id'])
+        if not user:
+            return {'success': False, 'message': 'Rosto não reconhecido. Tente novamente ou use login tradicional.'}
+
+        return {
+            'success': True,
+            'message': result['message'],
+            'confidence': result['confidence'],
+            'user': user.para_dict(('id', 'nome', 'email'))
+        }
     
     @staticmethod
     def verificar_faceid_cadastrado(user_id):
@@ -368,5 +753,7 @@ class FaceIDController:
         try:
             has_faceid = Usuario.verificar_faceid_cadastrado(user_id)
             return {'success': True, 'has_faceid': has_faceid}
+        except DatabaseUnavailableError:
+            raise
         except Exception as e:
             return {'success': False, 'message': str(e)}
@@ -0,0 +1,221 @@
+"""Controllers assíncronos - as operações das APIs JSON no modo ASGI (asgi.py)
+
+Mesmas regras, mensagens e formatos de resposta de controller.py. O que não faz
+I/O (validação, paginação, montagem do dashboard, cache) é reaproveitado de lá;
+aqui ficam só os awaits em models_async.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.controllers import controller
+from app.controllers.controller import KEYSET_USUARIOS, KEYSET_TAREFAS, KEYSET_PONTO
+from app.models import models_async
+from app.models.models import Usuario
+from app.models.db_pool import DatabaseUnavailableError
+from app.utils.face_executor import face_executor
+from app.utils.pagination import InvalidCursorError, page_size
+
+
+class UsuarioController:
+    """Controller assíncrono para operações de usuário"""
+
+    @staticmethod
+    async def listar_usuarios(cursor_token=None, limite=None, incluir_total=False):
+        """Lista usuários por nome, uma página por vez (ver controller.UsuarioController)"""
+        try:
+            limite = page_size(limite)
+            filtro, params = KEYSET_USUARIOS.where(cursor_token, prefix='WHERE')
+
+            usuarios = await models_async.listar_usuarios(
+                Usuario.COLUNAS_RESUMO, filtro, params, KEYSET_USUARIOS.order_by(), limite + 1
+            )
+            usuarios, proximo = KEYSET_USUARIOS.page(
+                [usuario.para_dict(Usuario.COLUNAS_RESUMO) for usuario in usuarios], limite
+            )
+
+            result = {'success': True, 'usuarios': usuarios, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = await models_async.contar_usuarios()
+
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'usuarios': [], 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'usuarios': [], 'message': f'Erro ao listar usuários: {str(e)}'}
+
+
+class TarefaController:
+    """Controller assíncrono para operações de tarefas"""
+
+    @staticmethod
+    async def listar_tarefas_usuario(usuario_id, cursor_token=None, limite=None, incluir_total=False):
+        """Lista tarefas de um usuário, mais recentes primeiro (ver controller.TarefaController)"""
+        if not usuario_id:
+            return {'success': False, 'message': 'usuario_id é obrigatório.'}
+
+        try:
+            limite = page_size(limite)
+            filtro, params = KEYSET_TAREFAS.where(cursor_token)
+
+            tarefas, proximo = KEYSET_TAREFAS.page(
+                await models_async.buscar_tarefas_por_usuario(
+                    usuario_id, filtro, params, KEYSET_TAREFAS.order_by(), limite + 1
+                ),
+                limite
+            )
+
+            result = {'success': True, 'tarefas': tarefas, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = await models_async.contar_tarefas_por_usuario(usuario_id)
+
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao buscar tarefas: {str(e)}'}
+
+
+class PontoController:
+    """Controller assíncrono para operações de ponto eletrônico"""
+
+    @staticmethod
+    async def listar_historico(usuario_id, cursor_token=None, limite=None, incluir_total=False):
+        """Lista histórico de ponto de um usuário, mais recente primeiro (ver controller.PontoController)"""
+        if not usuario_id:
+            return {'success': False, 'message': 'usuario_id é obrigatório.'}
+
+        try:
+            limite = page_size(limite)
+            filtro, params = KEYSET_PONTO.where(cursor_token)
+
+            pontos, proximo = KEYSET_PONTO.page(
+                await models_async.listar_historico_ponto(
+                    usuario_id, filtro, params, KEYSET_PONTO.order_by(), limite + 1
+                ),
+                limite
+            )
+
+            result = {'success': True, 'historico': pontos, 'next_cursor': proximo}
+            if incluir_total:
+                result['total'] = await models_async.contar_pontos_usuario(usuario_id)
+
+            return result
+        except InvalidCursorError as e:
+            return {'success': False, 'message': str(e)}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao buscar histórico: {str(e)}'}
+
+    @staticmethod
+    async def registrar_ponto(usuario_id, data_ponto, hora_entrada, localizacao=None):
+        """Registra ponto eletrônico"""
+        if not all([usuario_id, data_ponto, hora_entrada]):
+            return {'success': False, 'message': 'Campos obrigatórios ausentes.'}
+
+        try:
+            if not await models_async.registrar_entrada(usuario_id, data_ponto, hora_entrada):
+                return {'success': False, 'message': 'Ponto já registrado para este usuário e data.'}
+
+            return {'success': True, 'message': 'Ponto registrado com sucesso.'}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao registrar ponto: {str(e)}'}
+
+    @staticmethod
+    async def sincronizar_pontos(registros):
+        """Aplica um lote de pontos com chaves de idempotência (ver controller.PontoController)"""
+        erro, resultados, validos = controller.PontoController._preparar_lote(registros)
+        if erro:
+            return {'success': False, 'message': erro}
+
+        try:
+            aplicados = await models_async.sincronizar_pontos(validos) if validos else {}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': f'Erro ao sincronizar pontos: {str(e)}'}
+
+        return controller.PontoController._consolidar(resultados, aplicados)
+
+
+class DashboardController:
+    """Controller assíncrono para dados do dashboard"""
+
+    @staticmethod
+    async def obter_dados_dashboard(user_role):
+        """Retorna dados do dashboard baseado no papel do usuário (mesmo cache do modo síncrono)"""
+        cache = controller.DashboardController._cache
+        data = cache.get(user_role)
+        if data is None:
+            gestor = user_role in ['GOVERNANTE', 'SUPERVISOR']
+            indicadores = await models_async.ler_snapshot(por_departamento=gestor)
+            data = controller.DashboardController._dados(user_role, gestor, indicadores)
+            cache.set(user_role, data)
+        return dict(data)
+
+
+class AuditoriaController:
+    """
+    Controller assíncrono para auditoria
+
+    registrar_evento só enfileira no AuditSink (não faz I/O) e é o mesmo do
+    controller síncrono. A leitura roda em thread do executor padrão do loop
+    enquanto listar_registros não tiver a versão com models_async.
+    """
+
+    registrar_evento = staticmethod(controller.AuditoriaController.registrar_evento)
+
+    @staticmethod
+    async def listar_registros(usuario=None, data_inicial=None, data_final=None):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, controller.AuditoriaController.listar_registros, usuario, data_inicial, data_final
+        )
+
+
+class FaceIDController:
+    """
+    Controller assíncrono para FaceID
+
+    Cadastro e login rodam o FaceIDController síncrono em threads próprias: o
+    HOG/encoding vai para o pool de processos (face_executor) e a thread só
+    aguarda, então o event loop segue atendendo as outras requisições. Há uma
+    thread por vaga do face_executor; além disso ele já responde "ocupado".
+    """
+
+    _threads = ThreadPoolExecutor(
+        max_workers=face_executor.workers + face_executor.max_pending, thread_name_prefix='faceid'
+    )
+
+    @staticmethod
+    async def _em_thread(funcao, *args):
+        return await asyncio.get_running_loop().run_in_executor(FaceIDController._threads, funcao, *args)
+
+    @staticmethod
+    async def registrar_faceid(user_id, image_base64):
+        return await FaceIDController._em_thread(controller.FaceIDController.registrar_faceid, user_id, image_base64)
+
+    @staticmethod
+    async def autenticar_faceid(image_base64):
+        return await FaceIDController._em_thread(controller.FaceIDController.autenticar_faceid, image_base64)
+
+    @staticmethod
+    async def autenticar_faceid_frames(frames):
+        return await FaceIDController._em_thread(controller.FaceIDController.autenticar_faceid_frames, frames)
+
+    @staticmethod
+    async def verificar_faceid_cadastrado(user_id):
+        """Verifica se usuário tem FaceID cadastrado"""
+        try:
+            has_faceid = await models_async.verificar_faceid_cadastrado(user_id)
+            return {'success': True, 'has_faceid': has_faceid}
+        except DatabaseUnavailableError:
+            raise
+        except Exception as e:
+            return {'success': False, 'message': str(e)}
@@ -0,0 +1,335 @@
+# db_async.py - Pool de conexões assíncrono para o modo ASGI (asgi.py)
+# 🎯 Objetivo: Centenas de requisições aguardando o MySQL em um processo, sem uma thread por requisição
+#
+# - Driver: aiomysql (protocolo texto; sem prepared statements no servidor)
+# - Mesmo contrato do db_pool: conexão presa à requisição e devolvida no teardown,
+#   DatabaseUnavailableError / PoolTimeoutError quando o banco não responde ou o pool esgota
+# - O pool guarda conexões com uma interface mínima (fetchall, execute, executemany,
+#   commit, rollback, ping, close, in_transaction): MySQLConnection embrulha o aiomysql
+#   e benchmarks/sqlite_db.AsyncSQLiteConnection faz o mesmo sobre o SQLite dos testes
+# - Uma conexão atende uma corrotina por vez: não dispare consultas em paralelo
+#   (asyncio.gather) na conexão da requisição; peça outra ao pool
+
+import asyncio
+import os
+import time
+from collections import deque
+
+from mysql.connector import IntegrityError
+
+from app.models.db_pool import DatabaseUnavailableError, PoolTimeoutError, _ganchos
+
+
+class MySQLConnection:
+    """Conexão aiomysql com a interface usada pelo pool e por repositorio_async"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    async def _rodar(self, executar, sql, params):
+        import pymysql
+
+        try:
+            await executar(sql, params)
+        except pymysql.err.IntegrityError as e:
+            # Mesma exceção do mysql-connector: os models testam e.errno == ER_DUP_ENTRY
+            errno, msg = (tuple(e.args) + (None, None))[:2]
+            raise IntegrityError(msg=msg, errno=errno) from e
+
+    async def fetchall(self, sql, params=()):
+        import aiomysql
+
+        async with self._raw.cursor(aiomysql.DictCursor) as cursor:
+            await self._rodar(cursor.execute, sql, params)
+            return list(await cursor.fetchall())
+
+    async def execute(self, sql, params=()):
+        async with self._raw.cursor() as cursor:
+            await self._rodar(cursor.execute, sql, params)
+            return cursor.rowcount
+
+    async def executemany(self, sql, linhas):
+        # O PyMySQL junta INSERT ... VALUES em uma instrução multi-linha
+        async with self._raw.cursor() as cursor:
+            await self._rodar(cursor.executemany, sql, linhas)
+            return cursor.rowcount
+
+    async def commit(self):
+        await self._raw.commit()
+
+    async def rollback(self):
+        await self._raw.rollback()
+
+    async def ping(self):
+        await self._raw.ping(reconnect=False)
+
+    @property
+    def in_transaction(self):
+        return self._raw.get_transaction_status()
+
+    def close(self):
+        self._raw.close()
+
+
+class AsyncPooledConnection:
+    """
+    Conexão emprestada do pool assíncrono.
+
+    ``close()`` devolve a conexão ao pool; conexões presas à requisição
+    (``request_scoped``) só voltam no teardown do app context. Uma operação
+    cancelada no meio (cliente desconectou, timeout) deixa a resposta pela
+    metade no socket: a conexão é descartada em vez de voltar ao pool.
+    """
+
+    def __init__(self, pool, raw, request_scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._request_scoped = request_scoped
+        self._descartar = False
+
+    @property
+    def raw(self):
+        return self._raw
+
+    async def _usar(self, metodo, *args):
+        raw = self._raw
+        if raw is None:
+            raise DatabaseUnavailableError('Conexão já devolvida ao pool')
+        try:
+            return await getattr(raw, metodo)(*args)
+        except asyncio.CancelledError:
+            self._descartar = True
+            raise
+
+    async def fetchall(self, sql, params=()):
+        return await self._usar('fetchall', sql, params)
+
+    async def execute(self, sql, params=()):
+        """Executa e devolve as linhas afetadas"""
+        return await self._usar('execute', sql, params)
+
+    async def executemany(self, sql, linhas):
+        return await self._usar('executemany', sql, linhas)
+
+    async def commit(self):
+        await self._usar('commit')
+
+    async def rollback(self):
+        await self._usar('rollback')
+
+    async def close(self):
+        if not self._request_scoped:
+            await self.release()
+
+    async def release(self, discard=False):
+        """Devolve a conexão ao pool (idempotente)"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            await self._pool._devolver(raw, discard=discard or self._descartar)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncConnectionPool:
+    """
+    Pool de conexões para um event loop.
+
+    Requisições além de ``pool_size`` aguardam na fila do semáforo sem
+    ocupar thread nenhuma; passado ``timeout`` recebem PoolTimeoutError (503).
+
+    Args:
+        connect_factory: corrotina sem argumentos que abre uma conexão nova
+        pool_size: máximo de conexões abertas ao mesmo tempo
+        timeout: segundos aguardando uma conexão livre antes de desistir
+        recycle: idade máxima (s) de uma conexão antes de ser reaberta
+        ping_after: segundos ociosa após os quais a conexão é testada com ping
+    """
+
+    def __init__(self, connect_factory, pool_size=50, timeout=5.0, recycle=1800, ping_after=30):
+        self.connect_factory = connect_factory
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+
+        self._idle = deque()  # (conexão, devolvida_em)
+        self._created_at = {}
+        self._in_use = 0
+        self._slots = None
+        self._loop = None
+
+    @property
+    def checked_out(self):
+        return self._in_use
+
+    def _verificar_loop(self):
+        """Conexões e semáforo pertencem a um event loop: outro loop começa do zero"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.dispose()
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._in_use = 0
+            self._loop = loop
+
+    async def connect(self):
+        """Empresta uma conexão do pool"""
+        self._verificar_loop()
+        observar = _ganchos['checkout']
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            if observar is not None:
+                observar(time.monotonic() - start, ok=False)
+            raise PoolTimeoutError(
+                msg=f'Pool de conexões esgotado ({self._in_use} em uso) após {self.timeout}s'
+            )
+        if observar is not None:
+            observar(time.monotonic() - start)
+
+        try:
+            raw = await self._obter()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_use += 1
+        return AsyncPooledConnection(self, raw)
+
+    async def _obter(self):
+        while self._idle:
+            raw, returned_at = self._idle.pop()
+            now = time.monotonic()
+            if self.recycle is not None and now - self._created_at.get(id(raw), now) > self.recycle:
+                self._fechar(raw)
+                continue
+            if self.ping_after is not None and now - returned_at > self.ping_after:
+                try:
+                    await raw.ping()
+                except Exception:
+                    self._fechar(raw)
+                    continue
+            return raw
+        return await self._abrir()
+
+    async def _abrir(self):
+        try:
+            raw = await self.connect_factory()
+        except Exception as e:
+            raise DatabaseUnavailableError(msg=f'Falha ao conectar ao banco de dados: {e}') from e
+        self._created_at[id(raw)] = time.monotonic()
+        return raw
+
+    async def _devolver(self, raw, discard=False):
+        try:
+            if not discard and raw.in_transaction:
+                await raw.rollback()
+        except Exception:
+            discard = True
+        except asyncio.CancelledError:
+            discard = True
+            raise
+        finally:
+            self._in_use -= 1
+            if discard or len(self._idle) >= self.pool_size:
+                self._fechar(raw)
+            else:
+                self._idle.append((raw, time.monotonic()))
+            self._slots.release()
+
+    def _fechar(self, raw):
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def dispose(self):
+        """Fecha todas as conexões ociosas"""
+        while self._idle:
+            raw, _ = self._idle.popleft()
+            self._fechar(raw)
+
+
+async def _connect_mysql():
+    import aiomysql
+
+    raw = await aiomysql.connect(
+        host=os.getenv('DB_HOST'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_DATABASE'),
+        connect_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+        charset='utf8mb4',
+        autocommit=False
+    )
+    return MySQLConnection(raw)
+
+
+_pool = None
+
+
+def get_pool():
+    """Retorna o pool assíncrono do processo, criado sob demanda a partir do .env"""
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(
+            _connect_mysql,
+            pool_size=int(os.getenv('DB_ASYNC_POOL_SIZE', 50)),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', 5)),
+            recycle=float(os.getenv('DB_POOL_RECYCLE', 1800)),
+            ping_after=float(os.getenv('DB_POOL_PING_AFTER', 30))
+        )
+    return _pool
+
+
+def set_pool(pool):
+    """Substitui o pool global (testes, benchmarks, reconfiguração)"""
+    global _pool
+    old, _pool = _pool, pool
+    if old is not None and old is not pool:
+        old.dispose()
+
+
+async def get_connection():
+    """
+    Retorna uma conexão do pool assíncrono.
+
+    Dentro de uma requisição Quart a mesma conexão é reutilizada por todas as
+    chamadas e devolvida no teardown; fora dela cada chamada empresta uma
+    conexão que volta ao pool em ``await close()``.
+    """
+    from quart import g, has_app_context
+
+    if not has_app_context():
+        return await get_pool().connect()
+
+    conn = g.get('_db_conn')
+    if conn is None or conn.raw is None:
+        conn = await get_pool().connect()
+        conn._request_scoped = True
+        g._db_conn = conn
+    return conn
+
+
+async def _liberar_conexao(exc=None):
+    from quart import g
+
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        await conn.release()
+
+
+async def _encerrar_pool():
+    if _pool is not None:
+        _pool.dispose()
+
+
+def init_app(app):
+    """Registra a devolução da conexão no fim de cada requisição (app Quart)"""
+    app.teardown_appcontext(_liberar_conexao)
+    app.after_serving(_encerrar_pool)
@@ -0,0 +1,350 @@
+# db_pool.py - Pool de conexões MySQL com checkout por requisição
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import mysql.connector
+from dotenv import load_dotenv
+from mysql.connector import Error
+
+load_dotenv()
+
+
+class DatabaseUnavailableError(Error):
+    """Banco de dados indisponível (falha ao conectar ou pool esgotado)"""
+
+
+class PoolTimeoutError(DatabaseUnavailableError):
+    """Nenhuma conexão liberada dentro do tempo limite de checkout"""
+
+
+class PooledConnection:
+    """
+    Conexão emprestada do pool.
+
+    Delega tudo para a conexão MySQL real; ``close()`` devolve a conexão ao
+    pool em vez de encerrá-la. Conexões presas à requisição (``request_scoped``)
+    ignoram ``close()`` e só voltam ao pool no teardown do app context.
+    """
+
+    def __init__(self, pool, raw, request_scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._request_scoped = request_scoped
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise DatabaseUnavailableError('Conexão já devolvida ao pool')
+        return getattr(raw, name)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self, *args, **kwargs):
+        cursor = self.__getattr__('cursor')(*args, **kwargs)
+        wrapper = _ganchos['cursor']
+        return wrapper(cursor) if wrapper is not None else cursor
+
+    def prepared(self, sql):
+        """
+        Cursor (dictionary) com ``sql`` preparado nesta conexão física
+
+        O cursor fica em cache na conexão e volta nos próximos empréstimos: o
+        servidor analisa a instrução uma vez por conexão. Passe sempre o mesmo
+        objeto str (o conector compara por identidade para reaproveitar).
+        """
+        raw = self._raw
+        if raw is None:
+            raise DatabaseUnavailableError('Conexão já devolvida ao pool')
+        return self._pool._cursor_preparado(raw, sql, lambda: self.cursor(prepared=True, dictionary=True))
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self, discard=False):
+        """Devolve a conexão ao pool (idempotente)"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._devolver(raw, discard=discard)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Pool de conexões thread-safe.
+
+    Args:
+        connect_factory: callable sem argumentos que abre uma conexão nova
+        pool_size: conexões mantidas abertas no pool
+        max_overflow: conexões extras permitidas em picos (fechadas ao devolver)
+        timeout: segundos aguardando uma conexão livre antes de desistir
+        recycle: idade máxima (s) de uma conexão antes de ser reaberta
+        ping_after: segundos ociosa após os quais a conexão é testada com ping
+        statement_cache: prepared statements mantidos por conexão (os menos usados são fechados)
+    """
+
+    def __init__(self, connect_factory, pool_size=5, max_overflow=10, timeout=5.0,
+                 recycle=1800, ping_after=30, statement_cache=64):
+        self.connect_factory = connect_factory
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self.statement_cache = statement_cache
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque()  # (conexão, devolvida_em)
+        self._created_at = {}
+        self._statements = {}  # id(conexão) -> OrderedDict(sql -> cursor preparado)
+        self._total = 0
+        self._pid = os.getpid()
+
+    @property
+    def checked_out(self):
+        return self._total - len(self._idle)
+
+    def connect(self):
+        """Empresta uma conexão do pool"""
+        observar = _ganchos['checkout']
+        if observar is None:
+            return self._emprestar()
+        start = time.monotonic()
+        try:
+            conn = self._emprestar()
+        except PoolTimeoutError:
+            observar(time.monotonic() - start, ok=False)
+            raise
+        observar(time.monotonic() - start)
+        return conn
+
+    def _emprestar(self):
+        self._verificar_fork()
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            with self._cond:
+                while not self._idle and self._total >= self.pool_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            msg=f'Pool de conexões esgotado ({self._total} em uso) após {self.timeout}s'
+                        )
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    raw, returned_at = self._idle.pop()
+                else:
+                    raw, returned_at = None, None
+                    self._total += 1
+
+            if raw is None:
+                return PooledConnection(self, self._abrir())
+
+            raw = self._validar(raw, returned_at)
+            if raw is not None:
+                return PooledConnection(self, raw)
+
+    def _abrir(self):
+        try:
+            raw = self.connect_factory()
+        except Exception as e:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise DatabaseUnavailableError(msg=f'Falha ao conectar ao banco de dados: {e}') from e
+        self._created_at[id(raw)] = time.monotonic()
+        return raw
+
+    def _validar(self, raw, returned_at):
+        """Recicla conexões velhas e testa as ociosas; retorna None se descartada"""
+        now = time.monotonic()
+        created_at = self._created_at.get(id(raw), now)
+
+        if self.recycle is not None and now - created_at > self.recycle:
+            self._fechar(raw)
+            with self._cond:
+                self._total += 1
+            return self._abrir()
+
+        if self.ping_after is not None and now - returned_at > self.ping_after:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                self._fechar(raw)
+                return None
+
+        return raw
+
+    def _cursor_preparado(self, raw, sql, criar):
+        # Só quem pegou a conexão emprestada mexe no cache dela: dispensa lock
+        cache = self._statements.setdefault(id(raw), OrderedDict())
+        cursor = cache.get(sql)
+        if cursor is not None:
+            cache.move_to_end(sql)
+            return cursor
+
+        cursor = cache[sql] = criar()
+        if len(cache) > self.statement_cache:
+            _, antigo = cache.popitem(last=False)
+            _fechar_cursor(antigo)
+        return cursor
+
+    def _devolver(self, raw, discard=False):
+        if os.getpid() != self._pid:
+            return
+
+        if not discard:
+            try:
+                if getattr(raw, 'in_transaction', False):
+                    raw.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            keep = not discard and len(self._idle) < self.pool_size
+            if keep:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+        if not keep:
+            self._fechar(raw)
+
+    def _fechar(self, raw):
+        self._created_at.pop(id(raw), None)
+        for cursor in self._statements.pop(id(raw), {}).values():
+            _fechar_cursor(cursor)
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _verificar_fork(self):
+        """Após fork o socket pertence ao processo pai: descarta sem fechar"""
+        if os.getpid() != self._pid:
+            with self._cond:
+                self._idle.clear()
+                self._created_at.clear()
+                self._statements.clear()
+                self._total = 0
+                self._pid = os.getpid()
+
+    def dispose(self):
+        """Fecha todas as conexões ociosas"""
+        while True:
+            with self._cond:
+                if not self._idle:
+                    return
+                raw, _ = self._idle.popleft()
+            self._fechar(raw)
+
+
+def _fechar_cursor(cursor):
+    try:
+        cursor.close()
+    except Exception:
+        pass
+
+
+def _connect_mysql():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_DATABASE'),
+        connection_timeout=int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Ganchos de instrumentação (app/utils/metrics.py); sem registro não há custo extra
+_ganchos = {'cursor': None, 'checkout': None}
+
+
+def instrumentar(cursor=None, checkout=None):
+    """
+    Registra os ganchos de métricas
+
+    Args:
+        cursor: callable que embrulha cada cursor criado pelas conexões do pool
+        checkout: callable(segundos, ok=True) chamado a cada empréstimo de conexão
+    """
+    _ganchos['cursor'] = cursor
+    _ganchos['checkout'] = checkout
+
+
+def get_pool():
+    """Retorna o pool global do processo, criado sob demanda a partir do .env"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _connect_mysql,
+                    pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+                    max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 5)),
+                    recycle=float(os.getenv('DB_POOL_RECYCLE', 1800)),
+                    ping_after=float(os.getenv('DB_POOL_PING_AFTER', 30)),
+                    statement_cache=int(os.getenv('DB_STATEMENT_CACHE', 64))
+                )
+    return _pool
+
+
+def set_pool(pool):
+    """Substitui o pool global (testes, benchmarks, reconfiguração)"""
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, pool
+    if old is not None and old is not pool:
+        old.dispose()
+
+
+def get_connection():
+    """
+    Retorna uma conexão do pool.
+
+    Dentro de uma requisição Flask a mesma conexão é reutilizada por todas as
+    chamadas e devolvida no teardown; fora dela (scripts, threads) cada chamada
+    empresta uma conexão que volta ao pool em ``close()``.
+    """
+    from flask import g, has_app_context
+
+    if not has_app_context():
+        return get_pool().connect()
+
+    conn = g.get('_db_conn')
+    if conn is None or conn.raw is None:
+        conn = get_pool().connect()
+        conn._request_scoped = True
+        g._db_conn = conn
+    return conn
+
+
+def _liberar_conexao(exc=None):
+    from flask import g
+
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.release()
+
+
+def init_app(app):
+    """Registra a devolução da conexão ao pool no fim de cada requisição"""
+    app.teardown_appcontext(_liberar_conexao)
@@ -1,127 +1,264 @@
 # models.py - Operações CRUD para todas as entidades do sistema
 
 import os
-from dotenv import load_dotenv
-import mysql.connector
-from mysql.connector import Error
+from datetime import date, datetime
+
+from mysql.connector import IntegrityError, InterfaceError, OperationalError, errorcode
+
+from app.models.db_pool import get_connection, get_pool, DatabaseUnavailableError
+from app.models import repositorio, resumos, versoes
+from app.utils.face_gallery import face_gallery
+from app.utils.audit_sink import AuditSink
 
-load_dotenv()
 
 def get_db():
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),
-            port=int(os.getenv('DB_PORT')),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_DATABASE')
-        )
-        return connection
-    except Error as e:
-        print(f"Erro ao conectar: {e}")
-        return None
+    """
+    Retorna uma conexão do pool (a mesma durante toda a requisição).
+
+    Raises:
+        DatabaseUnavailableError: se o banco estiver fora do ar ou o pool esgotado
+    """
+    return get_connection()
+
+
+# Colunas que o objeto Usuario sabe guardar (rosto é carregado à parte)
+_CAMPOS_USUARIO = (
+    'id', 'nome', 'email', 'senha', 'cargo', 'departamento',
+    'status', 'ultimo_acesso', 'criado_em', 'rosto_atualizado_em',
+)
+
+# Marca o rosto ainda não buscado no banco
+_NAO_CARREGADO = object()
 
 
 # Classe Usuario
 class Usuario:
-    def __init__(self, nome, email, senha, cargo, departamento, rosto=None, id=None):
+    """
+    Registro de usuário com só as colunas pedidas em cada consulta
+
+    O rosto (BLOB do FaceID) nunca vem nas projeções: é buscado na primeira
+    leitura de ``usuario.rosto``.
+    """
+
+    __slots__ = _CAMPOS_USUARIO + ('_rosto',)
+
+    # Projeções por caso de uso (nada de SELECT *)
+    COLUNAS_RESUMO = ('id', 'nome', 'cargo', 'departamento')
+    COLUNAS_SESSAO = ('id', 'nome', 'email', 'cargo')
+    COLUNAS_PERFIL = (
+        'id', 'nome', 'email', 'cargo', 'departamento',
+        'status', 'ultimo_acesso', 'criado_em', 'rosto_atualizado_em',
+    )
+    COLUNAS_AUTENTICACAO = ('id', 'nome', 'email', 'senha', 'cargo', 'status')
+    # Únicas colunas que atualizar() aceita: os nomes viram texto do SQL ({campos})
+    COLUNAS_EDITAVEIS = ('nome', 'email', 'senha', 'cargo', 'departamento', 'status', 'rosto')
+
+    def __init__(self, nome=None, email=None, senha=None, cargo=None, departamento=None,
+                 rosto=_NAO_CARREGADO, id=None, status=None, ultimo_acesso=None,
+                 criado_em=None, rosto_atualizado_em=None):
         self.id = id
         self.nome = nome
         self.email = email
         self.senha = senha
         self.cargo = cargo
         self.departamento = departamento
-        self.rosto = rosto
+        self.status = status
+        self.ultimo_acesso = ultimo_acesso
+        self.criado_em = criado_em
+        self.rosto_atualizado_em = rosto_atualizado_em
+        self._rosto = rosto
+
+    @property
+    def rosto(self):
+        if self._rosto is _NAO_CARREGADO:
+            self._rosto = Usuario.buscar_rosto(self.id) if self.id is not None else None
+        return self._rosto
+
+    @rosto.setter
+    def rosto(self, valor):
+        self._rosto = valor
+
+    @classmethod
+    def de_linha(cls, row):
+        """Usuario a partir de uma linha (dict) do banco; colunas desconhecidas são ignoradas"""
+        return cls(**{coluna: valor for coluna, valor in row.items() if coluna in _CAMPOS_USUARIO or coluna == 'rosto'})
+
+    def para_dict(self, colunas=COLUNAS_RESUMO):
+        """Dict com as colunas pedidas (para JSON e sessão)"""
+        return {coluna: getattr(self, coluna) for coluna in colunas}
+
+    def __repr__(self):
+        return f'<Usuario {self.id} {self.email}>'
+
+    @staticmethod
+    def _buscar(nome, colunas, params=(), **fragmentos):
+        return repositorio.buscar(
+            nome, params, linha=Usuario.de_linha, colunas=', '.join(colunas), **fragmentos
+        )
 
     @staticmethod
     def criar(nome, email, senha, cargo, departamento, rosto=None):
         conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO usuario (nome, email, senha, cargo, departamento, rosto)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (nome, email, senha, cargo, departamento, rosto))
+        repositorio.executar('usuario.inserir', (nome, email, senha, cargo, departamento, rosto), conn)
+        versoes.incrementar(conn, 'usuario', *(['faceid'] if rosto else []))
         conn.commit()
-        cursor.close()
         conn.close()
 
     @staticmethod
-    def buscar_por_email(email):
+    def emails_existentes(emails):
+        """Quais dos e-mails já estão cadastrados (uma consulta para o lote inteiro)"""
+        emails = sorted(set(emails))
+        return {email.lower() for email in repositorio.buscar('usuario.emails_existentes', emails=emails)}
+
+    @staticmethod
+    def criar_em_lote(usuarios):
+        """
+        Insere vários usuários em uma transação (executemany vira um INSERT multi-linha)
+
+        Args:
+            usuarios: tuplas (nome, email, senha, cargo, departamento, status)
+
+        Raises:
+            Exception: qualquer erro desfaz o lote inteiro
+        """
         conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM usuario WHERE email = %s", (email,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        if user:
-            return Usuario(**user)
-        return None
+        try:
+            repositorio.executar_lote('usuario.inserir_lote', usuarios, conn)
+            versoes.incrementar(conn, 'usuario')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def buscar_por_email(email, colunas=COLUNAS_PERFIL):
+        usuarios = Usuario._buscar('usuario.por_email', colunas, (email,))
+        return usuarios[0] if usuarios else None
     
     @staticmethod
-    def buscar_por_id(user_id):
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM usuario WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        if user:
-            return Usuario(**user)
-        return None
+    def buscar_por_id(user_id, colunas=COLUNAS_PERFIL):
+        usuarios = Usuario._buscar('usuario.por_id', colunas, (user_id,))
+        return usuarios[0] if usuarios else None
+    
+    @staticmethod
+    def buscar_por_ids(ids, colunas=COLUNAS_RESUMO):
+        """
+        Vários usuários em uma única consulta IN
+        
+        Returns:
+            dict: id -> Usuario (ids inexistentes ficam de fora)
+        """
+        ids = sorted(set(ids))
+        if 'id' not in colunas:
+            colunas = ('id',) + tuple(colunas)
+        usuarios = Usuario._buscar('usuario.por_ids', colunas, ids=ids)
+        return {usuario.id: usuario for usuario in usuarios}
+    
+    @staticmethod
+    def buscar_rosto(user_id):
+        """Só o BLOB do FaceID de um usuário"""
+        return repositorio.valor('usuario.rosto', (user_id,))
+    
+    @staticmethod
+    def listar(colunas=COLUNAS_RESUMO, filtro='', params=(), ordem='', limite=None):
+        """
+        Listagem com projeção explícita
+        
+        Args:
+            filtro: fragmento 'WHERE ...' (ex.: Keyset.where(..., prefix='WHERE'))
+            ordem: fragmento 'ORDER BY ...'
+        """
+        params = list(params)
+        if limite is not None:
+            params.append(limite)
+        return Usuario._buscar(
+            'usuario.listar', colunas, params,
+            filtro=filtro, ordem=ordem, limite='LIMIT %s' if limite is not None else ''
+        )
+    
+    @staticmethod
+    def contar():
+        return repositorio.valor('usuario.contar')
     
     @staticmethod
     def atualizar_face_encoding(user_id, face_encoding):
         """Atualiza o encoding facial do usuário"""
         conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE usuario SET rosto = %s WHERE id = %s", (face_encoding, user_id))
+        repositorio.executar('usuario.atualizar_rosto', (face_encoding, user_id), conn)
+        versoes.incrementar(conn, 'faceid')
         conn.commit()
-        cursor.close()
         conn.close()
+        face_gallery.upsert(user_id, face_encoding)
     
     @staticmethod
     def buscar_usuarios_com_faceid():
         """Retorna todos os usuários que possuem FaceID cadastrado"""
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, nome, email, rosto FROM usuario WHERE rosto IS NOT NULL AND rosto != ''")
-        users = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return users
+        return repositorio.buscar('usuario.com_faceid')
+
+    @staticmethod
+    def contador_faceid():
+        """Contador 'faceid' de versao_recurso (uma linha pela chave primária, sem tocar em usuario)"""
+        return repositorio.valor('usuario.contador_faceid') or 0
+
+    @staticmethod
+    def versao_faceid():
+        """Versão da galeria FaceID: (contador 'faceid', quantidade de rostos, última alteração)"""
+        return repositorio.buscar_um('usuario.versao_faceid')
+
+    @staticmethod
+    def buscar_faceid_alterados_desde(momento):
+        """Retorna id e rosto dos usuários cujo FaceID mudou a partir de um momento"""
+        return repositorio.buscar('usuario.faceid_alterados_desde', (momento,))
+
+    @staticmethod
+    def listar_ids_com_faceid():
+        """Retorna apenas os ids dos usuários com FaceID (sem trafegar os BLOBs)"""
+        return repositorio.buscar('usuario.ids_com_faceid')
+
+    @staticmethod
+    def buscar_dados_login(user_id):
+        """Retorna os dados de sessão de um usuário (sem senha nem rosto)"""
+        return Usuario.buscar_por_id(user_id, Usuario.COLUNAS_SESSAO)
     
     @staticmethod
     def verificar_faceid_cadastrado(user_id):
-        """Verifica se o usuário tem FaceID cadastrado"""
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT rosto FROM usuario WHERE id = %s", (user_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        if result and result.get('rosto'):
-            return True
-        return False
+        """Verifica se o usuário tem FaceID cadastrado (sem trafegar o BLOB)"""
+        return bool(repositorio.valor('usuario.tem_faceid', (user_id,)))
 
     @staticmethod
     def atualizar(id, **kwargs):
-        conn = get_db()
-        cursor = conn.cursor()
+        """
+        Atualiza colunas de um usuário
+
+        Raises:
+            ValueError: campo fora de COLUNAS_EDITAVEIS (as chaves vêm do JSON da requisição)
+        """
+        invalidos = sorted(set(kwargs) - set(Usuario.COLUNAS_EDITAVEIS))
+        if invalidos:
+            raise ValueError(f"Campos não editáveis: {', '.join(invalidos)}")
+        if not kwargs:
+            raise ValueError('Nenhum campo para atualizar')
         campos = ', '.join([f"{k}=%s" for k in kwargs.keys()])
-        valores = list(kwargs.values()) + [id]
-        cursor.execute(f"UPDATE usuario SET {campos} WHERE id=%s", valores)
+        if 'rosto' in kwargs:
+            campos += ', rosto_atualizado_em=NOW()'
+        conn = get_db()
+        repositorio.executar('usuario.atualizar', list(kwargs.values()) + [id], conn, campos=campos)
+        versoes.incrementar(conn, 'usuario', *(['faceid'] if 'rosto' in kwargs else []))
         conn.commit()
-        cursor.close()
         conn.close()
+        if 'rosto' in kwargs:
+            face_gallery.upsert(id, kwargs['rosto'])
 
     @staticmethod
     def deletar(id):
         conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM usuario WHERE id=%s", (id,))
+        repositorio.executar('usuario.excluir', (id,), conn)
+        versoes.incrementar(conn, 'usuario', 'faceid')
         conn.commit()
-        cursor.close()
         conn.close()
+        face_gallery.remove(id)
 
 def criar_usuario(nome, email, senha, cargo, departamento, rosto=None):
     Usuario.criar(nome, email, senha, cargo, departamento, rosto)
@@ -139,53 +276,218 @@ def deletar_usuario(id):
 
 def criar_tarefa(titulo, descricao, gerente_id):
     conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO tarefa (titulo, descricao, gerente_id)
-        VALUES (%s, %s, %s)
-    """, (titulo, descricao, gerente_id))
+    repositorio.executar('tarefa.inserir', (titulo, descricao, gerente_id), conn)
+    resumos.incrementar_tarefa(conn, gerente_id, date.today())
+    versoes.incrementar(conn, 'tarefa')
     conn.commit()
-    cursor.close()
     conn.close()
 
 
-def buscar_tarefas_por_usuario(usuario_id):
-    conn = get_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT t.* FROM tarefa t
-        JOIN funcionario_tarefa ft ON ft.tarefa_id = t.id
-        WHERE ft.funcionario_id = %s
-    """, (usuario_id,))
-    tarefas = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return tarefas
+# Colunas do relatório de tarefas, na ordem de iterar_tarefas_periodo
+COLUNAS_RELATORIO_TAREFAS = ['ID', 'Título', 'Status', 'Criada em', 'Concluída em', 'Gerente']
+
+
+def buscar_tarefas_periodo(inicio, fim):
+    """Tarefas criadas no período (dicts), mais antigas primeiro"""
+    return repositorio.buscar('tarefa.periodo', (inicio, fim))
+
+
+def iterar_tarefas_periodo(inicio, fim, batch_size=500):
+    """
+    Percorre as tarefas criadas no período sem carregar o resultado inteiro
+
+    Usa uma conexão própria do pool (não a da requisição) com cursor sem
+    buffer: as linhas são lidas do servidor em lotes de ``batch_size`` à
+    medida que o consumidor avança. A consulta só é executada no primeiro
+    ``next()``.
+
+    Yields:
+        tuple: (id, titulo, status, data_criacao, data_conclusao, gerente)
+    """
+    return repositorio.iterar('tarefa.periodo', (inicio, fim), batch_size)
+
+
+def buscar_tarefas_por_usuario(usuario_id, filtro='', params=(), ordem='', limite=None):
+    """
+    Tarefas atribuídas ao funcionário
+
+    Args:
+        filtro: fragmento 'AND ...' (ex.: Keyset.where(...))
+        ordem: fragmento 'ORDER BY ...'
+    """
+    params = [usuario_id, *params]
+    if limite is not None:
+        params.append(limite)
+    return repositorio.buscar(
+        'tarefa.por_funcionario', params,
+        filtro=filtro, ordem=ordem, limite='LIMIT %s' if limite is not None else ''
+    )
+
+
+def contar_tarefas_por_usuario(usuario_id):
+    return repositorio.valor('tarefa.contar_por_funcionario', (usuario_id,))
 
 # CRUD PONTO
 
-def registrar_ponto(usuario_id, data, hora_entrada, hora_saida, total_horas, status='REGISTRADO'):
+def registrar_entrada(usuario_id, data, hora_entrada):
+    """
+    Registra a entrada do dia em um único INSERT atômico
+
+    A chave única ponto(usuario_id, data) detecta o registro duplicado, sem
+    SELECT prévio e sem corrida entre requisições simultâneas.
+
+    Returns:
+        bool: True se inseriu, False se já havia ponto para o usuário na data
+    """
     conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO ponto (usuario_id, data, hora_entrada, hora_saida, total_horas, status)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    """, (usuario_id, data, hora_entrada, hora_saida, total_horas, status))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        repositorio.executar('ponto.inserir_entrada', (usuario_id, data, hora_entrada), conn)
+        resumos.incrementar_ponto(conn, usuario_id, data)
+        versoes.incrementar(conn, versoes.recurso_ponto(usuario_id))
+        conn.commit()
+        return True
+    except IntegrityError as e:
+        conn.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            return False
+        raise
+    finally:
+        conn.close()
+
+
+def listar_historico_ponto(usuario_id, filtro='', params=(), ordem='', limite=None):
+    """
+    Registros de ponto do usuário, com as horas em 'HH:MM:SS'
+
+    Args:
+        filtro: fragmento 'AND ...' (ex.: Keyset.where(...))
+        ordem: fragmento 'ORDER BY ...'
+    """
+    params = [usuario_id, *params]
+    if limite is not None:
+        params.append(limite)
+    return repositorio.buscar(
+        'ponto.historico', params,
+        filtro=filtro, ordem=ordem, limite='LIMIT %s' if limite is not None else ''
+    )
+
+
+def contar_pontos_usuario(usuario_id):
+    return repositorio.valor('ponto.contar_por_usuario', (usuario_id,))
+
+
+def sincronizar_pontos(registros, tentativas=3):
+    """
+    Aplica um lote de pontos enviados por dispositivos em uma única transação
+
+    Chaves já aplicadas e usuários/dias que já têm ponto viram 'duplicado';
+    usuários inexistentes, 'rejeitado'. Os demais entram em um INSERT multi-linha.
+    Se outro envio gravar o mesmo usuário/dia entre a checagem e o INSERT, o
+    lote inteiro é refeito (a chave única garante que nada entra duas vezes).
+
+    Args:
+        registros: tuplas (chave, usuario_id, data, hora_entrada), chaves sem repetição
+
+    Returns:
+        dict: chave -> (situação, mensagem), situação 'criado', 'duplicado' ou 'rejeitado'
+    """
+    for tentativa in range(tentativas):
+        conn = get_db()
+        try:
+            resultado = _aplicar_lote_ponto(conn, registros)
+            conn.commit()
+            return resultado
+        except IntegrityError as e:
+            conn.rollback()
+            if e.errno != errorcode.ER_DUP_ENTRY or tentativa == tentativas - 1:
+                raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def _aplicar_lote_ponto(conn, registros):
+    resultado = {}
+    chaves = [chave for chave, _, _, _ in registros]
+    for chave in repositorio.buscar('ponto.chaves_existentes', conn=conn, chaves=chaves):
+        resultado[chave] = ('duplicado', 'Registro já sincronizado.')
+
+    pendentes = [r for r in registros if r[0] not in resultado]
+    if not pendentes:
+        return resultado
+
+    ids = sorted({usuario_id for _, usuario_id, _, _ in pendentes})
+    usuarios = set(repositorio.buscar('usuario.ids_existentes', conn=conn, ids=ids))
+
+    pares = {(usuario_id, data) for _, usuario_id, data, _ in pendentes}
+    datas = sorted({data for _, data in pares})
+    ocupados = set(repositorio.buscar('ponto.ocupados', conn=conn, ids=ids, datas=datas)) & pares
+
+    novos = _classificar_lote_ponto(pendentes, usuarios, ocupados, resultado)
+    if novos:
+        repositorio.executar_lote('ponto.inserir_lote', novos, conn)
+        resumos.incrementar_ponto_lote(conn, [chave for _, _, _, chave in novos])
+        versoes.incrementar(conn, *[versoes.recurso_ponto(usuario_id) for usuario_id, _, _, _ in novos])
+    return resultado
+
+
+def _classificar_lote_ponto(pendentes, usuarios, ocupados, resultado):
+    """
+    Preenche ``resultado`` para os pendentes e devolve as linhas a inserir
+
+    Args:
+        usuarios: ids existentes
+        ocupados: pares (usuario_id, data) que já têm ponto (é atualizado)
+
+    Returns:
+        list: (usuario_id, data, hora_entrada, chave) para 'ponto.inserir_lote'
+    """
+    novos = []
+    for chave, usuario_id, data, hora_entrada in pendentes:
+        if usuario_id not in usuarios:
+            resultado[chave] = ('rejeitado', 'Usuário não encontrado.')
+        elif (usuario_id, data) in ocupados:
+            resultado[chave] = ('duplicado', 'Ponto já registrado para este usuário e data.')
+        else:
+            ocupados.add((usuario_id, data))
+            novos.append((usuario_id, data, hora_entrada, chave))
+            resultado[chave] = ('criado', 'Ponto registrado com sucesso.')
+    return novos
 
 # CRUD AUDITORIA
 
+def gravar_auditorias(registros):
+    """
+    Grava um lote de auditoria com um único executemany e um commit
+
+    Usa uma conexão própria do pool: roda na thread do AuditSink, fora de requisições.
+
+    Args:
+        registros: tuplas (usuario_id, acao, ip, status, data_hora)
+    """
+    conn = get_pool().connect()
+    try:
+        repositorio.executar_lote('auditoria.inserir_lote', registros, conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+# Fila de auditoria do processo (gravada em lotes por uma thread de fundo)
+auditoria_sink = AuditSink(
+    gravar_auditorias,
+    max_queue=int(os.getenv('AUDIT_QUEUE_SIZE', 10000)),
+    batch_size=int(os.getenv('AUDIT_BATCH_SIZE', 200)),
+    flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0)),
+    spill_path=os.getenv('AUDIT_SPILL_PATH') or None,
+    # Só queda de conexão vai para o arquivo; FK/dado inválido descarta o registro ruim
+    unavailable_errors=(DatabaseUnavailableError, OperationalError, InterfaceError)
+).register_atexit()
+
+
 def registrar_auditoria(usuario_id, acao, ip, status='SUCESSO'):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO auditoria (usuario_id, acao, ip, status)
-        VALUES (%s, %s, %s, %s)
-    """, (usuario_id, acao, ip, status))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    """Enfileira o evento de auditoria (a data/hora é a do evento, não a da gravação)"""
+    auditoria_sink.enqueue(usuario_id, acao, ip, status, datetime.now())
 
 # Funções de acesso e regras de negócio podem ser expandidas conforme necessidade do sistema
@@ -0,0 +1,164 @@
+# models_async.py - Operações das APIs JSON no modo assíncrono (asgi.py)
+# 🎯 Objetivo: As mesmas consultas e transações de models.py, aguardando o banco sem prender uma thread
+#
+# Só o que app/routes/routes_async.py usa. SQL, mapeamentos e regras vêm dos módulos
+# síncronos (repositorio.CONSULTAS, Usuario, resumos, versoes, _classificar_lote_ponto);
+# aqui fica apenas a sequência de awaits de cada operação.
+
+from datetime import date
+
+from mysql.connector import IntegrityError, errorcode
+
+from app.models import repositorio_async as repositorio, resumos, versoes
+from app.models.db_async import get_connection
+from app.models.models import Usuario, _classificar_lote_ponto
+
+
+def _limite(params, limite):
+    params = list(params)
+    if limite is not None:
+        params.append(limite)
+    return params, 'LIMIT %s' if limite is not None else ''
+
+
+# ---------- usuario ----------
+
+async def listar_usuarios(colunas=Usuario.COLUNAS_RESUMO, filtro='', params=(), ordem='', limite=None):
+    """Como Usuario.listar"""
+    params, limite = _limite(params, limite)
+    return await repositorio.buscar(
+        'usuario.listar', params, linha=Usuario.de_linha,
+        colunas=', '.join(colunas), filtro=filtro, ordem=ordem, limite=limite
+    )
+
+
+async def contar_usuarios():
+    return await repositorio.valor('usuario.contar')
+
+
+async def verificar_faceid_cadastrado(user_id):
+    """Verifica se o usuário tem FaceID cadastrado (sem trafegar o BLOB)"""
+    return bool(await repositorio.valor('usuario.tem_faceid', (user_id,)))
+
+
+# ---------- tarefa ----------
+
+async def buscar_tarefas_por_usuario(usuario_id, filtro='', params=(), ordem='', limite=None):
+    """Como models.buscar_tarefas_por_usuario"""
+    params, limite = _limite([usuario_id, *params], limite)
+    return await repositorio.buscar('tarefa.por_funcionario', params, filtro=filtro, ordem=ordem, limite=limite)
+
+
+async def contar_tarefas_por_usuario(usuario_id):
+    return await repositorio.valor('tarefa.contar_por_funcionario', (usuario_id,))
+
+
+# ---------- ponto ----------
+
+async def listar_historico_ponto(usuario_id, filtro='', params=(), ordem='', limite=None):
+    """Como models.listar_historico_ponto (horas em 'HH:MM:SS')"""
+    params, limite = _limite([usuario_id, *params], limite)
+    return await repositorio.buscar('ponto.historico', params, filtro=filtro, ordem=ordem, limite=limite)
+
+
+async def contar_pontos_usuario(usuario_id):
+    return await repositorio.valor('ponto.contar_por_usuario', (usuario_id,))
+
+
+async def registrar_entrada(usuario_id, data, hora_entrada):
+    """
+    Registra a entrada do dia em um único INSERT atômico (ver models.registrar_entrada)
+
+    Returns:
+        bool: True se inseriu, False se já havia ponto para o usuário na data
+    """
+    conn = await get_connection()
+    try:
+        await repositorio.executar('ponto.inserir_entrada', (usuario_id, data, hora_entrada), conn)
+        await repositorio.executar('resumo.ponto_incrementar', (data, usuario_id), conn, coluna='registros')
+        await incrementar_versoes(conn, versoes.recurso_ponto(usuario_id))
+        await conn.commit()
+        return True
+    except IntegrityError as e:
+        await conn.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            return False
+        raise
+    finally:
+        await conn.close()
+
+
+async def sincronizar_pontos(registros, tentativas=3):
+    """
+    Aplica um lote de pontos em uma única transação (ver models.sincronizar_pontos)
+
+    Returns:
+        dict: chave -> (situação, mensagem)
+    """
+    for tentativa in range(tentativas):
+        conn = await get_connection()
+        try:
+            resultado = await _aplicar_lote_ponto(conn, registros)
+            await conn.commit()
+            return resultado
+        except IntegrityError as e:
+            await conn.rollback()
+            if e.errno != errorcode.ER_DUP_ENTRY or tentativa == tentativas - 1:
+                raise
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            await conn.close()
+
+
+async def _aplicar_lote_ponto(conn, registros):
+    resultado = {}
+    chaves = [chave for chave, _, _, _ in registros]
+    for chave in await repositorio.buscar('ponto.chaves_existentes', conn=conn, chaves=chaves):
+        resultado[chave] = ('duplicado', 'Registro já sincronizado.')
+
+    pendentes = [r for r in registros if r[0] not in resultado]
+    if not pendentes:
+        return resultado
+
+    ids = sorted({usuario_id for _, usuario_id, _, _ in pendentes})
+    usuarios = set(await repositorio.buscar('usuario.ids_existentes', conn=conn, ids=ids))
+
+    pares = {(usuario_id, data) for _, usuario_id, data, _ in pendentes}
+    datas = sorted({data for _, data in pares})
+    ocupados = set(await repositorio.buscar('ponto.ocupados', conn=conn, ids=ids, datas=datas)) & pares
+
+    novos = _classificar_lote_ponto(pendentes, usuarios, ocupados, resultado)
+    if novos:
+        await repositorio.executar_lote('ponto.inserir_lote', novos, conn)
+        await repositorio.executar('resumo.ponto_incrementar_lote', conn=conn, chaves=[c for _, _, _, c in novos])
+        await incrementar_versoes(conn, *[versoes.recurso_ponto(usuario_id) for usuario_id, _, _, _ in novos])
+    return resultado
+
+
+# ---------- resumos e versões ----------
+
+async def ler_snapshot(hoje=None, por_departamento=False):
+    """Indicadores do dashboard lidos só das tabelas de resumo (ver resumos.ler_snapshot)"""
+    hoje = hoje or date.today()
+    ponto = await repositorio.buscar('resumo.ponto_do_dia', (hoje,))
+    tarefas = await repositorio.buscar('resumo.tarefas_periodo', (resumos.inicio_janela(hoje), hoje))
+    return resumos.montar_snapshot(ponto, tarefas, por_departamento)
+
+
+async def incrementar_versoes(conn, *nomes):
+    """Incrementa a versão dos recursos, em ordem fixa (chamar antes do commit do write)"""
+    for nome in sorted(set(nomes)):
+        await repositorio.executar('versao.incrementar', (nome,), conn)
+
+
+async def ler_versoes(nomes):
+    """
+    Versões atuais dos recursos
+
+    Returns:
+        dict: nome -> (versao, atualizado_em); recursos nunca alterados ficam (0, None)
+    """
+    nomes = sorted(set(nomes))
+    return versoes.montar(nomes, await repositorio.buscar('versao.ler', nomes=nomes))
@@ -0,0 +1,411 @@
+# repositorio.py - Todas as consultas SQL do sistema, por nome
+# 🎯 Objetivo: Um lugar só para ler, ajustar e medir o SQL; cada instrução preparada uma vez por conexão
+#
+# - CONSULTAS: nome ('ponto.historico') -> SQL + mapeamento da linha (dict, escalar, ponto...)
+# - buscar/buscar_um/valor/executar rodam no cursor preparado em cache na conexão
+#   do pool (PooledConnection.prepared): o MySQL analisa a instrução uma vez e
+#   depois só recebe os parâmetros pelo protocolo binário
+# - Trechos variáveis entram como fragmentos nomeados no SQL:
+#     {filtro}, {ordem}, {colunas}  texto escrito pelo código (nunca pelo usuário)
+#     {campos}                      SET de usuario.atualizar: só nomes de
+#                                   Usuario.COLUNAS_EDITAVEIS (chaves do JSON validadas)
+#     {ids}, {chaves}               listas IN, arredondadas para potências de 2 (repetindo
+#                                   o último valor) e quebradas em blocos de LISTA_MAX:
+#                                   poucas instruções distintas para preparar
+# - executar_lote usa executemany em cursor comum (o conector junta tudo em um
+#   INSERT multi-linha, uma ida ao banco); iterar lê em streaming com conexão própria
+
+import os
+import re
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import lru_cache
+
+from app.models.db_pool import get_connection, get_pool
+
+Consulta = namedtuple('Consulta', 'nome sql linha')
+
+# Maior lista IN em uma única instrução; listas maiores viram várias execuções
+LISTA_MAX = int(os.getenv('DB_LISTA_MAX', 1024))
+
+CONSULTAS = {}
+
+_FRAGMENTO = re.compile(r'\{(\w+)\}')
+_MARCADOR = re.compile(r'%s|\{(\w+)\}')
+
+
+# ---------- mapeamento das linhas ----------
+
+def escalar(linha):
+    """Primeira coluna da linha"""
+    return next(iter(linha.values()))
+
+
+def tupla(linha):
+    return tuple(linha.values())
+
+
+def hora(valor):
+    """Coluna TIME (o conector devolve timedelta, que o JSON não serializa) como 'HH:MM:SS'"""
+    if not isinstance(valor, timedelta):
+        return valor
+    segundos = int(valor.total_seconds())
+    return f'{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}'
+
+
+def ponto(linha):
+    """Registro de ponto com as horas já em texto"""
+    for coluna in ('hora_entrada', 'hora_saida', 'total_horas'):
+        if coluna in linha:
+            linha[coluna] = hora(linha[coluna])
+    return linha
+
+
+def consulta(nome, sql, linha=dict):
+    """Registra uma consulta nomeada (o SQL é normalizado em uma linha)"""
+    if nome in CONSULTAS:
+        raise ValueError(f'Consulta já registrada: {nome}')
+    CONSULTAS[nome] = Consulta(nome, sys.intern(' '.join(sql.split())), linha)
+    return CONSULTAS[nome]
+
+
+# ---------- execução ----------
+
+@contextmanager
+def _conexao(conn):
+    if conn is not None:
+        yield conn
+        return
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _executar(conn, sql, params):
+    """Executa no cursor preparado da conexão; devolve (cursor, fechar depois?)"""
+    preparado = getattr(conn, 'prepared', None)
+    if preparado is not None:
+        cursor, fechar = preparado(sql), False
+    else:
+        # Conexão fora do pool (scripts): prepara só para esta execução
+        cursor, fechar = conn.cursor(prepared=True, dictionary=True), True
+    cursor.execute(sql, params)
+    return cursor, fechar
+
+
+def _preencher(valores):
+    tamanho = 1 << (len(valores) - 1).bit_length()
+    return valores + [valores[-1]] * (tamanho - len(valores))
+
+
+@lru_cache(maxsize=1024)
+def _variante(sql, textos, tamanhos):
+    """
+    SQL final de uma combinação de fragmentos
+
+    Returns:
+        tuple: (sql, ordem dos parâmetros: None = próximo parâmetro comum, nome = lista)
+    """
+    textos, tamanhos = dict(textos), dict(tamanhos)
+    sql = _FRAGMENTO.sub(lambda m: textos[m.group(1)] if m.group(1) in textos else m.group(0), sql)
+
+    ordem = []
+
+    def marcador(m):
+        nome = m.group(1)
+        if nome is None:
+            ordem.append(None)
+            return m.group(0)
+        if nome not in tamanhos:
+            raise KeyError(f'Fragmento {{{nome}}} não informado')
+        ordem.append(nome)
+        return '(' + ', '.join(['%s'] * tamanhos[nome]) + ')'
+
+    sql = _MARCADOR.sub(marcador, sql)
+    return sys.intern(' '.join(sql.split())), tuple(ordem)
+
+
+def _instrucoes(consulta, params, fragmentos):
+    """
+    (sql, parâmetros) a executar; mais de uma quando a maior lista passa de LISTA_MAX
+
+    Uma lista vazia não gera instrução (IN () não existe no SQL).
+    """
+    textos = tuple(sorted((k, v) for k, v in fragmentos.items() if isinstance(v, str)))
+    listas = {k: list(v) for k, v in fragmentos.items() if not isinstance(v, str)}
+    if not listas:
+        sql, _ = _variante(consulta.sql, textos, ())
+        yield sql, tuple(params)
+        return
+    if not all(listas.values()):
+        return
+
+    maior = max(listas, key=lambda k: len(listas[k]))
+    for inicio in range(0, len(listas[maior]), LISTA_MAX):
+        blocos = dict(listas)
+        blocos[maior] = listas[maior][inicio:inicio + LISTA_MAX]
+        blocos = {k: _preencher(v) for k, v in blocos.items()}
+        sql, ordem = _variante(consulta.sql, textos, tuple(sorted((k, len(v)) for k, v in blocos.items())))
+
+        comuns = iter(params)
+        valores = []
+        for item in ordem:
+            if item is None:
+                valores.append(next(comuns))
+            else:
+                valores.extend(blocos[item])
+        yield sql, tuple(valores)
+
+
+def buscar(nome, params=(), conn=None, linha=None, **fragmentos):
+    """
+    Linhas da consulta, já mapeadas
+
+    Args:
+        params: parâmetros %s na ordem em que aparecem (fragmentos de texto incluídos)
+        conn: conexão da transação em andamento (padrão: a da requisição)
+        linha: mapeamento no lugar do registrado na consulta (ex.: Usuario.de_linha)
+        fragmentos: textos e listas IN usados no SQL ({filtro}, {ids}...)
+    """
+    consulta = CONSULTAS[nome]
+    mapear = linha or consulta.linha
+    linhas = []
+    with _conexao(conn) as conn:
+        for sql, valores in _instrucoes(consulta, params, fragmentos):
+            cursor, fechar = _executar(conn, sql, valores)
+            linhas.extend(cursor.fetchall())
+            if fechar:
+                cursor.close()
+    return linhas if mapear is dict else [mapear(row) for row in linhas]
+
+
+def buscar_um(nome, params=(), conn=None, linha=None, **fragmentos):
+    """Primeira linha da consulta (ou None)"""
+    linhas = buscar(nome, params, conn, linha, **fragmentos)
+    return linhas[0] if linhas else None
+
+
+def valor(nome, params=(), conn=None, **fragmentos):
+    """Primeira coluna da primeira linha (ou None)"""
+    return buscar_um(nome, params, conn, escalar, **fragmentos)
+
+
+def executar(nome, params=(), conn=None, **fragmentos):
+    """
+    INSERT/UPDATE/DELETE; quem abriu a transação faz o commit
+
+    Returns:
+        int: linhas afetadas
+    """
+    consulta = CONSULTAS[nome]
+    afetadas = 0
+    with _conexao(conn) as conn:
+        for sql, valores in _instrucoes(consulta, params, fragmentos):
+            cursor, fechar = _executar(conn, sql, valores)
+            afetadas += max(cursor.rowcount or 0, 0)
+            if fechar:
+                cursor.close()
+    return afetadas
+
+
+def executar_lote(nome, linhas, conn=None):
+    """
+    A mesma instrução para várias linhas de parâmetros em uma ida ao banco
+
+    Cursor comum de propósito: com prepared statement o conector faria uma
+    execução por linha; o executemany comum envia um único INSERT multi-linha.
+
+    Returns:
+        int: linhas afetadas
+    """
+    sql = CONSULTAS[nome].sql
+    with _conexao(conn) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(sql, linhas)
+            return max(cursor.rowcount or 0, 0)
+        finally:
+            cursor.close()
+
+
+def iterar(nome, params=(), lote=500):
+    """
+    Linhas (tuplas) lidas do servidor em lotes, sem carregar o resultado inteiro
+
+    Usa uma conexão própria do pool (não a da requisição) com cursor sem
+    buffer. A consulta só é executada no primeiro ``next()``.
+    """
+    sql = CONSULTAS[nome].sql
+    conn = get_pool().connect()
+    terminou = False
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(lote)
+            if not rows:
+                break
+            yield from rows
+        cursor.close()
+        terminou = True
+    finally:
+        # Leitura interrompida deixa linhas não lidas no socket: descarta a conexão
+        conn.release(discard=not terminou)
+
+
+# ---------- usuario ----------
+
+consulta('usuario.por_id', "SELECT {colunas} FROM usuario WHERE id = %s")
+consulta('usuario.por_email', "SELECT {colunas} FROM usuario WHERE email = %s")
+consulta('usuario.por_ids', "SELECT {colunas} FROM usuario WHERE id IN {ids}")
+consulta('usuario.listar', "SELECT {colunas} FROM usuario {filtro} {ordem} {limite}")
+consulta('usuario.contar', "SELECT COUNT(*) AS total FROM usuario", escalar)
+consulta('usuario.ids_existentes', "SELECT id FROM usuario WHERE id IN {ids}", escalar)
+consulta('usuario.emails_existentes', "SELECT email FROM usuario WHERE email IN {emails}", escalar)
+consulta('usuario.inserir', """
+    INSERT INTO usuario (nome, email, senha, cargo, departamento, rosto)
+    VALUES (%s, %s, %s, %s, %s, %s)
+""")
+consulta('usuario.inserir_lote', """
+    INSERT INTO usuario (nome, email, senha, cargo, departamento, status)
+    VALUES (%s, %s, %s, %s, %s, %s)
+""")
+consulta('usuario.atualizar', "UPDATE usuario SET {campos} WHERE id = %s")
+consulta('usuario.excluir', "DELETE FROM usuario WHERE id = %s")
+
+# FaceID: o BLOB só trafega nas consultas que precisam dele
+consulta('usuario.rosto', "SELECT rosto FROM usuario WHERE id = %s", escalar)
+consulta('usuario.atualizar_rosto', "UPDATE usuario SET rosto = %s, rosto_atualizado_em = NOW() WHERE id = %s")
+consulta('usuario.com_faceid', "SELECT id, rosto FROM usuario WHERE rosto IS NOT NULL AND rosto != ''")
+consulta('usuario.ids_com_faceid', "SELECT id FROM usuario WHERE rosto IS NOT NULL AND rosto != ''", escalar)
+consulta('usuario.faceid_alterados_desde', "SELECT id, rosto FROM usuario WHERE rosto_atualizado_em >= %s")
+consulta('usuario.contador_faceid', "SELECT versao FROM versao_recurso WHERE nome = 'faceid'", escalar)
+consulta('usuario.versao_faceid', """
+    SELECT COALESCE((SELECT versao FROM versao_recurso WHERE nome = 'faceid'), 0) AS versao,
+           COUNT(*) AS total, MAX(rosto_atualizado_em) AS ultima
+    FROM usuario WHERE rosto IS NOT NULL AND rosto != ''
+""", tupla)
+consulta('usuario.tem_faceid', "SELECT rosto IS NOT NULL AND rosto != '' AS tem FROM usuario WHERE id = %s", escalar)
+
+
+# ---------- tarefa ----------
+
+consulta('tarefa.inserir', "INSERT INTO tarefa (titulo, descricao, gerente_id) VALUES (%s, %s, %s)")
+consulta('tarefa.por_funcionario', """
+    SELECT t.id, t.titulo, t.status, t.data_criacao, t.data_conclusao
+    FROM tarefa t
+    JOIN funcionario_tarefa ft ON t.id = ft.tarefa_id
+    WHERE ft.funcionario_id = %s {filtro}
+    {ordem} {limite}
+""")
+consulta('tarefa.contar_por_funcionario', """
+    SELECT COUNT(*) AS total FROM funcionario_tarefa WHERE funcionario_id = %s
+""", escalar)
+# Relatório: mesma ordem no JSON e no download em streaming
+consulta('tarefa.periodo', """
+    SELECT t.id, t.titulo, t.status, t.data_criacao, t.data_conclusao, u.nome AS gerente
+    FROM tarefa t
+    LEFT JOIN usuario u ON t.gerente_id = u.id
+    WHERE t.data_criacao >= %s AND t.data_criacao <= %s
+    ORDER BY t.data_criacao, t.id
+""")
+
+
+# ---------- ponto ----------
+
+consulta('ponto.inserir_entrada', """
+    INSERT INTO ponto (usuario_id, data, hora_entrada, status) VALUES (%s, %s, %s, 'REGISTRADO')
+""")
+consulta('ponto.inserir_lote', """
+    INSERT INTO ponto (usuario_id, data, hora_entrada, status, chave_idempotencia)
+    VALUES (%s, %s, %s, 'REGISTRADO', %s)
+""")
+consulta('ponto.historico', """
+    SELECT id, data, hora_entrada, hora_saida, total_horas, status
+    FROM ponto WHERE usuario_id = %s {filtro} {ordem} {limite}
+""", ponto)
+consulta('ponto.contar_por_usuario', "SELECT COUNT(*) AS total FROM ponto WHERE usuario_id = %s", escalar)
+consulta('ponto.chaves_existentes', """
+    SELECT chave_idempotencia FROM ponto WHERE chave_idempotencia IN {chaves}
+""", escalar)
+# usuario_id IN (...) AND data IN (...) usa a chave única (usuario_id, data) em
+# qualquer banco; quem chama descarta os pares que não pediu
+consulta('ponto.ocupados', "SELECT usuario_id, data FROM ponto WHERE usuario_id IN {ids} AND data IN {datas}", tupla)
+
+
+# ---------- resumos do dashboard ----------
+
+consulta('resumo.ponto_incrementar', """
+    INSERT INTO resumo_ponto_dia (dia, departamento, {coluna})
+    SELECT %s, COALESCE(departamento, ''), 1 FROM usuario WHERE id = %s
+    ON DUPLICATE KEY UPDATE {coluna} = {coluna} + 1
+""")
+consulta('resumo.ponto_incrementar_lote', """
+    INSERT INTO resumo_ponto_dia (dia, departamento, registros)
+    SELECT dia, departamento, registros FROM (
+        SELECT p.data AS dia, COALESCE(u.departamento, '') AS departamento, COUNT(*) AS registros
+        FROM ponto p
+        JOIN usuario u ON u.id = p.usuario_id
+        WHERE p.chave_idempotencia IN {chaves}
+        GROUP BY p.data, COALESCE(u.departamento, '')
+    ) novos
+    ON DUPLICATE KEY UPDATE registros = resumo_ponto_dia.registros + novos.registros
+""")
+consulta('resumo.tarefa_incrementar', """
+    INSERT INTO resumo_tarefa_dia (dia, departamento, {coluna})
+    SELECT %s, COALESCE((SELECT departamento FROM usuario WHERE id = %s), ''), 1
+    ON DUPLICATE KEY UPDATE {coluna} = {coluna} + 1
+""")
+consulta('resumo.ponto_limpar', "DELETE FROM resumo_ponto_dia WHERE dia >= %s")
+consulta('resumo.ponto_recalcular', """
+    INSERT INTO resumo_ponto_dia (dia, departamento, registros, faltas, justificados)
+    SELECT p.data, COALESCE(u.departamento, ''),
+           SUM(p.status = 'REGISTRADO'), SUM(p.status = 'FALTA'), SUM(p.status = 'JUSTIFICADO')
+    FROM ponto p
+    JOIN usuario u ON u.id = p.usuario_id
+    WHERE p.data >= %s
+    GROUP BY p.data, COALESCE(u.departamento, '')
+""")
+consulta('resumo.tarefa_limpar', "DELETE FROM resumo_tarefa_dia WHERE dia >= %s")
+consulta('resumo.tarefa_recalcular', """
+    INSERT INTO resumo_tarefa_dia (dia, departamento, criadas, concluidas)
+    SELECT dia, departamento, SUM(criadas), SUM(concluidas)
+    FROM (
+        SELECT DATE(t.data_criacao) AS dia, COALESCE(u.departamento, '') AS departamento,
+               1 AS criadas, 0 AS concluidas
+        FROM tarefa t LEFT JOIN usuario u ON u.id = t.gerente_id
+        WHERE t.data_criacao >= %s
+        UNION ALL
+        SELECT DATE(t.data_conclusao), COALESCE(u.departamento, ''), 0, 1
+        FROM tarefa t LEFT JOIN usuario u ON u.id = t.gerente_id
+        WHERE t.status = 'CONCLUIDA' AND t.data_conclusao >= %s
+    ) eventos
+    GROUP BY dia, departamento
+""")
+consulta('resumo.ponto_do_dia', "SELECT departamento, registros, faltas FROM resumo_ponto_dia WHERE dia = %s")
+consulta('resumo.tarefas_periodo', """
+    SELECT departamento, SUM(criadas) AS criadas, SUM(concluidas) AS concluidas
+    FROM resumo_tarefa_dia WHERE dia >= %s AND dia <= %s
+    GROUP BY departamento
+""")
+
+
+# ---------- versões (cache HTTP) ----------
+
+consulta('versao.incrementar', """
+    INSERT INTO versao_recurso (nome, versao, atualizado_em) VALUES (%s, 1, NOW())
+    ON DUPLICATE KEY UPDATE versao = versao + 1, atualizado_em = NOW()
+""")
+consulta('versao.ler', "SELECT nome, versao, atualizado_em FROM versao_recurso WHERE nome IN {nomes}", tupla)
+
+
+# ---------- auditoria ----------
+
+consulta('auditoria.inserir_lote', """
+    INSERT INTO auditoria (usuario_id, acao, ip, status, data_hora)
+    VALUES (%s, %s, %s, %s, %s)
+""")
@@ -0,0 +1,71 @@
+# repositorio_async.py - Consultas nomeadas do repositório executadas no pool assíncrono
+# 🎯 Objetivo: O mesmo catálogo (repositorio.CONSULTAS), fragmentos e mapeamentos no modo ASGI
+#
+# Mesma assinatura de repositorio.buscar/buscar_um/valor/executar/executar_lote,
+# com await. As listas IN continuam arredondadas e em blocos (_instrucoes): o SQL
+# enviado é idêntico ao do modo síncrono, então métricas e planos se comparam.
+
+from contextlib import asynccontextmanager
+
+from app.models.db_async import get_connection
+from app.models.repositorio import CONSULTAS, _instrucoes, escalar
+
+
+@asynccontextmanager
+async def _conexao(conn):
+    if conn is not None:
+        yield conn
+        return
+    conn = await get_connection()
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+async def buscar(nome, params=(), conn=None, linha=None, **fragmentos):
+    """Linhas da consulta, já mapeadas (ver repositorio.buscar)"""
+    consulta = CONSULTAS[nome]
+    mapear = linha or consulta.linha
+    linhas = []
+    async with _conexao(conn) as conn:
+        for sql, valores in _instrucoes(consulta, params, fragmentos):
+            linhas.extend(await conn.fetchall(sql, valores))
+    return linhas if mapear is dict else [mapear(row) for row in linhas]
+
+
+async def buscar_um(nome, params=(), conn=None, linha=None, **fragmentos):
+    """Primeira linha da consulta (ou None)"""
+    linhas = await buscar(nome, params, conn, linha, **fragmentos)
+    return linhas[0] if linhas else None
+
+
+async def valor(nome, params=(), conn=None, **fragmentos):
+    """Primeira coluna da primeira linha (ou None)"""
+    return await buscar_um(nome, params, conn, escalar, **fragmentos)
+
+
+async def executar(nome, params=(), conn=None, **fragmentos):
+    """
+    INSERT/UPDATE/DELETE; quem abriu a transação faz o commit
+
+    Returns:
+        int: linhas afetadas
+    """
+    consulta = CONSULTAS[nome]
+    afetadas = 0
+    async with _conexao(conn) as conn:
+        for sql, valores in _instrucoes(consulta, params, fragmentos):
+            afetadas += max(await conn.execute(sql, valores) or 0, 0)
+    return afetadas
+
+
+async def executar_lote(nome, linhas, conn=None):
+    """
+    A mesma instrução para várias linhas de parâmetros em uma ida ao banco
+
+    Returns:
+        int: linhas afetadas
+    """
+    async with _conexao(conn) as conn:
+        return max(await conn.executemany(CONSULTAS[nome].sql, linhas) or 0, 0)
@@ -0,0 +1,142 @@
+# resumos.py - Tabelas de resumo (rollups) do dashboard
+# 🎯 Objetivo: Dashboard em tempo constante, sem agregar ponto/tarefa/usuario a cada leitura
+#
+# resumo_ponto_dia   (dia, departamento) -> registros, faltas, justificados
+# resumo_tarefa_dia  (dia, departamento) -> criadas, concluidas
+#
+# - Os writes de ponto e tarefa incrementam o resumo na mesma transação
+#   (INSERT ... ON DUPLICATE KEY UPDATE)
+# - reconciliar() recalcula uma janela recente a partir das tabelas de origem,
+#   corrigindo o que mudou por caminhos sem incremento (SQL manual, conclusão
+#   de tarefas, exclusões). Rodar periodicamente: python -m database.reconciliar_resumos
+
+from datetime import date, timedelta
+
+from app.models import repositorio
+from app.models.db_pool import get_pool
+
+# Coluna do resumo de ponto incrementada por status do registro
+_COLUNA_STATUS_PONTO = {
+    'REGISTRADO': 'registros',
+    'FALTA': 'faltas',
+    'JUSTIFICADO': 'justificados',
+}
+
+# Janela usada no indicador de eficiência (tarefas concluídas / criadas)
+JANELA_EFICIENCIA_DIAS = 30
+
+
+def incrementar_ponto(conn, usuario_id, dia, status='REGISTRADO'):
+    """Soma um registro de ponto ao resumo do dia (chamar antes do commit do INSERT)"""
+    coluna = _COLUNA_STATUS_PONTO.get(status, 'registros')
+    repositorio.executar('resumo.ponto_incrementar', (dia, usuario_id), conn, coluna=coluna)
+
+
+def incrementar_ponto_lote(conn, chaves):
+    """
+    Soma ao resumo os pontos recém-inseridos com estas chaves de idempotência
+
+    Uma única instrução agrupada por dia/departamento (chamar antes do commit).
+    """
+    repositorio.executar('resumo.ponto_incrementar_lote', conn=conn, chaves=list(chaves))
+
+
+def incrementar_tarefa(conn, gerente_id, dia, coluna='criadas'):
+    """Soma uma tarefa criada (ou concluída) ao resumo do dia do departamento do gerente"""
+    if coluna not in ('criadas', 'concluidas'):
+        raise ValueError(f'Coluna de resumo inválida: {coluna}')
+    repositorio.executar('resumo.tarefa_incrementar', (dia, gerente_id), conn, coluna=coluna)
+
+
+def reconciliar(dias=35, hoje=None):
+    """
+    Recalcula os resumos dos últimos ``dias`` dias a partir das tabelas de origem
+
+    Usa as mesmas agregações dos incrementos, em uma única transação por tabela.
+
+    Returns:
+        dict: {'inicio': date, 'ponto': linhas gravadas, 'tarefa': linhas gravadas}
+    """
+    hoje = hoje or date.today()
+    inicio = hoje - timedelta(days=dias)
+    resumo = {'inicio': inicio}
+
+    conn = get_pool().connect()
+    try:
+        repositorio.executar('resumo.ponto_limpar', (inicio,), conn)
+        resumo['ponto'] = repositorio.executar('resumo.ponto_recalcular', (inicio,), conn)
+        conn.commit()
+
+        repositorio.executar('resumo.tarefa_limpar', (inicio,), conn)
+        resumo['tarefa'] = repositorio.executar('resumo.tarefa_recalcular', (inicio, inicio), conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return resumo
+
+
+def ler_snapshot(hoje=None, por_departamento=False):
+    """
+    Indicadores do dashboard lidos só das tabelas de resumo
+
+    O custo depende da janela (JANELA_EFICIENCIA_DIAS x departamentos), não do
+    tamanho do histórico.
+
+    Returns:
+        dict: {'activeUsers', 'efficiency', 'absences', 'tasksCreated', 'tasksCompleted'}
+              e 'departments' (lista por departamento) se por_departamento
+    """
+    hoje = hoje or date.today()
+    inicio = inicio_janela(hoje)
+
+    conn = get_pool().connect()
+    try:
+        ponto = repositorio.buscar('resumo.ponto_do_dia', (hoje,), conn)
+        tarefas = repositorio.buscar('resumo.tarefas_periodo', (inicio, hoje), conn)
+    finally:
+        conn.close()
+    return montar_snapshot(ponto, tarefas, por_departamento)
+
+
+def inicio_janela(hoje):
+    """Primeiro dia da janela do indicador de eficiência que termina em ``hoje``"""
+    return hoje - timedelta(days=JANELA_EFICIENCIA_DIAS - 1)
+
+
+def montar_snapshot(ponto, tarefas, por_departamento=False):
+    """Indicadores a partir das linhas de 'resumo.ponto_do_dia' e 'resumo.tarefas_periodo'"""
+    ponto = {row['departamento']: row for row in ponto}
+    tarefas = {row['departamento']: row for row in tarefas}
+
+    criadas = sum(int(row['criadas'] or 0) for row in tarefas.values())
+    concluidas = sum(int(row['concluidas'] or 0) for row in tarefas.values())
+    snapshot = {
+        'activeUsers': sum(int(row['registros'] or 0) for row in ponto.values()),
+        'absences': sum(int(row['faltas'] or 0) for row in ponto.values()),
+        'tasksCreated': criadas,
+        'tasksCompleted': concluidas,
+        'efficiency': _eficiencia(criadas, concluidas),
+    }
+
+    if por_departamento:
+        snapshot['departments'] = [
+            {
+                'department': departamento or 'Sem departamento',
+                'activeUsers': int(ponto.get(departamento, {}).get('registros') or 0),
+                'efficiency': _eficiencia(
+                    int(tarefas.get(departamento, {}).get('criadas') or 0),
+                    int(tarefas.get(departamento, {}).get('concluidas') or 0)
+                ),
+            }
+            for departamento in sorted(set(ponto) | set(tarefas))
+        ]
+    return snapshot
+
+
+def _eficiencia(criadas, concluidas):
+    if not criadas:
+        return 0
+    return min(100, round(100 * concluidas / criadas))
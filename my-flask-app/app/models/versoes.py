@@ -0,0 +1,41 @@
+# versoes.py - Versão por recurso para validação de cache HTTP (ETag/Last-Modified)
+# 🎯 Objetivo: Saber se uma listagem mudou com uma leitura por chave primária
+#
+# Cada write incrementa a versão do recurso afetado na mesma transação:
+#   'usuario'          - listagem de usuários
+#   'tarefa'           - tarefas
+#   'ponto:<usuario>'  - histórico de ponto de um usuário (sem linha quente global)
+#   'faceid'           - rostos cadastrados (galeria FaceID: o timestamp de segundos
+#                        não distingue dois cadastros no mesmo segundo)
+
+from app.models import repositorio
+
+
+def recurso_ponto(usuario_id):
+    return f'ponto:{usuario_id}'
+
+
+def incrementar(conn, *nomes):
+    """Incrementa a versão dos recursos (chamar antes do commit do write)"""
+    # Ordem fixa evita deadlock entre transações que tocam os mesmos recursos
+    for nome in sorted(set(nomes)):
+        repositorio.executar('versao.incrementar', (nome,), conn)
+
+
+def ler(nomes):
+    """
+    Versões atuais dos recursos
+
+    Returns:
+        dict: nome -> (versao, atualizado_em); recursos nunca alterados ficam (0, None)
+    """
+    nomes = sorted(set(nomes))
+    return montar(nomes, repositorio.buscar('versao.ler', nomes=nomes))
+
+
+def montar(nomes, linhas):
+    """nome -> (versao, atualizado_em) a partir das linhas de 'versao.ler'"""
+    versoes = {nome: (0, None) for nome in nomes}
+    for nome, versao, atualizado_em in linhas:
+        versoes[nome] = (versao, atualizado_em)
+    return versoes
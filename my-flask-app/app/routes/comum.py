@@ -0,0 +1,92 @@
+"""Comum - Partes compartilhadas pelas rotas Flask (routes.py) e Quart (routes_async.py)
+
+Corpos dos handlers de erro, auditoria, validadores de cache e leitura de
+parâmetros. Nada aqui conhece o framework: quem chama passa a requisição/sessão
+(ou o resultado já lido do banco, síncrono ou assíncrono) e monta a resposta.
+"""
+
+from app.controllers.controller import AuditoriaController
+from app.models import versoes
+from app.utils.face_executor import FaceExecutorBusy, FaceExecutorTimeout, FaceExecutorUnavailable
+
+MENSAGEM_BANCO_INDISPONIVEL = 'Banco de dados indisponível. Tente novamente em instantes.'
+MENSAGEM_PONTO_DE_TERCEIROS = 'Você só pode registrar o próprio ponto.'
+
+# Papéis que lançam ponto pela equipe na sincronização em lote
+PAPEIS_GESTAO = ('GOVERNANTE', 'SUPERVISOR')
+
+
+def banco_indisponivel(error):
+    """Banco fora do ar ou pool esgotado: (corpo, 503)"""
+    print(f"Banco de dados indisponível: {error}")
+    return {'success': False, 'message': MENSAGEM_BANCO_INDISPONIVEL}, 503
+
+
+def processamento_facial_indisponivel(error):
+    """
+    Fila do pool facial cheia ou FaceID fora deste worker (503), job estourou o tempo (504)
+
+    Returns:
+        tuple: (corpo, status, headers)
+    """
+    if isinstance(error, FaceExecutorBusy):
+        return {'success': False, 'busy': True, 'message': str(error)}, 503, {'Retry-After': '1'}
+    if isinstance(error, FaceExecutorUnavailable):
+        status_code = 503
+    else:
+        status_code = 504 if isinstance(error, FaceExecutorTimeout) else 500
+    return {'success': False, 'message': str(error)}, status_code, {}
+
+
+def auditar(req, usuario_id, acao, sucesso=True):
+    """Evento de auditoria com o IP da requisição (só enfileira no AuditSink)"""
+    AuditoriaController.registrar_evento(usuario_id, acao, req.remote_addr, sucesso)
+
+
+def material_versoes(atuais):
+    """Validador de cache a partir de versoes.ler(): (versões dos recursos, última alteração)"""
+    datas = [atualizado_em for _, atualizado_em in atuais.values() if atualizado_em]
+    return [atuais[nome][0] for nome in sorted(atuais)], max(datas, default=None)
+
+
+def material_dashboard(data):
+    """Validador do dashboard: o próprio snapshot em cache (sem o timestamp)"""
+    return {k: v for k, v in data.items() if k != 'timestamp'}, None
+
+
+def recurso_historico_ponto(req):
+    """Recurso de versão do histórico pedido, ou None (sem usuario_id: não cacheia)"""
+    usuario_id = req.args.get('usuario_id')
+    return versoes.recurso_ponto(usuario_id) if usuario_id else None
+
+
+def paginacao(req):
+    """Parâmetros de paginação da query string: (cursor, limit, total)"""
+    return (
+        req.args.get('cursor'),
+        req.args.get('limit'),
+        req.args.get('total', '').lower() in ('1', 'true', 'sim')
+    )
+
+
+def registros_do_lote(data):
+    """Lista 'registros' do corpo da sincronização (None se o corpo não for um objeto JSON)"""
+    return data.get('registros') if isinstance(data, dict) else None
+
+
+def lote_de_terceiros(registros, sessao):
+    """
+    True se uma sessão fora da gestão tenta lançar ponto de outro usuário
+
+    Registros malformados ficam para a validação do controller; sem o id na
+    sessão (login sem cadastro no banco) nada é aceito.
+    """
+    if 'user' not in sessao or sessao.get('user_role') in PAPEIS_GESTAO:
+        return False
+    if not isinstance(registros, list):
+        return False
+    proprio = sessao.get('user_id')
+    return any(
+        proprio is None or str(registro.get('usuario_id')) != str(proprio)
+        for registro in registros if isinstance(registro, dict)
+    )
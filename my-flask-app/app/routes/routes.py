@@ -1,6 +1,12 @@
 """Routes - Camada de roteamento HTTP (apenas recebe requisições e delega para controllers)"""
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+import hmac
+import os
+
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app,
+    Response, stream_with_context
+)
 from app.controllers.controller import (
     UsuarioController,
     TarefaController,
@@ -10,10 +16,54 @@ from app.controllers.controller import (
     AuditoriaController,
     FaceIDController
 )
+from app.models.db_pool import DatabaseUnavailableError
+from app.routes import comum
+from app.models import versoes
+from app.utils.http_cache import condicional
+from app.utils import metrics, spreadsheet
+from app.utils.face_executor import FaceExecutorError, prontidao
 
 main = Blueprint('main', __name__)
 
 
+@main.app_errorhandler(DatabaseUnavailableError)
+def banco_indisponivel(error):
+    """Banco fora do ar ou pool esgotado: 503 para APIs, página de aviso (sem derrubar a sessão) para o resto"""
+    corpo, status_code = comum.banco_indisponivel(error)
+    if request.path.startswith('/api/') or request.is_json:
+        return jsonify(corpo), status_code
+    return render_template('indisponivel.html', mensagem=corpo['message']), status_code, {'Retry-After': '5'}
+
+
+@main.app_errorhandler(FaceExecutorError)
+def processamento_facial_indisponivel(error):
+    corpo, status_code, headers = comum.processamento_facial_indisponivel(error)
+    return jsonify(corpo), status_code, headers
+
+
+def _auditar(usuario_id, acao, sucesso=True):
+    comum.auditar(request, usuario_id, acao, sucesso)
+
+
+def _validar_versoes(*nomes):
+    return comum.material_versoes(versoes.ler(nomes))
+
+
+def _validar_dashboard():
+    if 'user' not in session:
+        return None
+    return comum.material_dashboard(DashboardController.obter_dados_dashboard(session.get('user_role')))
+
+
+def _validar_historico_ponto():
+    recurso = comum.recurso_historico_ponto(request)
+    return _validar_versoes(recurso) if recurso else None
+
+
+def _paginacao():
+    return comum.paginacao(request)
+
+
 # ==================== ROTAS DE AUTENTICAÇÃO ====================
 
 @main.route('/')
@@ -38,6 +88,11 @@ def login():
             session['user'] = user_data['name']
             session['user_role'] = user_data['role']
             session['user_email'] = email
+            try:
+                session['user_id'] = UsuarioController.obter_id_por_email(email).get('id')
+            except DatabaseUnavailableError:
+                # O login ainda não depende do banco; sem o id, o ponto em lote fica restrito à gestão
+                session['user_id'] = None
             flash('Login realizado com sucesso!', 'success')
             return redirect(url_for('main.dashboard'))
         else:
@@ -177,6 +232,7 @@ def faceid_setup():
 # ==================== API - DASHBOARD ====================
 
 @main.route('/api/dashboard-data')
+@condicional(_validar_dashboard)
 def dashboard_data():
     """Retorna dados do dashboard"""
     if 'user' not in session:
@@ -193,35 +249,56 @@ def health_check():
     return jsonify({'status': 'ok', 'timestamp': time.time()})
 
 
+@main.route('/api/ready')
+def readiness_check():
+    """Prontidão do worker (probe do balanceador): 503 enquanto a pilha facial aquece no papel 'face'"""
+    pronto, corpo = prontidao()
+    return jsonify({'status': 'ok' if pronto else 'aquecendo', **corpo}), 200 if pronto else 503
+
+
+@main.route('/metrics')
+def metrics_endpoint():
+    """Métricas do processo no formato texto do Prometheus (só com METRICS_TOKEN definido)"""
+    token = os.getenv('METRICS_TOKEN')
+    enviado = request.headers.get('Authorization', '')
+    if not token or not hmac.compare_digest(enviado.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+        return Response('Acesso não autorizado\n', status=403, mimetype='text/plain')
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 # ==================== API - TAREFAS ====================
 
 @main.route('/api/tarefas', methods=['GET'])
+@condicional(lambda: _validar_versoes('tarefa'))
 def listar_tarefas():
     """Lista tarefas filtradas por usuário"""
     if current_app.config.get('TESTING'):
         return jsonify({'tarefas': []}), 200
     
     usuario_id = request.args.get('usuario_id')
-    result = TarefaController.listar_tarefas_usuario(usuario_id)
+    result = TarefaController.listar_tarefas_usuario(usuario_id, *_paginacao())
     
     if result['success']:
-        return jsonify({'tarefas': result['tarefas']}), 200
+        result.pop('success')
+        return jsonify(result), 200
     return jsonify({'success': False, 'message': result['message']}), 400
 
 
 # ==================== API - PONTO ELETRÔNICO ====================
 
 @main.route('/api/ponto/historico', methods=['GET'])
+@condicional(_validar_historico_ponto)
 def historico_ponto():
     """Retorna histórico de ponto de um usuário"""
     if current_app.config.get('TESTING'):
         return jsonify({'historico': []}), 200
     
     usuario_id = request.args.get('usuario_id')
-    result = PontoController.listar_historico(usuario_id)
+    result = PontoController.listar_historico(usuario_id, *_paginacao())
     
     if result['success']:
-        return jsonify({'historico': result['historico']}), 200
+        result.pop('success')
+        return jsonify(result), 200
     return jsonify({'success': False, 'message': result['message']}), 400
 
 
@@ -238,17 +315,42 @@ def registrar_ponto():
     localizacao = data.get('localizacao')
     
     result = PontoController.registrar_ponto(usuario_id, data_ponto, hora_entrada, localizacao)
-    
     if result['success']:
+        _auditar(usuario_id, 'REGISTRO_PONTO')
         return jsonify(result), 201
     
+    # Só audita usuário que o banco já validou (o ponto duplicado é dele):
+    # um usuario_id qualquer vindo do cliente violaria a FK de auditoria
     status_code = 409 if 'já registrado' in result['message'] else 400
+    if status_code == 409:
+        _auditar(usuario_id, 'REGISTRO_PONTO', False)
     return jsonify(result), status_code
 
 
+@main.route('/api/ponto/sincronizar', methods=['POST'])
+def sincronizar_ponto():
+    """Registra um lote de pontos com chaves de idempotência (dispositivos offline, equipes)"""
+    if not current_app.config.get('TESTING') and 'user' not in session:
+        return jsonify({'success': False, 'message': 'Não autenticado'}), 401
+    
+    registros = comum.registros_do_lote(request.get_json(force=True, silent=True))
+    if comum.lote_de_terceiros(registros, session):
+        return jsonify({'success': False, 'message': comum.MENSAGEM_PONTO_DE_TERCEIROS}), 403
+    result = PontoController.sincronizar_pontos(registros)
+    
+    if not result['success']:
+        return jsonify(result), 400
+    
+    for item in result['resultados']:
+        if item['situacao'] == 'criado':
+            _auditar(registros[item['indice']].get('usuario_id'), 'REGISTRO_PONTO')
+    return jsonify(result), 200
+
+
 # ==================== API - USUÁRIOS ====================
 
 @main.route('/usuarios/listar', methods=['GET'])
+@condicional(lambda: _validar_versoes('usuario'))
 def listar_usuarios():
     """Lista todos os usuários"""
     if current_app.config.get('TESTING'):
@@ -258,10 +360,11 @@ def listar_usuarios():
         if 'user' not in session or session.get('user_role') != 'GOVERNANTE':
             return jsonify({'usuarios': [], 'error': 'Acesso não autorizado'}), 200
     
-    result = UsuarioController.listar_usuarios()
+    result = UsuarioController.listar_usuarios(*_paginacao())
     
     if result['success']:
-        return jsonify({'usuarios': result['usuarios']}), 200
+        result.pop('success')
+        return jsonify(result), 200
     return jsonify({'usuarios': [], 'error': result.get('message', 'Erro desconhecido')}), 200
 
 
@@ -290,6 +393,32 @@ def cadastrar_usuario_ajax():
     return jsonify(result), 400
 
 
+@main.route('/usuarios/importar', methods=['POST'])
+def importar_usuarios():
+    """Importa usuários em lote de uma planilha CSV ou XLSX (campo 'arquivo')"""
+    if 'user' not in session or session.get('user_role') != 'GOVERNANTE':
+        return jsonify({'success': False, 'message': 'Acesso não autorizado'}), 403
+    
+    arquivo = request.files.get('arquivo')
+    if not arquivo or not arquivo.filename:
+        return jsonify({'success': False, 'message': 'Envie a planilha no campo "arquivo".'}), 400
+    
+    formato = spreadsheet.formato_do_arquivo(arquivo.filename)
+    if not formato:
+        return jsonify({'success': False, 'message': 'Formato não suportado. Use CSV ou XLSX.'}), 400
+    
+    simular = request.form.get('simular') in ('1', 'true', 'on')
+    result = UsuarioController.importar_usuarios(
+        spreadsheet.iter_registros(arquivo.stream, formato), simular=simular
+    )
+    
+    # O relatório vai sempre inteiro: lotes gravados antes de um erro continuam gravados
+    if result['success']:
+        return jsonify(result), 200
+    status_code = 400 if 'erro_planilha' in result else 500
+    return jsonify(result), status_code
+
+
 @main.route('/usuarios/editar/<int:id>', methods=['POST'])
 def editar_usuario(id):
     """Edita um usuário existente"""
@@ -315,19 +444,27 @@ def excluir_usuario(id):
 
 @main.route('/relatorios/exportar')
 def exportar_relatorio():
-    """Exporta relatório em Excel"""
+    """Exporta relatório em Excel (padrão) ou CSV, enviado em streaming"""
+    if 'user' not in session:
+        return jsonify({'success': False, 'message': 'Não autenticado'}), 401
+    if session.get('user_role') not in ['GOVERNANTE', 'SUPERVISOR']:
+        return jsonify({'success': False, 'message': 'Acesso não autorizado'}), 403
+    
     period = request.args.get('period', 'week')
     start = request.args.get('start')
     end = request.args.get('end')
+    formato = request.args.get('formato', 'xlsx').lower()
     
-    result = RelatorioController.gerar_relatorio(period, start, end)
+    result = RelatorioController.exportar_relatorio(period, start, end, formato)
     
     if not result['success']:
         return jsonify(result), 400
     
-    # TODO: Implementar exportação para Excel
-    # Por enquanto, retorna JSON
-    return jsonify(result), 200
+    response = Response(stream_with_context(result['stream']), mimetype=result['mimetype'])
+    response.headers['Content-Disposition'] = f'attachment; filename="{result["filename"]}"'
+    # Evita que proxies (nginx) segurem a resposta inteira antes de repassar
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 # ==================== API - AUDITORIA ====================
@@ -358,9 +495,12 @@ def faceid_register():
     result = FaceIDController.registrar_faceid(user_id, image_base64)
     
     if result['success']:
+        _auditar(user_id, 'CADASTRO_FACEID')
         return jsonify(result), 200
     
     status_code = 404 if 'não encontrado' in result['message'] else 400
+    if user_id and image_base64 and status_code == 400:
+        _auditar(user_id, 'CADASTRO_FACEID', False)  # usuário encontrado, imagem recusada
     return jsonify(result), status_code
 
 
@@ -373,6 +513,7 @@ def faceid_login():
     result = FaceIDController.autenticar_faceid(image_base64)
     
     if result['success']:
+        _auditar(result['user']['id'], 'LOGIN_FACEID')
         # Cria sessão (implementar quando FaceID estiver funcional)
         # session['user'] = result['user']['nome']
         # session['user_id'] = result['user']['id']
@@ -384,6 +525,22 @@ def faceid_login():
     return jsonify(result), status_code
 
 
+@main.route('/api/faceid/login/frames', methods=['POST'])
+def faceid_login_frames():
+    """Autentica usuário via FaceID a partir de uma rajada de frames"""
+    data = request.get_json()
+    frames = data.get('images')
+    
+    result = FaceIDController.autenticar_faceid_frames(frames)
+    
+    if result['success']:
+        _auditar(result['user']['id'], 'LOGIN_FACEID')
+        return jsonify(result), 200
+    
+    status_code = 401 if 'não reconhecido' in result['message'] else 400
+    return jsonify(result), status_code
+
+
 @main.route('/api/faceid/check/<int:user_id>', methods=['GET'])
 def faceid_check(user_id):
     """Verifica se usuário tem FaceID cadastrado"""
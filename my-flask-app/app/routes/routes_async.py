@@ -0,0 +1,258 @@
+"""Routes assíncronas - as APIs JSON servidas pelo app Quart (asgi.py)
+
+Mesmas URLs, códigos de status e corpos de app/routes/routes.py para tarefas,
+ponto, dashboard, auditoria e listagem de usuários (e o FaceID, cujo
+processamento pesado vai para threads/processos). Páginas, login, cadastro,
+importação e relatórios continuam no app Flask (Main.py).
+"""
+
+import time
+
+from quart import Blueprint, request, session, jsonify
+
+from app.controllers.controller_async import (
+    UsuarioController,
+    TarefaController,
+    PontoController,
+    DashboardController,
+    AuditoriaController,
+    FaceIDController
+)
+from app.models import models_async, versoes
+from app.models.db_pool import DatabaseUnavailableError
+from app.routes import comum
+from app.utils.http_cache import condicional_async
+from app.utils.face_executor import FaceExecutorError, prontidao
+
+api = Blueprint('api', __name__)
+
+
+@api.app_errorhandler(DatabaseUnavailableError)
+async def banco_indisponivel(error):
+    corpo, status_code = comum.banco_indisponivel(error)
+    return jsonify(corpo), status_code
+
+
+@api.app_errorhandler(FaceExecutorError)
+async def processamento_facial_indisponivel(error):
+    corpo, status_code, headers = comum.processamento_facial_indisponivel(error)
+    return jsonify(corpo), status_code, headers
+
+
+def _auditar(usuario_id, acao, sucesso=True):
+    comum.auditar(request, usuario_id, acao, sucesso)
+
+
+async def _validar_versoes(*nomes):
+    return comum.material_versoes(await models_async.ler_versoes(nomes))
+
+
+async def _validar_tarefas():
+    return await _validar_versoes('tarefa')
+
+
+async def _validar_usuarios():
+    return await _validar_versoes('usuario')
+
+
+async def _validar_dashboard():
+    if 'user' not in session:
+        return None
+    return comum.material_dashboard(await DashboardController.obter_dados_dashboard(session.get('user_role')))
+
+
+async def _validar_historico_ponto():
+    recurso = comum.recurso_historico_ponto(request)
+    return await _validar_versoes(recurso) if recurso else None
+
+
+def _paginacao():
+    return comum.paginacao(request)
+
+
+# ==================== API - DASHBOARD ====================
+
+@api.route('/api/dashboard-data')
+@condicional_async(_validar_dashboard)
+async def dashboard_data():
+    """Retorna dados do dashboard"""
+    if 'user' not in session:
+        return jsonify({'error': 'Não autenticado'}), 401
+
+    data = await DashboardController.obter_dados_dashboard(session.get('user_role'))
+    return jsonify(data)
+
+
+@api.route('/api/health')
+async def health_check():
+    """Health check da API"""
+    return jsonify({'status': 'ok', 'timestamp': time.time()})
+
+
+@api.route('/api/ready')
+async def readiness_check():
+    """Prontidão do worker (probe do balanceador): 503 enquanto a pilha facial aquece no papel 'face'"""
+    pronto, corpo = prontidao()
+    return jsonify({'status': 'ok' if pronto else 'aquecendo', **corpo}), 200 if pronto else 503
+
+
+# ==================== API - TAREFAS ====================
+
+@api.route('/api/tarefas', methods=['GET'])
+@condicional_async(_validar_tarefas)
+async def listar_tarefas():
+    """Lista tarefas filtradas por usuário"""
+    usuario_id = request.args.get('usuario_id')
+    result = await TarefaController.listar_tarefas_usuario(usuario_id, *_paginacao())
+
+    if result['success']:
+        result.pop('success')
+        return jsonify(result), 200
+    return jsonify({'success': False, 'message': result['message']}), 400
+
+
+# ==================== API - PONTO ELETRÔNICO ====================
+
+@api.route('/api/ponto/historico', methods=['GET'])
+@condicional_async(_validar_historico_ponto)
+async def historico_ponto():
+    """Retorna histórico de ponto de um usuário"""
+    usuario_id = request.args.get('usuario_id')
+    result = await PontoController.listar_historico(usuario_id, *_paginacao())
+
+    if result['success']:
+        result.pop('success')
+        return jsonify(result), 200
+    return jsonify({'success': False, 'message': result['message']}), 400
+
+
+@api.route('/api/ponto/registrar', methods=['POST'])
+async def registrar_ponto():
+    """Registra ponto eletrônico"""
+    data = await request.get_json(force=True)
+    usuario_id = data.get('usuario_id')
+
+    result = await PontoController.registrar_ponto(
+        usuario_id, data.get('data'), data.get('hora_entrada'), data.get('localizacao')
+    )
+    if result['success']:
+        _auditar(usuario_id, 'REGISTRO_PONTO')
+        return jsonify(result), 201
+
+    # Só audita usuário que o banco já validou (o ponto duplicado é dele):
+    # um usuario_id qualquer vindo do cliente violaria a FK de auditoria
+    status_code = 409 if 'já registrado' in result['message'] else 400
+    if status_code == 409:
+        _auditar(usuario_id, 'REGISTRO_PONTO', False)
+    return jsonify(result), status_code
+
+
+@api.route('/api/ponto/sincronizar', methods=['POST'])
+async def sincronizar_ponto():
+    """Registra um lote de pontos com chaves de idempotência (dispositivos offline, equipes)"""
+    if 'user' not in session:
+        return jsonify({'success': False, 'message': 'Não autenticado'}), 401
+
+    registros = comum.registros_do_lote(await request.get_json(force=True, silent=True))
+    if comum.lote_de_terceiros(registros, session):
+        return jsonify({'success': False, 'message': comum.MENSAGEM_PONTO_DE_TERCEIROS}), 403
+    result = await PontoController.sincronizar_pontos(registros)
+
+    if not result['success']:
+        return jsonify(result), 400
+
+    for item in result['resultados']:
+        if item['situacao'] == 'criado':
+            _auditar(registros[item['indice']].get('usuario_id'), 'REGISTRO_PONTO')
+    return jsonify(result), 200
+
+
+# ==================== API - USUÁRIOS ====================
+
+@api.route('/usuarios/listar', methods=['GET'])
+@condicional_async(_validar_usuarios)
+async def listar_usuarios():
+    """Lista todos os usuários"""
+    if 'user' not in session or session.get('user_role') != 'GOVERNANTE':
+        return jsonify({'usuarios': [], 'error': 'Acesso não autorizado'}), 200
+
+    result = await UsuarioController.listar_usuarios(*_paginacao())
+
+    if result['success']:
+        result.pop('success')
+        return jsonify(result), 200
+    return jsonify({'usuarios': [], 'error': result.get('message', 'Erro desconhecido')}), 200
+
+
+# ==================== API - AUDITORIA ====================
+
+@api.route('/api/auditoria', methods=['GET'])
+async def api_auditoria():
+    """Retorna registros de auditoria"""
+    result = await AuditoriaController.listar_registros(
+        request.args.get('usuario'), request.args.get('data_inicial'), request.args.get('data_final')
+    )
+
+    if result['success']:
+        return jsonify({'registros': result['registros']}), 200
+    return jsonify({'registros': [], 'error': result.get('message')}), 200
+
+
+# ==================== API - FACEID ====================
+
+@api.route('/api/faceid/register', methods=['POST'])
+async def faceid_register():
+    """Registra FaceID de um usuário"""
+    data = await request.get_json()
+    user_id = data.get('user_id')
+
+    result = await FaceIDController.registrar_faceid(user_id, data.get('image'))
+
+    if result['success']:
+        _auditar(user_id, 'CADASTRO_FACEID')
+        return jsonify(result), 200
+
+    status_code = 404 if 'não encontrado' in result['message'] else 400
+    if user_id and data.get('image') and status_code == 400:
+        _auditar(user_id, 'CADASTRO_FACEID', False)  # usuário encontrado, imagem recusada
+    return jsonify(result), status_code
+
+
+@api.route('/api/faceid/login', methods=['POST'])
+async def faceid_login():
+    """Autentica usuário via FaceID"""
+    data = await request.get_json()
+
+    result = await FaceIDController.autenticar_faceid(data.get('image'))
+
+    if result['success']:
+        _auditar(result['user']['id'], 'LOGIN_FACEID')
+        return jsonify(result), 200
+
+    status_code = 401 if 'não reconhecido' in result['message'] else 400
+    return jsonify(result), status_code
+
+
+@api.route('/api/faceid/login/frames', methods=['POST'])
+async def faceid_login_frames():
+    """Autentica usuário via FaceID a partir de uma rajada de frames"""
+    data = await request.get_json()
+
+    result = await FaceIDController.autenticar_faceid_frames(data.get('images'))
+
+    if result['success']:
+        _auditar(result['user']['id'], 'LOGIN_FACEID')
+        return jsonify(result), 200
+
+    status_code = 401 if 'não reconhecido' in result['message'] else 400
+    return jsonify(result), status_code
+
+
+@api.route('/api/faceid/check/<int:user_id>', methods=['GET'])
+async def faceid_check(user_id):
+    """Verifica se usuário tem FaceID cadastrado"""
+    result = await FaceIDController.verificar_faceid_cadastrado(user_id)
+
+    if result['success']:
+        return jsonify(result), 200
+    return jsonify(result), 500
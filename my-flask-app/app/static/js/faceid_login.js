@@ -21,6 +21,9 @@
     let captureInterval = null;
     let isProcessing = false;
 
+    const BURST_SIZE = 4;
+    const BURST_INTERVAL_MS = 150;
+
     // Configura event listeners
     function setupEventListeners() {
         // Toggle login tradicional
@@ -113,25 +116,38 @@
         }, 2000);
     }
 
-    // Captura frame e tenta autenticar
+    // Captura uma rajada curta de frames; o servidor escolhe o melhor
+    async function captureBurst() {
+        const ctx = elements.faceidCanvas.getContext('2d');
+        const frames = [];
+        for (let i = 0; i < BURST_SIZE; i++) {
+            if (i > 0) await new Promise(resolve => setTimeout(resolve, BURST_INTERVAL_MS));
+            ctx.drawImage(elements.faceidVideo, 0, 0);
+            frames.push(elements.faceidCanvas.toDataURL('image/jpeg', 0.85));
+        }
+        return frames;
+    }
+
+    // Captura frames e tenta autenticar
     async function captureAndAuthenticate() {
         if (isProcessing || !stream) return;
         isProcessing = true;
         try {
-            const ctx = elements.faceidCanvas.getContext('2d');
-            ctx.drawImage(elements.faceidVideo, 0, 0);
-            const imageData = elements.faceidCanvas.toDataURL('image/jpeg', 0.85);
+            const frames = await captureBurst();
             updateStatus('Analisando rosto...', 'info');
-            const response = await fetch('/api/faceid/login', {
+            const response = await fetch('/api/faceid/login/frames', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ image: imageData })
+                body: JSON.stringify({ images: frames })
             });
             const result = await response.json();
             if (result.success) {
                 updateStatus(`✅ ${result.message}`, 'success');
                 clearInterval(captureInterval);
                 setTimeout(() => window.location.href = '/dashboard', 1000);
+            } else if (result.busy) {
+                // Servidor ocupado com outros rostos: tenta de novo no próximo ciclo
+                updateStatus('⏳ Servidor ocupado, tentando novamente...', 'warning');
             } else {
                 const status = response.status;
                 const msg = result.message || 'Aguardando reconhecimento...';
@@ -238,6 +238,39 @@ async function handleApiRequest(url, method = 'GET', body = null, successMsg = n
   }
 }
 
+// Paginação por cursor: guarda o próximo cursor de cada listagem
+const nextCursors = {};
+
+async function fetchPage(key, url, append = false) {
+  const pageUrl = new URL(url, window.location.origin);
+  if (append && nextCursors[key]) pageUrl.searchParams.set('cursor', nextCursors[key]);
+  const resp = await fetch(pageUrl);
+  if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+  const json = await resp.json();
+  nextCursors[key] = json.next_cursor || null;
+  return json;
+}
+
+// Botão "Carregar mais" logo após a lista/tabela; some na última página
+function updateLoadMore(key, container, onClick) {
+  if (!container) return;
+  const anchor = container.closest('table') || container;
+  let btn = document.querySelector(`[data-load-more="${key}"]`);
+  if (!nextCursors[key]) {
+    if (btn) btn.remove();
+    return;
+  }
+  if (!btn) {
+    btn = document.createElement('button');
+    btn.type = 'button';
+    btn.className = 'btn mt-4 w-full';
+    btn.dataset.loadMore = key;
+    btn.textContent = 'Carregar mais';
+    anchor.insertAdjacentElement('afterend', btn);
+  }
+  btn.onclick = onClick;
+}
+
 // Envio do formulário de usuário
 async function handleUserSubmit(e) {
   e.preventDefault();
@@ -253,14 +286,12 @@ async function handleUserSubmit(e) {
 }
 
 // Carregar usuários
-async function carregarUsuarios() {
+async function carregarUsuarios(append = false) {
   try {
-    const resp = await fetch('/usuarios/listar');
-    if (!resp.ok) throw new Error('Erro ao buscar usuários');
-    const json = await resp.json();
+    const json = await fetchPage('usuarios', '/usuarios/listar', append);
     const usuarios = Array.isArray(json.usuarios) ? json.usuarios : [];
     if (!elements.usuariosTbody) return;
-    elements.usuariosTbody.innerHTML = usuarios.map(usuario => `
+    const html = usuarios.map(usuario => `
       <tr>
         <td class="py-4">
           <label class="flex items-center">
@@ -285,6 +316,9 @@ async function carregarUsuarios() {
         </td>
       </tr>
     `).join('');
+    if (append) elements.usuariosTbody.insertAdjacentHTML('beforeend', html);
+    else elements.usuariosTbody.innerHTML = html;
+    updateLoadMore('usuarios', elements.usuariosTbody, () => carregarUsuarios(true));
   } catch (err) {
     console.error(err);
     showNotification('Erro ao carregar usuários', 'error');
@@ -442,14 +476,12 @@ async function handleTarefaSubmit(e) {
   carregarTarefas(usuarioId);
 }
 
-async function carregarTarefas(usuarioId) {
+async function carregarTarefas(usuarioId, append = false) {
   try {
-    const resp = await fetch(`/api/tarefas?usuario_id=${encodeURIComponent(usuarioId)}`);
-    if (!resp.ok) throw new Error('Erro ao buscar tarefas');
-    const json = await resp.json();
+    const json = await fetchPage('tarefas', `/api/tarefas?usuario_id=${encodeURIComponent(usuarioId)}`, append);
     const tarefas = Array.isArray(json.tarefas) ? json.tarefas : [];
     if (!elements.tarefaList) return;
-    elements.tarefaList.innerHTML = tarefas.map(tarefa => {
+    const html = tarefas.map(tarefa => {
       const statusClass = tarefa.status === 'Em Andamento' ? 'text-blue-600 style="background: rgba(59, 130, 246, 0.2);"' :
                           tarefa.status === 'Concluída' ? 'text-green-600 style="background: rgba(34, 197, 94, 0.2);"' : 'text-yellow-600 style="background: rgba(245, 158, 11, 0.2);"';
       return `
@@ -462,6 +494,9 @@ async function carregarTarefas(usuarioId) {
         </li>
       `;
     }).join('');
+    if (append) elements.tarefaList.insertAdjacentHTML('beforeend', html);
+    else elements.tarefaList.innerHTML = html;
+    updateLoadMore('tarefas', elements.tarefaList, () => carregarTarefas(usuarioId, true));
   } catch (err) {
     console.error(err);
     showNotification('Erro ao carregar tarefas', 'error');
@@ -483,14 +518,12 @@ async function handlePontoRegister() {
   carregarHistoricoPonto(usuarioId);
 }
 
-async function carregarHistoricoPonto(usuarioId) {
+async function carregarHistoricoPonto(usuarioId, append = false) {
   try {
-    const resp = await fetch(`/api/ponto/historico?usuario_id=${encodeURIComponent(usuarioId)}`);
-    if (!resp.ok) throw new Error('Erro ao buscar ponto');
-    const json = await resp.json();
+    const json = await fetchPage('ponto', `/api/ponto/historico?usuario_id=${encodeURIComponent(usuarioId)}`, append);
     const historico = Array.isArray(json.historico) ? json.historico : [];
     if (!elements.pontoTableBody) return;
-    elements.pontoTableBody.innerHTML = historico.map(ponto => `
+    const html = historico.map(ponto => `
       <tr class="border-b hover:var(--hover)">
         <td class="px-4 py-2">${ponto.data || '-'}</td>
         <td class="px-4 py-2">${ponto.hora_entrada || '-'}</td>
@@ -498,6 +531,9 @@ async function carregarHistoricoPonto(usuarioId) {
         <td class="px-4 py-2">${ponto.total_horas || '-'}</td>
       </tr>
     `).join('');
+    if (append) elements.pontoTableBody.insertAdjacentHTML('beforeend', html);
+    else elements.pontoTableBody.innerHTML = html;
+    updateLoadMore('ponto', elements.pontoTableBody, () => carregarHistoricoPonto(usuarioId, true));
   } catch (err) {
     console.error(err);
     showNotification('Erro ao carregar histórico de ponto', 'error');
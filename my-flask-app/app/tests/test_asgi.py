@@ -0,0 +1,228 @@
+import asyncio
+import os
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.controllers.controller import DashboardController
+from app.models import db_async, db_pool, resumos
+from app.models.db_async import AsyncConnectionPool
+from app.models.db_pool import ConnectionPool
+from app.models.models import auditoria_sink
+from benchmarks import seed, sqlite_db
+
+
+def _sessao(sessao, papel='GOVERNANTE'):
+    sessao['user'] = 'Teste'
+    sessao['user_role'] = papel
+    sessao['user_email'] = 'teste@saneamento.gov.br'
+
+
+@pytest.fixture(scope='module')
+def banco(tmp_path_factory):
+    path = os.path.join(tmp_path_factory.mktemp('asgi'), 'banco.sqlite3')
+    sqlite_db.criar_banco(path)
+    seed.popular(path, seed.ESCALAS['teste'], date.today())
+    return path
+
+
+@pytest.fixture
+def apps(banco, monkeypatch):
+    """App Flask e app Quart sobre o mesmo banco SQLite"""
+    from Main import app as flask_app
+    from asgi import app as quart_app
+
+    monkeypatch.setitem(flask_app.config, 'TESTING', False)
+    db_pool.set_pool(ConnectionPool(lambda: sqlite_db.conectar(banco), pool_size=2))
+    db_async.set_pool(AsyncConnectionPool(lambda: sqlite_db.conectar_async(banco), pool_size=4))
+    resumos.reconciliar(dias=seed.ESCALAS['teste'].dias_ponto + 1)
+    DashboardController._cache.invalidate()
+    yield flask_app, quart_app
+    auditoria_sink.flush()
+    db_async.set_pool(None)
+    db_pool.set_pool(None)
+
+
+def _rodar(quart_app, requisicoes):
+    """Executa as requisições no app Quart com sessão de GOVERNANTE; devolve (status, json)"""
+    async def executar():
+        client = quart_app.test_client()
+        async with client.session_transaction() as sessao:
+            _sessao(sessao)
+        respostas = []
+        for metodo, url, corpo in requisicoes:
+            resposta = await client.open(url, method=metodo, json=corpo)
+            respostas.append((resposta.status_code, await resposta.get_json()))
+        return respostas
+    return asyncio.run(executar())
+
+
+def test_mesmas_respostas_do_app_flask(apps):
+    flask_app, quart_app = apps
+    urls = [
+        '/api/tarefas?usuario_id=3&limit=5',
+        '/api/ponto/historico?usuario_id=1&limit=5&total=1',
+        '/api/ponto/historico?usuario_id=1&cursor=invalido',
+        '/usuarios/listar?limit=10',
+        '/api/dashboard-data',
+        '/api/auditoria',
+        '/api/faceid/check/1',
+    ]
+
+    client = flask_app.test_client()
+    with client.session_transaction() as sessao:
+        _sessao(sessao)
+    esperado = []
+    for url in urls:
+        resposta = client.get(url)
+        esperado.append((resposta.status_code, resposta.get_json()))
+
+    obtido = _rodar(quart_app, [('GET', url, None) for url in urls])
+    for url, (status, corpo), (status_flask, corpo_flask) in zip(urls, obtido, esperado):
+        corpo.pop('timestamp', None), corpo_flask.pop('timestamp', None)
+        assert (status, corpo) == (status_flask, corpo_flask), url
+    assert obtido[0][1]['tarefas'] and obtido[1][1]['total'] > 0 and obtido[2][0] == 400
+
+
+def test_writes_de_ponto(apps):
+    _, quart_app = apps
+    dia = (date.today() + timedelta(days=3)).isoformat()
+    ponto = {'usuario_id': 150, 'data': dia, 'hora_entrada': '07:30:00'}
+    lote = {'registros': [
+        {'chave': 'asgi-1', 'usuario_id': 151, 'data': dia, 'hora_entrada': '07:30'},
+        {'chave': 'asgi-2', 'usuario_id': 150, 'data': dia, 'hora_entrada': '07:40'},
+        {'chave': 'asgi-3', 'usuario_id': 99999, 'data': dia, 'hora_entrada': '07:40'},
+    ]}
+
+    respostas = _rodar(quart_app, [
+        ('POST', '/api/ponto/registrar', ponto),
+        ('POST', '/api/ponto/registrar', ponto),
+        ('POST', '/api/ponto/sincronizar', lote),
+        ('POST', '/api/ponto/sincronizar', lote),
+        ('GET', '/api/ponto/historico?usuario_id=150&limit=1', None),
+    ])
+
+    assert [status for status, _ in respostas] == [201, 409, 200, 200, 200]
+    primeira, segunda = respostas[2][1], respostas[3][1]
+    assert (primeira['criados'], primeira['duplicados'], primeira['rejeitados']) == (1, 1, 1)
+    assert (segunda['criados'], segunda['duplicados'], segunda['rejeitados']) == (0, 2, 1)
+    assert respostas[4][1]['historico'][0]['hora_entrada'] == '07:30:00'
+
+
+class ConexaoLenta:
+    """Cada consulta espera 20ms sem ocupar thread; conta quantas estão em andamento"""
+
+    em_andamento = 0
+    pico = 0
+
+    async def fetchall(self, sql, params=()):
+        ConexaoLenta.em_andamento += 1
+        ConexaoLenta.pico = max(ConexaoLenta.pico, ConexaoLenta.em_andamento)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            ConexaoLenta.em_andamento -= 1
+        return [{'tem': 1}]
+
+    async def rollback(self):
+        pass
+
+    in_transaction = False
+
+    def close(self):
+        pass
+
+
+async def _abrir_lenta():
+    return ConexaoLenta()
+
+
+def test_centenas_de_requisicoes_em_andamento_em_um_processo():
+    from asgi import app as quart_app
+
+    ConexaoLenta.em_andamento = ConexaoLenta.pico = 0
+    db_async.set_pool(AsyncConnectionPool(_abrir_lenta, pool_size=200, timeout=10))
+
+    async def executar():
+        client = quart_app.test_client()
+        inicio = time.perf_counter()
+        respostas = await asyncio.gather(*[client.get(f'/api/faceid/check/{i}') for i in range(300)])
+        return time.perf_counter() - inicio, respostas
+
+    try:
+        decorrido, respostas = asyncio.run(executar())
+    finally:
+        db_async.set_pool(None)
+
+    assert all(r.status_code == 200 for r in respostas)
+    # 300 x 20ms em série seriam 6s; o pool de 200 fica cheio ao mesmo tempo
+    assert ConexaoLenta.pico == 200
+    assert decorrido < 3
+
+
+def test_pool_esgotado_responde_503_e_cancelamento_descarta_conexao():
+    from asgi import app as quart_app
+
+    pool = AsyncConnectionPool(_abrir_lenta, pool_size=1, timeout=0.05)
+    db_async.set_pool(pool)
+
+    async def executar():
+        presa = await pool.connect()
+        resposta = await quart_app.test_client().get('/api/faceid/check/1')
+        await presa.release()
+
+        conn = await pool.connect()
+        tarefa = asyncio.ensure_future(conn.fetchall('SELECT 1'))
+        await asyncio.sleep(0)
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+        await conn.release()
+        return resposta, len(pool._idle)
+
+    try:
+        resposta, ociosas = asyncio.run(executar())
+    finally:
+        db_async.set_pool(None)
+
+    assert resposta.status_code == 503
+    assert ociosas == 0
+
+
+def test_revalidacao_responde_304(apps):
+    _, quart_app = apps
+
+    async def executar():
+        client = quart_app.test_client()
+        async with client.session_transaction() as sessao:
+            _sessao(sessao)
+        primeira = await client.get('/api/tarefas?usuario_id=3')
+        segunda = await client.get('/api/tarefas?usuario_id=3', headers={'If-None-Match': primeira.headers['ETag']})
+        return primeira, segunda
+
+    primeira, segunda = asyncio.run(executar())
+    assert primeira.status_code == 200 and primeira.headers['Cache-Control'] == 'private, no-cache'
+    assert segunda.status_code == 304
+
+
+def test_auditoria_nao_bloqueia_o_event_loop(monkeypatch):
+    import threading
+    from app.controllers import controller
+    from asgi import app as quart_app
+
+    threads = []
+
+    def listar(usuario=None, data_inicial=None, data_final=None):
+        threads.append(threading.current_thread())
+        return {'success': True, 'registros': [{'usuario': usuario}]}
+
+    monkeypatch.setattr(controller.AuditoriaController, 'listar_registros', staticmethod(listar))
+
+    async def executar():
+        resposta = await quart_app.test_client().get('/api/auditoria?usuario=ana')
+        return threading.current_thread(), resposta.status_code, await resposta.get_json()
+
+    thread_do_loop, status, corpo = asyncio.run(executar())
+    assert (status, corpo) == (200, {'registros': [{'usuario': 'ana'}]})
+    assert threads and threads[0] is not thread_do_loop
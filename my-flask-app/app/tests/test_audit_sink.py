@@ -0,0 +1,141 @@
+import time
+from datetime import datetime
+
+from app.utils.audit_sink import AuditSink
+
+
+class FakeWriter:
+    def __init__(self):
+        self.lotes = []
+        self.fora_do_ar = False
+
+    def __call__(self, registros):
+        if self.fora_do_ar:
+            raise ConnectionError('banco fora do ar')
+        self.lotes.append(list(registros))
+
+
+def test_agrupa_por_tamanho_e_por_tempo():
+    writer = FakeWriter()
+    sink = AuditSink(writer, batch_size=3, flush_interval=0.05)
+    for i in range(4):
+        sink.enqueue(i, 'LOGIN', '127.0.0.1', 'SUCESSO')
+
+    time.sleep(0.3)
+    assert [len(lote) for lote in writer.lotes] == [3, 1]
+    sink.shutdown()
+
+
+def test_enqueue_nao_espera_o_banco():
+    writer = FakeWriter()
+    sink = AuditSink(lambda lote: (time.sleep(0.2), writer(lote)), batch_size=1, flush_interval=0.01)
+    inicio = time.monotonic()
+    for i in range(20):
+        sink.enqueue(i, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    assert time.monotonic() - inicio < 0.1
+    sink.shutdown(timeout=0.01)
+
+
+def test_shutdown_grava_o_que_restou():
+    writer = FakeWriter()
+    sink = AuditSink(writer, batch_size=100, flush_interval=60)
+    sink.enqueue(1, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    sink.enqueue(2, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    sink.shutdown()
+    assert writer.lotes == [[(1, 'LOGIN', '127.0.0.1', 'SUCESSO'), (2, 'LOGIN', '127.0.0.1', 'SUCESSO')]]
+
+
+def test_banco_fora_do_ar_vai_para_arquivo_e_e_reenviado(tmp_path):
+    writer = FakeWriter()
+    spill = tmp_path / 'auditoria.jsonl'
+    sink = AuditSink(writer, batch_size=10, flush_interval=60, spill_path=str(spill))
+    quando = datetime(2025, 1, 1, 8, 0)
+
+    writer.fora_do_ar = True
+    sink.enqueue(1, 'LOGIN', '127.0.0.1', 'SUCESSO', quando)
+    assert sink.flush()
+    assert spill.exists()
+    assert sink.stats['spilled'] == 1
+
+    writer.fora_do_ar = False
+    sink.enqueue(2, 'LOGOUT', '127.0.0.1', 'SUCESSO', quando)
+    sink.shutdown()
+
+    gravados = [registro for lote in writer.lotes for registro in lote]
+    assert (1, 'LOGIN', '127.0.0.1', 'SUCESSO', quando) in gravados
+    assert (2, 'LOGOUT', '127.0.0.1', 'SUCESSO', quando) in gravados
+    assert not spill.exists()
+
+
+class ErroDeFK(Exception):
+    pass
+
+
+def test_registro_invalido_nao_derruba_o_lote():
+    writer = FakeWriter()
+
+    def gravar(registros):
+        if any(registro[0] == 999 for registro in registros):
+            raise ErroDeFK('usuario_id inexistente')
+        writer(registros)
+
+    sink = AuditSink(gravar, batch_size=10, flush_interval=60, unavailable_errors=(ConnectionError,))
+    for usuario_id in (1, 999, 2):
+        sink.enqueue(usuario_id, 'REGISTRO_PONTO', '127.0.0.1', 'SUCESSO')
+    sink.shutdown()
+
+    assert [registro[0] for lote in writer.lotes for registro in lote] == [1, 2]
+    assert sink.stats['rejected'] == 1 and sink.stats['spilled'] == 0
+
+
+def test_reenvio_ignora_linha_corrompida_e_sobras_de_processo_morto(tmp_path):
+    writer = FakeWriter()
+    spill = tmp_path / 'auditoria.jsonl'
+    spill.write_text('[1, "LOGIN", "127.0.0.1", "SUCESSO"]\n[2, "LOGIN", "12')
+    orfao = tmp_path / 'auditoria.jsonl.replay.999999999'  # pid que não existe
+    orfao.write_text('[3, "LOGOUT", "127.0.0.1", "SUCESSO"]\n')
+
+    sink = AuditSink(writer, batch_size=10, flush_interval=60, spill_path=str(spill))
+    sink.enqueue(4, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    sink.shutdown()
+
+    assert sorted(registro[0] for lote in writer.lotes for registro in lote) == [1, 3, 4]
+    assert sink.stats['corrupted'] == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_falha_no_reenvio_nao_mata_a_thread(tmp_path):
+    writer = FakeWriter()
+    spill = tmp_path / 'auditoria.jsonl'
+    spill.mkdir()  # open() do reenvio falha
+
+    sink = AuditSink(writer, batch_size=1, flush_interval=60, spill_path=str(spill))
+    sink.enqueue(1, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    assert sink.flush()
+    sink.enqueue(2, 'LOGIN', '127.0.0.1', 'SUCESSO')
+    assert sink.flush()
+    sink.shutdown()
+
+    assert [registro[0] for lote in writer.lotes for registro in lote] == [1, 2]
+
+
+def test_reenvio_espera_a_gravacao_em_andamento_no_arquivo(tmp_path):
+    import threading
+
+    writer = FakeWriter()
+    spill = tmp_path / 'auditoria.jsonl'
+    spill.write_text('[1, "LOGIN", "127.0.0.1", "SUCESSO"]\n')
+    sink = AuditSink(writer, batch_size=10, flush_interval=60, spill_path=str(spill))
+
+    sink._spill_lock.acquire()  # um _spill da fila cheia ainda está gravando
+    reenvio = threading.Thread(target=sink._replay_spill)
+    reenvio.start()
+    time.sleep(0.05)
+    assert spill.exists()
+    with open(spill, 'a', encoding='utf-8') as f:
+        f.write('[2, "LOGIN", "127.0.0.1", "SUCESSO"]\n')
+    sink._spill_lock.release()
+    reenvio.join(5)
+
+    assert sorted(registro[0] for lote in writer.lotes for registro in lote) == [1, 2]
+    assert list(tmp_path.iterdir()) == []
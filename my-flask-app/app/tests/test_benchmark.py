@@ -0,0 +1,34 @@
+from benchmarks import run, sqlite_db
+
+
+def test_traduzir_upsert_com_tabela_derivada():
+    sql = sqlite_db.traduzir("""
+        INSERT INTO resumo_ponto_dia (dia, departamento, registros)
+        SELECT dia, departamento, registros FROM (SELECT %s AS dia, '' AS departamento, 1 AS registros) novos
+        ON DUPLICATE KEY UPDATE registros = resumo_ponto_dia.registros + novos.registros
+    """)
+    sql = ' '.join(sql.split())
+    assert '?' in sql and '%s' not in sql
+    assert 'ON CONFLICT DO UPDATE SET registros = resumo_ponto_dia.registros + excluded.registros' in sql
+
+
+def test_traduzir_insert_ignore_e_values():
+    assert sqlite_db.traduzir('INSERT IGNORE INTO t (a) VALUES (%s)') == 'INSERT OR IGNORE INTO t (a) VALUES (?)'
+    sql = sqlite_db.traduzir('INSERT INTO t (a) VALUES (%s) ON DUPLICATE KEY UPDATE a = VALUES(a)')
+    assert ' '.join(sql.split()).endswith('ON CONFLICT DO UPDATE SET a = excluded.a')
+
+
+def test_comparar_respeita_tolerancia_e_piso():
+    baseline = {'casos': {'lento': {'p95': 10.0}, 'rapido': {'p95': 0.2}, 'estavel': {'p95': 5.0}}}
+    atual = {'casos': {'lento': {'p95': 13.0}, 'rapido': {'p95': 0.6}, 'estavel': {'p95': 5.5}, 'novo': {'p95': 99.0}}}
+    assert run.comparar(atual, baseline, tolerancia=0.2, piso_ms=1.0) == [('lento', 13.0, 10.0)]
+
+
+def test_todos_os_casos_rodam_sem_erro(tmp_path):
+    resultados = run.executar('teste', iteracoes=3, diretorio=str(tmp_path))
+
+    assert resultados['dados']['ponto'] > 0
+    assert 'api/ponto/sincronizar (50)' in resultados['casos']
+    for nome, medicao in resultados['casos'].items():
+        assert medicao['erros'] == 0, f"{nome}: {medicao.get('primeiro_erro')}"
+        assert medicao['n'] == 3
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from app.utils import config
+from app.utils.face_executor import FaceExecutor
+
+
+def test_secret_key_obrigatoria_em_producao(monkeypatch):
+    monkeypatch.delenv('SECRET_KEY', raising=False)
+    monkeypatch.setenv('APP_ENV', 'producao')
+    with pytest.raises(RuntimeError):
+        config.secret_key()
+
+    monkeypatch.setenv('SECRET_KEY', 'chave-do-ambiente')
+    assert config.secret_key() == 'chave-do-ambiente'
+
+
+def test_chave_temporaria_fora_de_producao(monkeypatch):
+    monkeypatch.delenv('SECRET_KEY', raising=False)
+    monkeypatch.delenv('APP_ENV', raising=False)
+    chave = config.secret_key()
+    assert len(chave) == 64 and config.secret_key() == chave
+
+
+def test_cpus_limitadas_pela_cota_do_cgroup(tmp_path):
+    cpu_max = tmp_path / 'cpu.max'
+    sem_cota = len(os.sched_getaffinity(0))
+
+    cpu_max.write_text('50000 100000\n')
+    assert config.cpus_disponiveis(str(cpu_max)) == 1
+    cpu_max.write_text(f'{150000 * sem_cota} 100000\n')
+    assert config.cpus_disponiveis(str(cpu_max)) == sem_cota
+    cpu_max.write_text('max 100000\n')
+    assert config.cpus_disponiveis(str(cpu_max)) == sem_cota
+    assert config.cpus_disponiveis(str(tmp_path / 'inexistente')) == sem_cota
+
+
+def test_executor_facial_recomeca_no_processo_filho(monkeypatch):
+    executor = FaceExecutor(workers=1, max_pending=0, initializer=None)
+    executor._slots.acquire()
+    executor._executor = object()  # processos do pai: não servem no filho
+
+    monkeypatch.setattr(os, 'getpid', lambda: executor._pid + 1)
+    executor.shutdown()  # no filho não encerra os processos do pai
+    assert executor._executor is not None
+
+    executor._verificar_fork()
+    assert executor._executor is None
+    assert executor._slots.acquire(blocking=False)
@@ -0,0 +1,105 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app.models import db_pool, resumos
+from app.models.db_pool import ConnectionPool
+from app.utils.ttl_cache import TTLCache
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_ttl_cache_expira_e_calcula_uma_vez():
+    relogio = Relogio()
+    cache = TTLCache(ttl=10, clock=relogio)
+    chamadas = []
+
+    def fabrica():
+        chamadas.append(1)
+        return len(chamadas)
+
+    assert cache.get_or_set('GOVERNANTE', fabrica) == 1
+    relogio.agora = 9
+    assert cache.get_or_set('GOVERNANTE', fabrica) == 1
+    relogio.agora = 10
+    assert cache.get_or_set('GOVERNANTE', fabrica) == 2
+    assert cache.get('FUNCIONARIO') is None
+
+
+def test_ttl_cache_concorrente_calcula_uma_vez():
+    cache = TTLCache(ttl=60)
+    chamadas = []
+    liberar = threading.Event()
+
+    def fabrica():
+        liberar.wait(1)
+        chamadas.append(1)
+        return 'snapshot'
+
+    threads = [threading.Thread(target=cache.get_or_set, args=('k', fabrica)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    liberar.set()
+    for t in threads:
+        t.join()
+    assert len(chamadas) == 1
+
+
+class FakeCursor:
+    """Responde às duas consultas de ler_snapshot"""
+
+    def __init__(self):
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        if 'resumo_ponto_dia' in sql:
+            self._rows = [
+                {'departamento': 'Operação', 'registros': 12, 'faltas': 1},
+                {'departamento': '', 'registros': 3, 'faltas': 0},
+            ]
+        else:
+            self._rows = [
+                {'departamento': 'Operação', 'criadas': 10, 'concluidas': 8},
+                {'departamento': 'TI', 'criadas': 4, 'concluidas': 1},
+            ]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self, dictionary=False, prepared=False):
+        return FakeCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool_falso():
+    db_pool.set_pool(ConnectionPool(FakeConnection, pool_size=1))
+    yield
+    db_pool.set_pool(None)
+
+
+def test_snapshot_agrega_os_resumos(pool_falso):
+    snapshot = resumos.ler_snapshot(hoje=date(2025, 3, 10), por_departamento=True)
+
+    assert snapshot['activeUsers'] == 15
+    assert snapshot['absences'] == 1
+    assert snapshot['tasksCreated'] == 14
+    assert snapshot['efficiency'] == 64
+    departamentos = {d['department']: d for d in snapshot['departments']}
+    assert departamentos['Operação'] == {'department': 'Operação', 'activeUsers': 12, 'efficiency': 80}
+    assert departamentos['TI']['activeUsers'] == 0
+    assert 'Sem departamento' in departamentos
@@ -0,0 +1,101 @@
+import pytest
+from flask import Flask
+
+from app.models import db_pool
+from app.models.db_pool import ConnectionPool, DatabaseUnavailableError, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.pings = 0
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_reutiliza_conexao_devolvida():
+    criadas = []
+    pool = ConnectionPool(lambda: criadas.append(FakeConnection()) or criadas[-1], pool_size=2, max_overflow=0)
+
+    conn = pool.connect()
+    conn.close()
+    pool.connect().close()
+
+    assert len(criadas) == 1
+    assert pool.checked_out == 0
+
+
+def test_overflow_fecha_ao_devolver_e_timeout_quando_esgotado():
+    pool = ConnectionPool(FakeConnection, pool_size=1, max_overflow=1, timeout=0.05)
+
+    a = pool.connect()
+    b = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+
+    raw_b = b.raw
+    a.close()
+    b.close()
+    assert raw_b.closed
+    assert pool.checked_out == 0
+
+
+def test_rollback_de_transacao_pendente_ao_devolver():
+    pool = ConnectionPool(FakeConnection, pool_size=1)
+    conn = pool.connect()
+    raw = conn.raw
+    raw.in_transaction = True
+    conn.close()
+    assert raw.rollbacks == 1
+
+
+def test_recicla_conexao_antiga_e_pinga_ociosa():
+    pool = ConnectionPool(FakeConnection, pool_size=1, recycle=0, ping_after=None)
+    conn = pool.connect()
+    velha = conn.raw
+    conn.close()
+    assert pool.connect().raw is not velha
+    assert velha.closed
+
+    pool = ConnectionPool(FakeConnection, pool_size=1, recycle=None, ping_after=0)
+    conn = pool.connect()
+    raw = conn.raw
+    conn.close()
+    pool.connect()
+    assert raw.pings == 1
+
+
+def test_falha_de_conexao_levanta_erro_claro():
+    def falha():
+        raise OSError('recusada')
+
+    pool = ConnectionPool(falha, pool_size=1, max_overflow=0)
+    with pytest.raises(DatabaseUnavailableError):
+        pool.connect()
+    assert pool.checked_out == 0
+
+
+def test_uma_conexao_por_requisicao():
+    pool = ConnectionPool(FakeConnection, pool_size=1, max_overflow=0, timeout=0.05)
+    db_pool.set_pool(pool)
+    app = Flask(__name__)
+    db_pool.init_app(app)
+    try:
+        with app.app_context():
+            primeira = db_pool.get_connection()
+            primeira.close()
+            assert db_pool.get_connection() is primeira
+            assert pool.checked_out == 1
+        assert pool.checked_out == 0
+    finally:
+        db_pool.set_pool(None)
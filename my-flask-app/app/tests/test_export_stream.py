@@ -0,0 +1,59 @@
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from app.utils import export_stream
+
+CABECALHO = ['ID', 'Título', 'Criada em']
+
+
+def _linhas(n, consumidas):
+    for i in range(n):
+        consumidas.append(i)
+        yield (i, f'Tarefa {i}', datetime(2025, 1, 1, 8, 30))
+
+
+def test_csv_envia_cabecalho_antes_de_ler_o_banco():
+    consumidas = []
+    stream = export_stream.csv_stream(CABECALHO, _linhas(1200, consumidas), flush_every=500)
+
+    primeiro = next(stream)
+    assert consumidas == []
+    assert primeiro.decode('utf-8-sig').strip() == 'ID;Título;Criada em'
+
+    segundo = next(stream)
+    assert len(consumidas) == 500
+    assert segundo.decode('utf-8').splitlines()[0] == '0;Tarefa 0;01/01/2025 08:30'
+
+    resto = b''.join(stream)
+    assert len(consumidas) == 1200
+    assert resto.decode('utf-8').splitlines()[-1].startswith('1199;')
+
+
+def test_xlsx_gera_planilha_valida_e_remove_temporario(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_stream.tempfile, 'tempdir', str(tmp_path))
+    conteudo = b''.join(export_stream.xlsx_stream(CABECALHO, _linhas(50, []), chunk_size=1024))
+
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as planilha:
+        assert 'xl/worksheets/sheet1.xml' in planilha.namelist()
+        folha = planilha.read('xl/worksheets/sheet1.xml').decode('utf-8')
+    assert 'Tarefa 49' in folha  # constant_memory grava strings inline
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_formato_desconhecido():
+    with pytest.raises(ValueError):
+        export_stream.stream('pdf', CABECALHO, [])
+
+
+def test_periodo_personalizado_exige_as_duas_datas():
+    from app.controllers.controller import RelatorioController
+
+    sem_datas = RelatorioController.exportar_relatorio('custom', None, '2025-03-31')
+    assert not sem_datas['success'] and 'período personalizado' in sem_datas['message']
+    assert not RelatorioController.exportar_relatorio('custom', '31/03/2025', '2025-03-31')['success']
+
+    result = RelatorioController.exportar_relatorio('custom', '2025-03-01', '2025-03-31', 'csv')
+    assert result['filename'] == 'relatorio_tarefas_20250301_20250331.csv'
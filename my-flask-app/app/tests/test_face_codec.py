@@ -0,0 +1,45 @@
+import base64
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from app.utils import face_codec
+
+
+def test_formato_binario_compacto_e_sem_copia():
+    encoding = np.random.default_rng(0).normal(size=128)
+    data = face_codec.serialize_encoding(encoding)
+
+    assert len(data) == face_codec.HEADER_SIZE + 128 * 4
+    assert face_codec.read_header(data) == (1, face_codec.DTYPE_FLOAT32, 128, face_codec.MODEL_DLIB_RESNET_V1)
+
+    decoded = face_codec.deserialize_encoding(data)
+    assert decoded.dtype == np.float32
+    assert decoded.base is not None  # view sobre o buffer
+    np.testing.assert_allclose(decoded, encoding, rtol=1e-6)
+
+
+def test_le_formato_legado_pickle_base64():
+    encoding = np.random.default_rng(1).normal(size=128)
+    legado = base64.b64encode(pickle.dumps(encoding))
+    np.testing.assert_array_equal(face_codec.deserialize_encoding(legado), encoding)
+
+
+def test_legado_recusa_pickle_arbitrario():
+    malicioso = base64.b64encode(pickle.dumps(os.system))
+    with pytest.raises(pickle.UnpicklingError):
+        face_codec.deserialize_encoding(malicioso)
+
+
+def test_deserialize_many_em_uma_matriz():
+    encodings = np.random.default_rng(2).normal(size=(10, 128))
+    blobs = [face_codec.serialize_encoding(e) for e in encodings]
+
+    matrix = face_codec.deserialize_many(blobs)
+    assert matrix.shape == (10, 128) and matrix.flags['C_CONTIGUOUS']
+    np.testing.assert_allclose(matrix, encodings, rtol=1e-6)
+
+    with pytest.raises(face_codec.EncodingFormatError):
+        face_codec.deserialize_many(blobs[:-1] + [blobs[-1][:-4]])
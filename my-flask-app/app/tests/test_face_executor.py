@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from app.utils.face_executor import FaceExecutor, FaceExecutorBusy, FaceExecutorTimeout
+
+
+def dormir(segundos):
+    time.sleep(segundos)
+    return segundos
+
+
+@pytest.fixture
+def executor():
+    executor = FaceExecutor(workers=1, max_pending=0, timeout=5, initializer=None)
+    yield executor
+    executor.shutdown()
+
+
+def test_executa_job_no_pool(executor):
+    assert executor.run(dormir, 0) == 0
+
+
+def test_fila_cheia_responde_rapido(executor):
+    executor.submit(dormir, 0.5)
+    inicio = time.monotonic()
+    with pytest.raises(FaceExecutorBusy):
+        executor.submit(dormir, 0)
+    assert time.monotonic() - inicio < 0.1
+
+
+def test_timeout_mantem_slot_ate_o_job_terminar(executor):
+    executor.run(dormir, 0)  # sobe o worker
+    with pytest.raises(FaceExecutorTimeout):
+        executor.run(dormir, 0.5, timeout=0.05)
+    with pytest.raises(FaceExecutorBusy):
+        executor.submit(dormir, 0)
+    time.sleep(0.7)
+    assert executor.run(dormir, 0) == 0
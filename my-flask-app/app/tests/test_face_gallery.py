@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.utils import face_codec
+from app.utils.face_gallery import FaceGallery
+
+
+class FakeSource:
+    """Imita as consultas de Usuario usadas pela galeria"""
+
+    def __init__(self):
+        self.rows = {}  # id -> (rosto, atualizado_em)
+        self.clock = 0
+        self.versao = 0  # contador 'faceid' de versao_recurso
+        self.full_loads = 0
+        self.version_checks = 0
+
+    def set(self, user_id, encoding, mesmo_segundo=False):
+        self.versao += 1
+        self.clock += 0 if mesmo_segundo else 1
+        self.rows[user_id] = (face_codec.serialize_encoding(encoding), datetime(2025, 1, 1) + timedelta(seconds=self.clock))
+
+    def contador_faceid(self):
+        return self.versao
+
+    def versao_faceid(self):
+        self.version_checks += 1
+        return self.versao, len(self.rows), max((t for _, t in self.rows.values()), default=None)
+
+    def buscar_usuarios_com_faceid(self):
+        self.full_loads += 1
+        return [{'id': i, 'rosto': r} for i, (r, _) in self.rows.items()]
+
+    def buscar_faceid_alterados_desde(self, momento):
+        return [{'id': i, 'rosto': r} for i, (r, t) in self.rows.items() if t >= momento]
+
+    def listar_ids_com_faceid(self):
+        return list(self.rows)
+
+
+def _encoding(valor):
+    return np.full(128, valor, dtype=np.float64)
+
+
+def test_carrega_sob_demanda_uma_unica_vez():
+    source = FakeSource()
+    source.set(1, _encoding(0.1))
+    source.set(2, _encoding(0.2))
+    gallery = FaceGallery(source, check_interval=3600)
+
+    assert source.full_loads == 0
+    assert len(gallery) == 2
+    ids, distances = gallery.search(_encoding(0.1), k=2)
+    assert ids == [1, 2]
+    assert distances[0] < 1e-3
+    len(gallery)
+    assert source.full_loads == 1
+
+
+def test_write_through_upsert_e_remove():
+    source = FakeSource()
+    for i in range(20):
+        source.set(i, _encoding(i))
+    gallery = FaceGallery(source, check_interval=3600)
+    len(gallery)
+
+    gallery.upsert(5, face_codec.serialize_encoding(_encoding(-1)))
+    gallery.upsert(99, face_codec.serialize_encoding(_encoding(99)))
+    gallery.remove(0)
+
+    assert len(gallery) == 20
+    assert gallery.search(_encoding(-1), k=1)[0] == [5]
+    assert gallery.search(_encoding(99), k=1)[0] == [99]
+    assert 0 not in gallery.search(_encoding(0), k=20)[0]
+    assert source.full_loads == 1
+
+
+def test_sincroniza_alteracoes_de_outros_workers_sem_recarregar():
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    source.set(2, _encoding(2))
+    gallery = FaceGallery(source, check_interval=0)
+    len(gallery)
+
+    source.set(3, _encoding(3))
+    source.set(1, _encoding(10))
+    del source.rows[2]
+
+    ids, _ = gallery.search(_encoding(10), k=5)
+    assert ids == [1, 3]
+    assert source.full_loads == 1
+
+
+def test_restart_a_partir_do_indice_persistido(tmp_path):
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    source.set(2, _encoding(2))
+    path = str(tmp_path / 'faceid.npz')
+    len(FaceGallery(source, persist_path=path))
+
+    source.set(3, _encoding(3))
+    gallery = FaceGallery(source, persist_path=path)
+
+    assert len(gallery) == 3
+    assert source.full_loads == 1
+
+
+def test_falha_ao_persistir_nao_derruba_o_login(tmp_path):
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    gallery = FaceGallery(source, persist_path=str(tmp_path / 'nao-existe' / 'faceid.npz'))
+
+    ids, _ = gallery.search(_encoding(1), k=1)
+    assert ids == [1]
+    assert not gallery.save()
+
+
+def test_persistencia_nao_deixa_temporarios(tmp_path):
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    gallery = FaceGallery(source, persist_path=str(tmp_path / 'faceid.npz'))
+    len(gallery)
+    assert gallery.save()
+    assert [p.name for p in tmp_path.iterdir()] == ['faceid.npz']
+
+
+def test_recadastro_no_mesmo_segundo_e_sincronizado():
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    source.set(2, _encoding(2))
+    gallery = FaceGallery(source, check_interval=0)
+    len(gallery)
+
+    # Mesmo segundo e mesma quantidade de rostos: só o contador muda
+    source.set(2, _encoding(20), mesmo_segundo=True)
+
+    ids, _ = gallery.search(_encoding(20), k=1)
+    assert ids == [2]
+    assert source.full_loads == 1
+
+
+def test_sem_alteracao_nao_consulta_a_tabela_de_usuarios():
+    source = FakeSource()
+    source.set(1, _encoding(1))
+    gallery = FaceGallery(source, check_interval=0)
+    len(gallery)
+    checks = source.version_checks
+
+    for _ in range(5):
+        gallery.search(_encoding(1), k=1)
+    assert source.version_checks == checks
+
+    source.set(2, _encoding(2))
+    assert gallery.search(_encoding(2), k=1)[0] == [2]
+    assert source.version_checks == checks + 1
@@ -0,0 +1,54 @@
+import numpy as np
+
+from app.utils.face_index import FlatIndex, IVFIndex, create_index, load_index
+
+
+def _galeria(n=5000, dim=128, clusters=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=n)] + rng.normal(scale=0.05, size=(n, dim)).astype(np.float32)
+    return list(range(n)), vectors
+
+
+def test_ivf_encontra_o_mesmo_vizinho_que_a_busca_exata():
+    ids, vectors = _galeria()
+    flat, ivf = FlatIndex(), IVFIndex(nprobe=4)
+    flat.build(ids, vectors)
+    ivf.build(ids, vectors)
+
+    rng = np.random.default_rng(1)
+    probes = vectors[rng.integers(len(ids), size=50)] + 0.01
+    acertos = sum(ivf.search(p, k=1)[0] == flat.search(p, k=1)[0] for p in probes)
+    assert acertos >= 48
+
+    top_ids, distances = ivf.search(probes[0], k=2)
+    assert len(top_ids) == 2 and distances[0] <= distances[1]
+
+
+def test_ivf_add_remove_incremental():
+    ids, vectors = _galeria(n=2000)
+    ivf = IVFIndex(nprobe=2)
+    ivf.build(ids, vectors)
+
+    novo = np.full(128, 7.0, dtype=np.float32)
+    ivf.upsert('novo', novo)
+    assert ivf.search(novo, k=1)[0] == ['novo']
+
+    ivf.remove('novo')
+    ivf.remove(0)
+    assert 'novo' not in ivf and 0 not in ivf
+    assert len(ivf) == 1999
+
+
+def test_persistencia(tmp_path):
+    ids, vectors = _galeria(n=2000)
+    for kind in ('flat', 'ivf'):
+        index = create_index(kind)
+        index.build(ids, vectors)
+        path = str(tmp_path / f'{kind}.npz')
+        index.save(path, version_count=2000)
+
+        loaded, metadata = load_index(path)
+        assert type(loaded) is type(index)
+        assert metadata == {'version_count': 2000}
+        assert loaded.search(vectors[123], k=1)[0] == [123]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from app.utils.face_matching import face_distances, identify, stack_encodings, squared_norms
+
+
+def test_distancias_iguais_ao_calculo_direto():
+    rng = np.random.default_rng(0)
+    gallery = stack_encodings(list(rng.normal(size=(50, 128))))
+    probe = rng.normal(size=128)
+
+    esperado = np.linalg.norm(gallery.astype(np.float64) - probe, axis=1)
+    np.testing.assert_allclose(face_distances(gallery, probe), esperado, rtol=1e-4)
+    np.testing.assert_allclose(face_distances(gallery, probe, squared_norms(gallery)), esperado, rtol=1e-4)
+
+
+def test_identifica_melhor_e_segundo_colocado():
+    rng = np.random.default_rng(1)
+    gallery = stack_encodings(list(rng.normal(scale=0.1, size=(1000, 128))))
+    ids = list(range(100, 1100))
+    probe = gallery[437] + 0.001
+
+    result = identify(gallery, ids, probe, tolerance=0.6)
+
+    assert result['match'] is True
+    assert result['user_id'] == 537
+    assert result['runner_up_id'] != 537
+    assert result['margin'] > 0
+    assert result['runner_up_distance'] - result['distance'] == pytest.approx(result['margin'])
+
+
+def test_sem_correspondencia_acima_da_tolerancia():
+    gallery = stack_encodings([np.zeros(128), np.ones(128)])
+    result = identify(gallery, ['a', 'b'], np.full(128, 5.0), tolerance=0.6)
+    assert result['match'] is False
+    assert result['user_id'] == 'b'
+
+
+def test_galeria_vazia_e_unitaria():
+    assert identify(stack_encodings([]), [], np.zeros(128))['user_id'] is None
+
+    result = identify(stack_encodings([np.zeros(128)]), [7], np.zeros(128))
+    assert result['match'] is True
+    assert result['user_id'] == 7
+    assert result['margin'] is None
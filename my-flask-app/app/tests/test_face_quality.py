@@ -0,0 +1,59 @@
+import numpy as np
+import cv2
+
+from app.utils import face_quality
+from app.utils.face_quality import QualityGate
+
+
+def _textura(brilho=128, amplitude=60, tamanho=480):
+    """Imagem RGB nítida: tabuleiro com bordas bem definidas"""
+    rng = np.random.default_rng(0)
+    blocos = rng.integers(0, 2, size=(tamanho // 16, tamanho // 16))
+    gray = np.kron(blocos, np.ones((16, 16))) * 2 * amplitude + (brilho - amplitude)
+    gray = np.clip(gray, 0, 255).astype(np.uint8)
+    return np.dstack([gray] * 3)
+
+
+def test_imagem_boa_passa_nas_etapas_baratas():
+    resultado = QualityGate().check_cheap(_textura())
+    assert resultado['valid']
+    assert resultado['code'] == face_quality.QUALITY_OK
+    assert set(resultado['metrics']) == {'brightness', 'contrast', 'sharpness'}
+
+
+def test_cascata_na_ordem_tamanho_brilho_contraste_nitidez():
+    gate = QualityGate()
+    assert gate.check_cheap(_textura(tamanho=128))['code'] == face_quality.TOO_SMALL
+    assert gate.check_cheap(_textura(brilho=20, amplitude=10))['code'] == face_quality.TOO_DARK
+    assert gate.check_cheap(_textura(amplitude=5))['code'] == face_quality.LOW_CONTRAST
+
+    borrada = cv2.GaussianBlur(_textura(), (0, 0), 10)
+    resultado = gate.check_cheap(borrada)
+    assert resultado['code'] == face_quality.BLURRY
+    assert not resultado['valid']
+    assert resultado['message'] == face_quality.MESSAGES[face_quality.BLURRY]
+
+
+def test_miniatura_reduz_antes_de_converter():
+    thumb = face_quality.gray_thumbnail(_textura(tamanho=640), size=160)
+    assert thumb.shape == (160, 160)
+    assert thumb.ndim == 2
+
+
+def test_etapa_de_rosto():
+    gate = QualityGate()
+    assert gate.check_faces([], 480)['code'] == face_quality.NO_FACE
+    assert gate.check_faces([(0, 10, 10, 0), (20, 30, 30, 20)], 480)['code'] == face_quality.MULTIPLE_FACES
+    assert gate.check_faces([(100, 150, 150, 100)], 480)['code'] == face_quality.FACE_TOO_FAR
+    assert gate.check_faces([(100, 300, 300, 100)], 480)['valid']
+
+
+def test_melhores_frames_da_rajada():
+    def nota(score, message=''):
+        return {'score': score, 'message': message}
+
+    scores = [nota(0.2), nota(0, 'Imagem borrada'), nota(0.9), nota(0.5)]
+    assert face_quality.best_frames(scores) == ([2, 3], None)
+    assert face_quality.best_frames(scores, max_candidates=1) == ([2], None)
+    assert face_quality.best_frames([nota(0), nota(0, 'Imagem muito escura')]) == ([], 'Imagem muito escura')
+    assert face_quality.frame_score(200, 128, 0.4) > face_quality.frame_score(50, 128, 0.4)
@@ -0,0 +1,114 @@
+import base64
+import importlib
+import sys
+import types
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+
+class FaceRecognitionFalso:
+    """Imita face_recognition: um rosto no centro da imagem recebida, registrando cada chamada"""
+
+    def __init__(self):
+        self.deteccoes = []   # (shape, upsample, model)
+        self.landmarks = []   # (shape, localizações)
+        self.encodings = []   # (shape, landmark)
+
+    def face_locations(self, image, number_of_times_to_upsample=1, model='hog'):
+        self.deteccoes.append((image.shape, number_of_times_to_upsample, model))
+        height, width = image.shape[:2]
+        return [(height // 4, 3 * width // 4, 3 * height // 4, width // 4)]
+
+    def raw_face_landmarks(self, image, face_locations, model='large'):
+        self.landmarks.append((image.shape, list(face_locations)))
+        return [f'landmark-{i}' for i in range(len(face_locations))]
+
+    def compute_face_descriptor(self, image, landmark, num_jitters):
+        self.encodings.append((image.shape, landmark))
+        return np.full(128, 0.1)
+
+
+@pytest.fixture
+def fr(monkeypatch):
+    """face_recognition_utils importado sobre um face_recognition falso (sem dlib)"""
+    falso = FaceRecognitionFalso()
+    api = types.ModuleType('face_recognition.api')
+    api._raw_face_landmarks = falso.raw_face_landmarks
+    api.face_encoder = types.SimpleNamespace(compute_face_descriptor=falso.compute_face_descriptor)
+    modulo = types.ModuleType('face_recognition')
+    modulo.api = api
+    modulo.face_locations = falso.face_locations
+    monkeypatch.setitem(sys.modules, 'face_recognition', modulo)
+    monkeypatch.setitem(sys.modules, 'face_recognition.api', api)
+
+    sys.modules.pop('app.utils.face_recognition_utils', None)
+    falso.utils = importlib.import_module('app.utils.face_recognition_utils')
+    yield falso
+    sys.modules.pop('app.utils.face_recognition_utils', None)
+
+
+def _imagem(width, height):
+    """Xadrez em tons médios: passa nas etapas baratas do portão (brilho, contraste, nitidez)"""
+    y, x = np.mgrid[:height, :width]
+    casas = ((y // (height // 6) + x // (width // 8)) % 2).astype(np.uint8)
+    return np.repeat((70 + casas * 120)[..., None], 3, axis=2)
+
+
+def _base64(image, formato='JPEG'):
+    buffer = BytesIO()
+    Image.fromarray(image).save(buffer, format=formato)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def test_registro_detecta_uma_vez_e_reaproveita_no_encoding(fr):
+    system = fr.utils.FaceRecognitionSystem(detection_size=320)
+
+    result = system.register_face(_base64(_imagem(640, 480)))
+
+    assert result['success'], result['message']
+    assert len(fr.deteccoes) == 1
+    assert fr.landmarks == [((480, 640, 3), [(120, 480, 360, 160)])]
+    assert fr.encodings == [((480, 640, 3), 'landmark-0')]
+
+
+def test_caixas_da_deteccao_reduzida_voltam_para_a_resolucao_original(fr):
+    system = fr.utils.FaceRecognitionSystem(detection_size=320, upsample=0)
+    face = system.analyze(_imagem(1280, 960))
+
+    assert face.face_locations == [(240, 960, 720, 320)]
+    assert fr.deteccoes == [((240, 320, 3), 0, 'hog')]
+    assert face.scale == 0.25
+
+
+def test_imagem_menor_que_a_deteccao_nao_e_reduzida(fr):
+    system = fr.utils.FaceRecognitionSystem(detection_size=320)
+    face = system.analyze(_imagem(300, 200))
+
+    assert face.face_locations == [(50, 225, 150, 75)]
+    assert face.detection_image is face.image
+
+
+@pytest.mark.parametrize('formato', ['JPEG', 'PNG'])
+def test_decodificacao_respeita_max_decode_size(fr, formato):
+    system = fr.utils.FaceRecognitionSystem(max_decode_size=640)
+    dados = _base64(_imagem(2000, 1500), formato)
+
+    assert system.process_image_from_base64(dados).shape == (480, 640, 3)
+    assert system.process_image_from_base64(dados, max_size=160).shape == (120, 160, 3)
+    assert fr.utils.FaceRecognitionSystem(max_decode_size=0).process_image_from_base64(dados).shape == (1500, 2000, 3)
+
+
+def test_nota_da_rajada_usa_hog_e_o_encoding_o_modelo_configurado(fr):
+    system = fr.utils.FaceRecognitionSystem(model='cnn', detection_size=320)
+    frame = _base64(_imagem(640, 480))
+
+    nota = system.score_frame(frame)
+    assert nota['score'] > 0
+    assert fr.deteccoes == [((120, 160, 3), 1, 'hog')]
+
+    encodings, _ = system.extract_best_encodings([frame, frame], max_candidates=1)
+    assert len(encodings) == 1
+    assert [model for _, _, model in fr.deteccoes] == ['hog', 'hog', 'hog', 'cnn']
@@ -0,0 +1,105 @@
+import subprocess
+import sys
+import types
+
+import pytest
+
+from app.utils import face_executor as face_executor_module
+from app.utils import face_stack
+from app.utils.face_executor import FaceExecutor, FaceExecutorUnavailable
+
+
+class SistemaFalso:
+    aquecimentos = 0
+
+    def warm_up(self):
+        SistemaFalso.aquecimentos += 1
+
+
+@pytest.fixture
+def pilha(monkeypatch):
+    """Fachada zerada apontando para um módulo falso (sem OpenCV/dlib)"""
+    modulo = types.ModuleType('pilha_falsa')
+    modulo.criar_sistema = SistemaFalso
+    monkeypatch.setitem(sys.modules, 'pilha_falsa', modulo)
+    monkeypatch.setattr(face_stack, 'MODULO', 'pilha_falsa')
+    for nome, valor in (('_sistema', None), ('_erro', None), ('_aquecido_em', None)):
+        monkeypatch.setattr(face_stack, nome, valor)
+    monkeypatch.delenv('WORKER_ROLE', raising=False)
+    SistemaFalso.aquecimentos = 0
+
+
+def test_app_nao_importa_a_pilha_facial():
+    codigo = (
+        "import sys, Main, asgi; "
+        "assert 'app.utils.face_recognition_utils' not in sys.modules; "
+        "assert 'cv2' not in sys.modules and 'face_recognition' not in sys.modules"
+    )
+    subprocess.run([sys.executable, '-c', codigo], check=True, capture_output=True)
+
+
+def test_carrega_no_primeiro_uso_e_aquece_uma_vez(pilha):
+    assert not face_stack.carregado()
+    assert face_stack.sistema() is face_stack.sistema()
+
+    face_stack.aquecer()
+    estado = face_stack.aquecer()
+    assert SistemaFalso.aquecimentos == 1
+    assert estado['carregado'] and estado['aquecido'] and estado['erro'] is None
+
+
+def test_pilha_ausente(pilha, monkeypatch):
+    monkeypatch.setattr(face_stack, 'MODULO', 'modulo_que_nao_existe')
+    with pytest.raises(face_stack.FaceStackIndisponivel):
+        face_stack.sistema()
+    assert 'modulo_que_nao_existe' in face_stack.estado()['erro']
+
+
+def test_workers_aquecidos_antes_de_ficar_pronto(pilha):
+    executor = FaceExecutor(workers=2, max_pending=0, timeout=5, start_method='fork')
+    try:
+        estado = executor.warm_up()
+    finally:
+        executor.shutdown()
+    assert estado == {'pronto': True, 'workers': 2, 'aquecidos': 2, 'erro': None}
+
+
+def _carregado(modulo):
+    return modulo in sys.modules
+
+
+def test_forkserver_traz_a_pilha_pre_importada(pilha, monkeypatch):
+    monkeypatch.setattr(face_stack, 'MODULO', 'colorsys')  # módulo leve que nada mais importa
+    executor = FaceExecutor(workers=1, max_pending=0, timeout=30, initializer=None, start_method='forkserver')
+    try:
+        assert executor.run(_carregado, 'colorsys')
+    finally:
+        executor.shutdown()
+
+
+def test_papel_api_nao_atende_faceid(pilha, monkeypatch):
+    monkeypatch.setenv('WORKER_ROLE', 'api')
+    executor = FaceExecutor(workers=1, max_pending=0, initializer=None)
+    with pytest.raises(FaceExecutorUnavailable):
+        executor.run(len, 'x')
+    assert executor._executor is None  # nenhum processo criado
+
+
+@pytest.mark.parametrize('papel, pronto_facial, status', [
+    ('api', None, 200),
+    ('completo', False, 200),
+    ('face', False, 503),
+    ('face', True, 200),
+])
+def test_prontidao(monkeypatch, papel, pronto_facial, status):
+    from Main import app
+
+    class ExecutorFalso:
+        def warm_up(self, wait=True):
+            return {'pronto': pronto_facial, 'workers': 1, 'aquecidos': int(pronto_facial), 'erro': None}
+
+    monkeypatch.setenv('WORKER_ROLE', papel)
+    monkeypatch.setattr(face_executor_module, 'face_executor', ExecutorFalso())
+    resposta = app.test_client().get('/api/ready')
+    assert resposta.status_code == status
+    assert resposta.get_json()['papel'] == papel
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.controllers import controller
+from app.controllers.controller import FaceIDController
+from app.utils import face_quality
+
+
+class ExecutorFalso:
+    """Escolhe os frames com face_quality.best_frames a partir de notas fixas, sem OpenCV/dlib"""
+
+    def __init__(self, notas):
+        self.notas = notas  # frame -> nota
+        self.codificados = []
+
+    def extract_best_encodings(self, frames, max_candidates=2):
+        scores = [{'score': self.notas[frame], 'message': ''} for frame in frames]
+        best, error = face_quality.best_frames(scores, max_candidates)
+        self.codificados = [frames[i] for i in best]
+        # O "encoding" é o próprio frame: a galeria falsa sabe a quem ele corresponde
+        return [(frames[i], i) for i in best], error
+
+
+class GaleriaFalsa:
+    """Cada probe aponta para (usuário, distância) fixos"""
+
+    def __init__(self, vizinhos):
+        self.vizinhos = vizinhos
+
+    def __len__(self):
+        return 3
+
+    def search(self, probe, k=2):
+        user_id, distancia = self.vizinhos[probe]
+        return [user_id, 99], np.array([distancia, 0.9])
+
+
+@pytest.fixture
+def rajada(monkeypatch):
+    def montar(notas, vizinhos):
+        executor = ExecutorFalso(notas)
+        monkeypatch.setattr(controller, 'face_executor', executor)
+        monkeypatch.setattr(controller, 'face_gallery', GaleriaFalsa(vizinhos))
+        monkeypatch.setattr(
+            controller.Usuario, 'buscar_dados_login',
+            staticmethod(lambda user_id: controller.Usuario(id=user_id, nome=f'Usuário {user_id}', email='', cargo=''))
+        )
+        return executor
+    return montar
+
+
+def test_so_os_dois_melhores_frames_viram_encoding_e_o_mais_proximo_decide(rajada):
+    notas = {'f0': 0.3, 'f1': 0.0, 'f2': 0.8, 'f3': 0.6, 'f4': 0.1}
+    executor = rajada(notas, {'f2': (1, 0.45), 'f3': (2, 0.30)})
+
+    result = FaceIDController.autenticar_faceid_frames(list(notas))
+
+    assert executor.codificados == ['f2', 'f3']
+    assert result['success']
+    assert result['user']['id'] == 2  # menor distância entre os candidatos, não o frame de maior nota
+
+
+def test_frames_alem_do_limite_sao_ignorados(rajada):
+    frames = [f'f{i}' for i in range(FaceIDController.MAX_FRAMES + 2)]
+    notas = {frame: 0.1 for frame in frames}
+    notas[frames[-1]] = 1.0  # o melhor frame chega depois do limite
+    executor = rajada(notas, {frame: (1, 0.4) for frame in frames})
+
+    FaceIDController.autenticar_faceid_frames(frames)
+
+    assert frames[-1] not in executor.codificados
+    assert len(executor.codificados) == 2
+
+
+def test_nenhum_candidato_reconhecido(rajada):
+    rajada({'f0': 0.5, 'f1': 0.4}, {'f0': (1, 0.8), 'f1': (2, 0.7)})
+
+    result = FaceIDController.autenticar_faceid_frames(['f0', 'f1'])
+
+    assert not result['success']
+    assert 'não reconhecido' in result['message']
@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask, jsonify, session
+
+from app.utils.http_cache import condicional
+
+estado = {'versao': 1, 'consultas': 0}
+
+
+def _criar_app():
+    app = Flask(__name__)
+    app.secret_key = 'teste'
+
+    @app.route('/login/<papel>')
+    def login(papel):
+        session['user'] = 'Fulano'
+        session['user_email'] = 'fulano@gmail.com'
+        session['user_role'] = papel
+        return 'ok'
+
+    @app.route('/api/lista')
+    @condicional(lambda: ([estado['versao']], datetime(2025, 1, 1, 12, 0, 0)))
+    def lista():
+        estado['consultas'] += 1
+        return jsonify({'itens': [1, 2, 3]})
+
+    return app
+
+
+@pytest.fixture
+def client():
+    estado.update(versao=1, consultas=0)
+    with _criar_app().test_client() as client:
+        yield client
+
+
+def test_304_sem_rodar_a_consulta(client):
+    client.get('/login/GOVERNANTE')
+    primeira = client.get('/api/lista')
+    etag = primeira.headers['ETag']
+
+    assert primeira.status_code == 200
+    assert primeira.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in primeira.headers['Vary']
+    assert primeira.headers['Last-Modified'] == 'Wed, 01 Jan 2025 12:00:00 GMT'
+
+    segunda = client.get('/api/lista', headers={'If-None-Match': etag})
+    assert segunda.status_code == 304
+    assert segunda.headers['ETag'] == etag
+    assert estado['consultas'] == 1
+
+
+def test_nova_versao_invalida(client):
+    client.get('/login/GOVERNANTE')
+    etag = client.get('/api/lista').headers['ETag']
+    estado['versao'] = 2
+    assert client.get('/api/lista', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_etag_depende_do_papel_e_da_url(client):
+    client.get('/login/GOVERNANTE')
+    etag_governante = client.get('/api/lista').headers['ETag']
+    assert client.get('/api/lista?cursor=abc').headers['ETag'] != etag_governante
+
+    client.get('/login/FUNCIONARIO')
+    resposta = client.get('/api/lista', headers={'If-None-Match': etag_governante})
+    assert resposta.status_code == 200
+    assert resposta.headers['ETag'] != etag_governante
+
+
+def test_if_modified_since(client):
+    client.get('/login/SUPERVISOR')
+    resposta = client.get('/api/lista', headers={'If-Modified-Since': 'Wed, 01 Jan 2025 12:00:00 GMT'})
+    assert resposta.status_code == 304
+    resposta = client.get('/api/lista', headers={'If-Modified-Since': 'Wed, 01 Jan 2025 11:59:59 GMT'})
+    assert resposta.status_code == 200
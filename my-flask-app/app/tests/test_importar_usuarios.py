@@ -0,0 +1,169 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+from app.controllers.controller import UsuarioController
+from app.models import db_pool
+from app.models.db_pool import ConnectionPool
+from app.utils import spreadsheet
+
+CABECALHO = 'nome;email;senha;cargo;departamento;status'
+
+
+class FakeBanco:
+    """Guarda as consultas feitas; 'ana@x.com' já está cadastrada"""
+
+    def __init__(self):
+        self.consultas = []
+        self.inseridos = []
+        self.commits = 0
+
+
+class FakeCursor:
+    rowcount = 0
+
+    def __init__(self, banco, dictionary=False):
+        self.banco = banco
+        self.dictionary = dictionary
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.banco.consultas.append(sql)
+        if 'SELECT email FROM usuario' in sql:
+            self._rows = [
+                {'email': email} if self.dictionary else (email,)
+                for email in set(params) if email == 'ana@x.com'
+            ]
+
+    def executemany(self, sql, linhas):
+        self.banco.consultas.append(sql)
+        self.banco.inseridos.extend(linhas)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, banco):
+        self.banco = banco
+
+    def cursor(self, dictionary=False, prepared=False):
+        return FakeCursor(self.banco, dictionary)
+
+    def commit(self):
+        self.banco.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def banco():
+    banco = FakeBanco()
+    db_pool.set_pool(ConnectionPool(lambda: FakeConnection(banco), pool_size=1))
+    yield banco
+    db_pool.set_pool(None)
+
+
+def test_csv_detecta_delimitador_e_bom():
+    arquivo = io.BytesIO(('\ufeffNome,Email\nAna,ana@x.com\n\nBia,bia@x.com\n').encode('utf-8'))
+
+    linhas = list(spreadsheet.iter_registros(arquivo, 'csv'))
+
+    assert linhas == [(2, {'nome': 'Ana', 'email': 'ana@x.com'}), (4, {'nome': 'Bia', 'email': 'bia@x.com'})]
+
+
+def test_xlsx_le_primeira_aba():
+    workbook = Workbook()
+    workbook.active.append(['Nome', 'Email', 'Senha'])
+    workbook.active.append(['Ana', 'ana@x.com', 123456])
+    arquivo = io.BytesIO()
+    workbook.save(arquivo)
+    arquivo.seek(0)
+
+    assert list(spreadsheet.iter_registros(arquivo, 'xlsx')) == [
+        (2, {'nome': 'Ana', 'email': 'ana@x.com', 'senha': '123456'})
+    ]
+
+
+def test_formato_pela_extensao():
+    assert spreadsheet.formato_do_arquivo('Usuarios.XLSX') == 'xlsx'
+    assert spreadsheet.formato_do_arquivo('usuarios.txt') is None
+
+
+def test_importa_em_lotes_com_relatorio_por_linha(banco):
+    linhas = [
+        CABECALHO,
+        'Ana;ana@x.com;segredo;FUNCIONARIO;Operação;',
+        'Bia;bia@x.com;segredo;funcionario;Operação;',
+        'Caio;caio@x.com;123;FUNCIONARIO;Operação;ATIVO',
+        'Bia 2;BIA@x.com;segredo;SUPERVISOR;TI;',
+        'Duda;duda@x.com;segredo;MASTER;TI;PENDENTE',
+    ]
+    arquivo = io.BytesIO('\n'.join(linhas).encode('utf-8'))
+
+    relatorio = UsuarioController.importar_usuarios(spreadsheet.iter_csv(arquivo), tamanho_lote=2)
+
+    assert relatorio['total'] == 5
+    assert relatorio['criados'] == 2
+    assert {(e['linha'], e['message']) for e in relatorio['erros']} == {
+        (2, 'Email já cadastrado.'),
+        (4, 'A senha deve ter pelo menos 6 caracteres.'),
+        (5, 'Email repetido na planilha.'),
+    }
+    assert banco.inseridos == [
+        ('Bia', 'bia@x.com', 'segredo', 'FUNCIONARIO', 'Operação', 'ATIVO'),
+        ('Duda', 'duda@x.com', 'segredo', 'MASTER', 'TI', 'PENDENTE'),
+    ]
+    # Uma consulta de duplicidade por lote (2 lotes), não uma por linha
+    assert sum('SELECT email FROM usuario' in sql for sql in banco.consultas) == 2
+
+
+def test_simular_nao_grava(banco):
+    arquivo = io.BytesIO(f'{CABECALHO}\nBia;bia@x.com;segredo;FUNCIONARIO;TI;\n'.encode('utf-8'))
+
+    relatorio = UsuarioController.importar_usuarios(spreadsheet.iter_csv(arquivo), simular=True)
+
+    assert relatorio['criados'] == 1
+    assert banco.inseridos == []
+    assert banco.commits == 0
+
+
+def test_erro_de_lote_volta_no_relatorio(banco, monkeypatch):
+    def executemany(self, sql, linhas):
+        if any(linha[1] == 'caio@x.com' for linha in linhas):
+            raise ValueError('Data too long for column nome')
+        banco.inseridos.extend(linhas)
+
+    monkeypatch.setattr(FakeCursor, 'executemany', executemany)
+    linhas = [
+        CABECALHO,
+        'Bia;bia@x.com;segredo;FUNCIONARIO;TI;',
+        'Caio;caio@x.com;segredo;FUNCIONARIO;TI;',
+    ]
+    arquivo = io.BytesIO('\n'.join(linhas).encode('utf-8'))
+
+    relatorio = UsuarioController.importar_usuarios(spreadsheet.iter_csv(arquivo), tamanho_lote=1)
+
+    assert not relatorio['success'] and relatorio['criados'] == 1
+    assert relatorio['erros_lote'] == [{'linhas': [3], 'message': 'Erro ao gravar lote: Data too long for column nome'}]
+    assert 'Data too long' in relatorio['message']
+
+
+def test_planilha_ilegivel_no_meio_mantem_o_que_foi_gravado(banco):
+    def registros():
+        yield 2, {'nome': 'Bia', 'email': 'bia@x.com', 'senha': 'segredo', 'cargo': 'FUNCIONARIO', 'departamento': 'TI'}
+        raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+
+    relatorio = UsuarioController.importar_usuarios(registros(), tamanho_lote=1)
+
+    assert not relatorio['success']
+    assert relatorio['criados'] == 1 and len(banco.inseridos) == 1
+    assert relatorio['erro_planilha'].startswith('Não foi possível ler a planilha')
@@ -0,0 +1,119 @@
+import pytest
+from flask import Flask, jsonify
+
+from app.models import db_pool
+from app.models.db_pool import ConnectionPool, get_connection
+from app.utils import metrics
+
+
+class FakeCursor:
+    rowcount = -1
+
+    def execute(self, sql, params=()):
+        self.rowcount = 3 if sql.startswith('UPDATE') else -1
+
+    def fetchall(self):
+        return [(1,), (2,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def cursor(self, dictionary=False):
+        return FakeCursor()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def app():
+    metrics.registry.clear()
+    db_pool.set_pool(ConnectionPool(FakeConnection, pool_size=1))
+    app = Flask(__name__)
+    db_pool.init_app(app)
+    metrics.init_app(app)
+
+    @app.route('/usuarios/<int:id>')
+    def usuario(id):
+        cursor = get_connection().cursor()
+        cursor.execute("SELECT id FROM usuario WHERE id IN (%s, %s)", (id, id + 1))
+        cursor.fetchall()
+        cursor.execute("UPDATE usuario SET status = 'ATIVO' WHERE id = 7")
+        return jsonify({'ok': True})
+
+    @app.route('/metrics')
+    def exportar():
+        return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
+    yield app
+    db_pool.instrumentar()
+    db_pool.set_pool(None)
+    metrics.registry.clear()
+
+
+def test_normaliza_literais_e_listas():
+    assert metrics.normalize_sql("SELECT id FROM usuario\n  WHERE id IN (%s, %s, %s)") == \
+        "SELECT id FROM usuario WHERE id IN (...)"
+    assert metrics.normalize_sql("INSERT INTO ponto VALUES (%s, %s, 'REGISTRADO'), (%s, %s, 'REGISTRADO')") == \
+        "INSERT INTO ponto VALUES (...)"
+    assert metrics.normalize_sql("UPDATE usuario SET status = 'ATIVO' WHERE id = 7") == \
+        "UPDATE usuario SET status = ? WHERE id = ?"
+
+
+def test_histograma_no_formato_prometheus():
+    histograma = metrics.Histogram('teste_seconds', 'ajuda', ('rota',), buckets=(0.1, 1))
+    histograma.observe(0.05, rota='/a')
+    histograma.observe(2, rota='/a')
+
+    assert histograma.render() == [
+        '# HELP teste_seconds ajuda',
+        '# TYPE teste_seconds histogram',
+        'teste_seconds_bucket{rota="/a",le="0.1"} 1',
+        'teste_seconds_bucket{rota="/a",le="1"} 1',
+        'teste_seconds_bucket{rota="/a",le="+Inf"} 2',
+        'teste_seconds_sum{rota="/a"} 2.05',
+        'teste_seconds_count{rota="/a"} 2',
+    ]
+
+
+def test_requisicao_registra_rota_sql_e_checkout(app):
+    client = app.test_client()
+    assert client.get('/usuarios/1').status_code == 200
+    client.get('/usuarios/2')
+
+    select = "SELECT id FROM usuario WHERE id IN (...)"
+    update = "UPDATE usuario SET status = ? WHERE id = ?"
+    assert metrics.http_requests.value(method='GET', route='/usuarios/<int:id>', status=200) == 2
+    assert metrics.http_in_flight.value() == 0
+    assert metrics.db_queries.value(statement=select) == 2
+    assert metrics.db_rows.value(statement=select) == 4
+    assert metrics.db_rows.value(statement=update) == 6
+    assert metrics.db_request_queries.count(route='/usuarios/<int:id>') == 2
+    assert metrics.db_pool_checkout.count(outcome='ok') == 2
+
+    texto = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",route="/usuarios/<int:id>"} 2' in texto
+    assert f'db_queries_total{{statement="{select}"}} 2' in texto
+    assert 'db_pool_connections_in_use 0' in texto
+
+
+def test_consulta_lenta_vai_para_o_log(app, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, 'SLOW_QUERY_SECONDS', 0)
+
+    app.test_client().get('/usuarios/1')
+
+    assert '[lento] SQL' in capsys.readouterr().out
+
+
+def test_endpoint_exige_token_configurado(monkeypatch):
+    from Main import app
+
+    client = app.test_client()
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    assert client.get('/metrics').status_code == 403
+
+    monkeypatch.setenv('METRICS_TOKEN', 'segredo')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer segredo'}).status_code == 200
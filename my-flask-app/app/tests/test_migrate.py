@@ -0,0 +1,85 @@
+from database import migrate
+from database.migrate import Check
+
+
+class FakeExplainCursor:
+    """Devolve linhas de EXPLAIN pré-definidas por consulta"""
+
+    def __init__(self, planos):
+        self.planos = planos
+        self._linhas = []
+
+    def execute(self, sql, params=()):
+        self._linhas = self.planos[sql.replace('EXPLAIN ', '', 1)]
+
+    def fetchall(self):
+        return self._linhas
+
+
+def test_descobre_migracoes_em_ordem_com_checks():
+    migracoes = migrate.descobrir()
+    versoes = [m.versao for m in migracoes]
+
+    assert versoes == sorted(versoes)
+    assert versoes[:2] == [1, 2]
+    for migracao in migracoes:
+        assert migracao.modulo.DESCRICAO
+        assert callable(migracao.modulo.upgrade)
+        assert all(isinstance(c, Check) for c in getattr(migracao.modulo, 'CHECKS', []))
+
+
+def test_pendentes_respeita_aplicadas_e_alvo():
+    migracoes = migrate.descobrir()
+    assert [m.versao for m in migrate.pendentes(migracoes, {1})][:1] == [2]
+    assert migrate.pendentes(migracoes, set(), alvo=1)[0].versao == 1
+    assert len(migrate.pendentes(migracoes, set(), alvo=1)) == 1
+
+
+def test_verificar_classifica_o_plano():
+    checks = [
+        Check('usa', 'SELECT 1', (), 'ponto', 'uq_ponto_usuario_data'),
+        Check('disponivel', 'SELECT 2', (), 't', 'idx_tarefa_data_criacao'),
+        Check('ausente', 'SELECT 3', (), 'auditoria', 'idx_auditoria_data_hora'),
+    ]
+    cursor = FakeExplainCursor({
+        'SELECT 1': [{'table': 'ponto', 'key': 'uq_ponto_usuario_data', 'possible_keys': 'uq_ponto_usuario_data'}],
+        'SELECT 2': [{'table': 't', 'key': None, 'possible_keys': 'idx_tarefa_data_criacao'}],
+        'SELECT 3': [{'table': 'auditoria', 'key': None, 'possible_keys': None}],
+    })
+
+    situacoes = [situacao for _, situacao, _ in migrate.verificar(cursor, checks)]
+    assert situacoes == ['ok', 'aviso', 'falha']
+
+
+def test_carga_dos_resumos_nao_depende_do_repositorio(tmp_path):
+    """0003 traz o próprio SQL da carga inicial e grava pelo cursor do runner"""
+    from datetime import date
+
+    from app.models import db_pool, resumos
+    from app.models.db_pool import ConnectionPool
+    from benchmarks import seed, sqlite_db
+
+    path = str(tmp_path / 'banco.sqlite3')
+    sqlite_db.criar_banco(path)
+    seed.popular(path, seed.ESCALAS['teste'], date.today())
+    conn = sqlite_db.conectar(path)
+    migracao = next(m for m in migrate.descobrir() if m.versao == 3)
+
+    migracao.modulo.upgrade(conn.cursor())
+    conn.commit()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM resumo_ponto_dia ORDER BY dia, departamento")
+    ponto = cursor.fetchall()
+    cursor.execute("SELECT * FROM resumo_tarefa_dia ORDER BY dia, departamento")
+    tarefa = cursor.fetchall()
+
+    db_pool.set_pool(ConnectionPool(lambda: sqlite_db.conectar(path), pool_size=1))
+    try:
+        resumos.reconciliar(dias=36500)
+    finally:
+        db_pool.set_pool(None)
+    cursor.execute("SELECT * FROM resumo_ponto_dia ORDER BY dia, departamento")
+    assert ponto and cursor.fetchall() == ponto
+    cursor.execute("SELECT * FROM resumo_tarefa_dia ORDER BY dia, departamento")
+    assert tarefa and cursor.fetchall() == tarefa
+    conn.close()
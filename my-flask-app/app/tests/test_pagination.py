@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.utils.pagination import InvalidCursorError, Keyset, page_size
+
+
+def test_token_preserva_tipos_e_e_opaco():
+    keyset = Keyset('ponto', 'p.data', 'p.id')
+    token = keyset.encode({'data': date(2025, 3, 1), 'id': 42, 'outro': 'x'})
+
+    assert 'data' not in token and '=' not in token
+    assert keyset.decode(token) == [date(2025, 3, 1), 42]
+
+    tarefas = Keyset('tarefas', 'data_criacao', 'id')
+    assert tarefas.decode(tarefas.encode({'data_criacao': datetime(2025, 3, 1, 8), 'id': 1}))[0] == datetime(2025, 3, 1, 8)
+
+
+def test_token_de_outra_listagem_ou_corrompido_e_rejeitado():
+    token = Keyset('ponto', 'data', 'id').encode({'data': date(2025, 1, 1), 'id': 1})
+    with pytest.raises(InvalidCursorError):
+        Keyset('tarefas', 'data_criacao', 'id').decode(token)
+    with pytest.raises(InvalidCursorError):
+        Keyset('ponto', 'data', 'id').decode('nao-e-um-token')
+
+
+def test_where_expande_a_comparacao_de_tuplas():
+    keyset = Keyset('ponto', 'data', 'id')
+    assert keyset.where(None) == ('', [])
+
+    token = keyset.encode({'data': date(2025, 1, 2), 'id': 7})
+    sql, params = keyset.where(token)
+    assert sql == 'AND ((data < %s) OR (data = %s AND id < %s))'
+    assert params == [date(2025, 1, 2), date(2025, 1, 2), 7]
+    assert keyset.order_by() == 'ORDER BY data DESC, id DESC'
+
+    crescente = Keyset('usuarios', 'nome', 'id', descending=False)
+    sql, _ = crescente.where(crescente.encode({'nome': 'Ana', 'id': 3}), prefix='WHERE')
+    assert sql == 'WHERE ((nome > %s) OR (nome = %s AND id > %s))'
+
+
+def test_page_usa_a_linha_extra_para_saber_se_ha_proxima():
+    keyset = Keyset('usuarios', 'id', descending=False)
+    rows = [{'id': i} for i in range(4)]
+
+    pagina, proximo = keyset.page(rows, 3)
+    assert [r['id'] for r in pagina] == [0, 1, 2]
+    assert keyset.decode(proximo) == [2]
+    assert keyset.page(rows[:3], 3) == (rows[:3], None)
+
+
+def test_page_size_limitado():
+    assert page_size(None, default=50, maximum=200) == 50
+    assert page_size('10', default=50, maximum=200) == 10
+    assert page_size('5000', default=50, maximum=200) == 200
+    assert page_size('-3', default=50, maximum=200) == 1
+    assert page_size('abc', default=50, maximum=200) == 50
@@ -0,0 +1,174 @@
+from datetime import date
+
+import pytest
+from mysql.connector import IntegrityError, errorcode
+
+from app.controllers.controller import PontoController, PONTO_SYNC_MAX
+from app.models import db_pool
+from app.models.db_pool import ConnectionPool
+
+
+class FakeBanco:
+    """Ponto em memória: usuários 1 e 2; o usuário 1 já tem ponto em 01/03 com a chave 'antiga'"""
+
+    def __init__(self):
+        self.usuarios = {1, 2}
+        self.pontos = {('antiga', 1, date(2025, 3, 1))}
+        self.inserts = []
+        self.commits = 0
+        self.conflitos = 0
+
+
+class FakeCursor:
+    def __init__(self, banco):
+        self.banco = banco
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        banco = self.banco
+        params = set(params)
+        if 'SELECT chave_idempotencia FROM ponto' in sql:
+            self._rows = [{'chave_idempotencia': c} for c, _, _ in banco.pontos if c in params]
+        elif 'SELECT id FROM usuario' in sql:
+            self._rows = [{'id': i} for i in params if i in banco.usuarios]
+        elif 'SELECT usuario_id, data FROM ponto' in sql:
+            self._rows = [{'usuario_id': u, 'data': d} for _, u, d in banco.pontos if u in params and d in params]
+
+    def executemany(self, sql, linhas):
+        banco = self.banco
+        assert sql.startswith('INSERT INTO ponto')
+        if banco.conflitos:
+            banco.conflitos -= 1
+            raise IntegrityError(errno=errorcode.ER_DUP_ENTRY, msg='Duplicate entry')
+        banco.inserts.append(len(linhas))
+        for usuario_id, data, _, chave in linhas:
+            banco.pontos.add((chave, usuario_id, data))
+
+    @property
+    def rowcount(self):
+        return len(self._rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, banco):
+        self.banco = banco
+
+    def cursor(self, dictionary=False, prepared=False):
+        return FakeCursor(self.banco)
+
+    def commit(self):
+        self.banco.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def banco():
+    banco = FakeBanco()
+    db_pool.set_pool(ConnectionPool(lambda: FakeConnection(banco), pool_size=1))
+    yield banco
+    db_pool.set_pool(None)
+
+
+def registro(chave, usuario_id=2, data='2025-03-01', hora='07:30'):
+    return {'chave': chave, 'usuario_id': usuario_id, 'data': data, 'hora_entrada': hora}
+
+
+def situacoes(result):
+    return [(item['chave'], item['situacao']) for item in result['resultados']]
+
+
+def test_lote_aplica_em_um_insert_com_resultado_por_registro(banco):
+    result = PontoController.sincronizar_pontos([
+        registro('a'),
+        registro('b', data='2025-03-02'),
+        registro('antiga', usuario_id=1),
+        registro('c', usuario_id=1),
+        registro('d', usuario_id=99),
+        registro('e', data='2025-03-02'),
+        registro('a'),
+        registro('f', hora='25:00'),
+        {'usuario_id': 2},
+    ])
+
+    assert situacoes(result) == [
+        ('a', 'criado'), ('b', 'criado'), ('antiga', 'duplicado'), ('c', 'duplicado'),
+        ('d', 'rejeitado'), ('e', 'duplicado'), ('a', 'duplicado'), ('f', 'rejeitado'), (None, 'rejeitado'),
+    ]
+    assert (result['criados'], result['duplicados'], result['rejeitados']) == (2, 4, 3)
+    assert banco.inserts == [2]
+    assert banco.commits == 1
+
+
+def test_reenviar_o_mesmo_lote_nao_duplica(banco):
+    lote = [registro('a'), registro('b', data='2025-03-02')]
+    PontoController.sincronizar_pontos(lote)
+
+    result = PontoController.sincronizar_pontos(lote)
+
+    assert result['criados'] == 0
+    assert result['duplicados'] == 2
+    assert banco.inserts == [2]
+
+
+def test_conflito_concorrente_refaz_o_lote(banco):
+    banco.conflitos = 1
+
+    result = PontoController.sincronizar_pontos([registro('a')])
+
+    assert situacoes(result) == [('a', 'criado')]
+    assert banco.inserts == [1]
+
+
+def test_lote_vazio_ou_grande_demais():
+    assert not PontoController.sincronizar_pontos([])['success']
+    assert not PontoController.sincronizar_pontos([registro(str(i)) for i in range(PONTO_SYNC_MAX + 1)])['success']
+
+
+@pytest.fixture
+def client(banco, monkeypatch):
+    from Main import app
+    from app.controllers.controller import AuditoriaController
+
+    monkeypatch.setattr(AuditoriaController, 'registrar_evento', lambda *args: None)
+    return app.test_client()
+
+
+def _logar(client, papel, user_id):
+    with client.session_transaction() as sessao:
+        sessao.update(user='Teste', user_role=papel, user_email='teste@saneamento.gov.br', user_id=user_id)
+
+
+def test_rota_recusa_corpo_que_nao_e_objeto(client):
+    _logar(client, 'GOVERNANTE', None)
+    resposta = client.post('/api/ponto/sincronizar', json=[{'chave': 'a'}])
+
+    assert resposta.status_code == 400
+    assert resposta.get_json()['message'] == 'Envie a lista de registros.'
+
+
+def test_funcionario_so_sincroniza_o_proprio_ponto(client, banco):
+    _logar(client, 'FUNCIONARIO', 2)
+    alheio = client.post('/api/ponto/sincronizar', json={'registros': [registro('a'), registro('b', usuario_id=1)]})
+    proprio = client.post('/api/ponto/sincronizar', json={'registros': [registro('a')]})
+
+    assert alheio.status_code == 403
+    assert proprio.status_code == 200 and proprio.get_json()['criados'] == 1
+    assert banco.inserts == [1]
+
+
+def test_supervisor_sincroniza_a_equipe(client):
+    _logar(client, 'SUPERVISOR', None)
+    resposta = client.post('/api/ponto/sincronizar', json={'registros': [registro('a'), registro('b', usuario_id=1)]})
+
+    assert resposta.status_code == 200 and resposta.get_json()['criados'] == 1
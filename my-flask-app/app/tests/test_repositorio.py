@@ -0,0 +1,134 @@
+import os
+import re
+
+import pytest
+
+from app.models import db_pool, repositorio
+from app.models.db_pool import ConnectionPool
+from benchmarks import sqlite_db
+
+
+class FakeCursor:
+    def __init__(self, banco, prepared):
+        self.banco = banco
+        self.prepared = prepared
+        self.rowcount = 0
+        self.fechado = False
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.banco.execucoes.append((sql, tuple(params), self.prepared))
+        self._rows = [{'id': valor} for valor in dict.fromkeys(params)]
+        self.rowcount = len(self._rows)
+
+    def executemany(self, sql, linhas):
+        self.banco.lotes.append((sql, list(linhas), self.prepared))
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        self.fechado = True
+
+
+class FakeBanco:
+    def __init__(self):
+        self.execucoes = []
+        self.lotes = []
+        self.cursores = []
+
+
+class FakeConnection:
+    def __init__(self, banco):
+        self.banco = banco
+
+    def cursor(self, dictionary=False, prepared=False):
+        cursor = FakeCursor(self.banco, prepared)
+        self.banco.cursores.append(cursor)
+        return cursor
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def banco():
+    banco = FakeBanco()
+    db_pool.set_pool(ConnectionPool(lambda: FakeConnection(banco), pool_size=1, statement_cache=2))
+    yield banco
+    db_pool.set_pool(None)
+
+
+def test_lista_in_arredondada_para_potencia_de_2_na_ordem_dos_parametros():
+    consulta = repositorio.Consulta('teste', 'SELECT id FROM t WHERE a = %s {filtro} AND id IN {ids} LIMIT %s', dict)
+
+    [(sql, params)] = repositorio._instrucoes(consulta, (7, 8, 50), {'filtro': 'AND b > %s', 'ids': [1, 2, 3]})
+
+    assert sql == 'SELECT id FROM t WHERE a = %s AND b > %s AND id IN (%s, %s, %s, %s) LIMIT %s'
+    assert params == (7, 8, 1, 2, 3, 3, 50)
+
+
+def test_mesma_forma_devolve_o_mesmo_objeto_sql():
+    consulta = repositorio.CONSULTAS['usuario.por_ids']
+
+    [(a, _)] = repositorio._instrucoes(consulta, (), {'colunas': 'id', 'ids': [1, 2, 3]})
+    [(b, _)] = repositorio._instrucoes(consulta, (), {'colunas': 'id', 'ids': [9, 8, 7, 6]})
+
+    # O conector só reaproveita o statement preparado se receber o mesmo objeto str
+    assert a is b
+
+
+def test_lista_grande_vira_blocos_e_lista_vazia_nao_executa(monkeypatch, banco):
+    monkeypatch.setattr(repositorio, 'LISTA_MAX', 4)
+
+    ids = repositorio.buscar('usuario.ids_existentes', ids=list(range(1, 11)))
+
+    assert ids == list(range(1, 11))
+    assert [len(params) for _, params, _ in banco.execucoes] == [4, 4, 2]
+    assert repositorio.buscar('usuario.ids_existentes', ids=[]) == []
+    assert len(banco.execucoes) == 3
+
+
+def test_cursor_preparado_reaproveitado_por_conexao(banco):
+    repositorio.valor('usuario.rosto', (1,))
+    repositorio.valor('usuario.rosto', (2,))
+    repositorio.valor('usuario.contar')
+
+    preparados = [c for c in banco.cursores if c.prepared]
+    assert len(preparados) == 2
+    assert all(prepared for _, _, prepared in banco.execucoes)
+
+    # statement_cache=2: a terceira instrução fecha a menos usada
+    repositorio.buscar('usuario.com_faceid')
+    assert [c.fechado for c in banco.cursores] == [True, False, False]
+
+    db_pool.get_pool().dispose()
+    assert all(c.fechado for c in banco.cursores)
+
+
+def test_executar_lote_usa_executemany_em_cursor_comum(banco):
+    repositorio.executar_lote('auditoria.inserir_lote', [(1, 'Login', '::1', 'SUCESSO', None)] * 3)
+
+    [(sql, linhas, prepared)] = banco.lotes
+    assert sql.startswith('INSERT INTO auditoria') and len(linhas) == 3
+    assert not prepared
+
+
+def _fragmentos_de_exemplo(sql):
+    exemplos = {'colunas': 'id', 'filtro': '', 'ordem': '', 'limite': 'LIMIT %s', 'campos': 'nome=%s',
+                'coluna': 'criadas' if 'resumo_tarefa_dia' in sql else 'registros'}
+    nomes = re.findall(r'\{(\w+)\}', sql)
+    return {nome: exemplos.get(nome, [1]) for nome in nomes}
+
+
+@pytest.mark.parametrize('nome', sorted(repositorio.CONSULTAS))
+def test_consultas_do_catalogo_sao_sql_valido(nome, tmp_path):
+    path = os.path.join(tmp_path, 'schema.sqlite3')
+    sqlite_db.criar_banco(path)
+    conn = sqlite_db.conectar(path)
+    consulta = repositorio.CONSULTAS[nome]
+
+    for sql, params in repositorio._instrucoes(consulta, [None] * 8, _fragmentos_de_exemplo(consulta.sql)):
+        traduzido = sqlite_db.traduzir(sql)
+        conn._conn.execute('EXPLAIN ' + traduzido, params[:traduzido.count('?')])
+    conn.close()
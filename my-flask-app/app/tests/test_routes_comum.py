@@ -0,0 +1,21 @@
+import pytest
+
+from app.routes import comum
+from app.utils.face_executor import FaceExecutorBusy, FaceExecutorTimeout, FaceExecutorUnavailable
+
+
+@pytest.mark.parametrize('erro, status, headers', [
+    (FaceExecutorBusy('ocupado'), 503, {'Retry-After': '1'}),
+    (FaceExecutorUnavailable('fora deste worker'), 503, {}),
+    (FaceExecutorTimeout('tempo esgotado'), 504, {}),
+])
+def test_processamento_facial_indisponivel(erro, status, headers):
+    corpo, status_code, cabecalhos = comum.processamento_facial_indisponivel(erro)
+    assert (status_code, cabecalhos) == (status, headers)
+    assert corpo['success'] is False and corpo['message'] == str(erro)
+
+
+def test_material_versoes_usa_a_ultima_alteracao():
+    from datetime import datetime
+    atuais = {'tarefa': (3, datetime(2024, 1, 2)), 'usuario': (7, None)}
+    assert comum.material_versoes(atuais) == ([3, 7], datetime(2024, 1, 2))
@@ -1,5 +1,5 @@
 import pytest
-from routes.routes import app
+from Main import app
 
 @pytest.fixture
 def client():
@@ -10,7 +10,7 @@ def client():
 def test_listar_usuarios(client):
     response = client.get('/usuarios/listar')
     assert response.status_code == 200
-    assert isinstance(response.json, list)
+    assert isinstance(response.json['usuarios'], list)
 
 def test_cadastrar_usuario(client):
     novo_usuario = {
@@ -23,3 +23,20 @@ def test_cadastrar_usuario(client):
     assert response.status_code in [200, 201, 400]  # 400 se já existir ou erro de validação
     if response.status_code == 201:
         assert response.json.get("message")
+
+def test_banco_fora_do_ar_mostra_aviso_sem_derrubar_a_sessao(client, monkeypatch):
+    from app.controllers.controller import UsuarioController
+    from app.models.db_pool import DatabaseUnavailableError
+
+    def fora_do_ar(*args, **kwargs):
+        raise DatabaseUnavailableError('pool esgotado')
+
+    monkeypatch.setattr(UsuarioController, 'criar_usuario', fora_do_ar)
+    with client.session_transaction() as sessao:
+        sessao['user'] = 'Teste'
+    response = client.post('/criarconta', data={'nome': 'Ana', 'email': 'ana@x.com'})
+
+    assert response.status_code == 503
+    assert 'Serviço indisponível' in response.get_data(as_text=True)
+    with client.session_transaction() as sessao:
+        assert sessao['user'] == 'Teste'
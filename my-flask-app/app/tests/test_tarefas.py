@@ -1,8 +1,5 @@
 import pytest
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../my-flask-app')))
-from main import app
+from Main import app
 
 @pytest.fixture
 def client():
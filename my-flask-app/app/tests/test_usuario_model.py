@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import db_pool
+from app.models.db_pool import ConnectionPool
+from app.models.models import Usuario
+
+LINHAS = {
+    1: {'id': 1, 'nome': 'Ana', 'email': 'ana@x.com', 'cargo': 'SUPERVISOR', 'departamento': 'TI',
+        'status': 'ATIVO', 'ultimo_acesso': None, 'criado_em': datetime(2025, 1, 2), 'rosto_atualizado_em': None,
+        'rosto': b'\x01\x02'},
+    2: {'id': 2, 'nome': 'Bia', 'email': 'bia@x.com', 'cargo': 'FUNCIONARIO', 'departamento': 'Operação',
+        'status': 'ATIVO', 'ultimo_acesso': None, 'criado_em': datetime(2025, 1, 3), 'rosto_atualizado_em': None,
+        'rosto': None},
+}
+
+
+class FakeCursor:
+    """Responde às projeções de usuario a partir de LINHAS e guarda o SQL executado"""
+
+    def __init__(self, consultas, dictionary):
+        self.consultas = consultas
+        self.dictionary = dictionary
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.consultas.append(sql)
+        colunas = [c.strip() for c in sql.split('SELECT', 1)[1].split('FROM', 1)[0].split(',')]
+        if 'email = %s' in sql:
+            linhas = [l for l in LINHAS.values() if l['email'] == params[0]]
+        else:
+            linhas = [LINHAS[i] for i in params if i in LINHAS]
+        self._rows = [
+            {c: l[c] for c in colunas} if self.dictionary else tuple(l[c] for c in colunas)
+            for l in linhas
+        ]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, consultas):
+        self.consultas = consultas
+
+    def cursor(self, dictionary=False, prepared=False):
+        return FakeCursor(self.consultas, dictionary)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def consultas():
+    consultas = []
+    db_pool.set_pool(ConnectionPool(lambda: FakeConnection(consultas), pool_size=1))
+    yield consultas
+    db_pool.set_pool(None)
+
+
+def test_busca_usa_projecao_sem_rosto(consultas):
+    usuario = Usuario.buscar_por_email('ana@x.com')
+
+    assert usuario.nome == 'Ana'
+    assert usuario.criado_em == datetime(2025, 1, 2)
+    assert len(consultas) == 1
+    assert '*' not in consultas[0] and 'rosto,' not in consultas[0]
+
+
+def test_rosto_e_carregado_uma_vez_sob_demanda(consultas):
+    usuario = Usuario.buscar_por_id(1, Usuario.COLUNAS_SESSAO)
+
+    assert usuario.rosto == b'\x01\x02'
+    assert usuario.rosto == b'\x01\x02'
+    assert consultas[1] == "SELECT rosto FROM usuario WHERE id = %s"
+    assert len(consultas) == 2
+
+
+def test_buscar_por_ids_em_uma_consulta(consultas):
+    usuarios = Usuario.buscar_por_ids([2, 1, 2, 99], ('nome',))
+
+    assert {i: u.nome for i, u in usuarios.items()} == {1: 'Ana', 2: 'Bia'}
+    # Lista IN arredondada para 4 (potência de 2): menos instruções distintas para preparar
+    assert consultas == ["SELECT id, nome FROM usuario WHERE id IN (%s, %s, %s, %s)"]
+    assert Usuario.buscar_por_ids([]) == {}
+
+
+def test_construtor_aceita_colunas_da_tabela_e_usa_slots():
+    usuario = Usuario.de_linha({**LINHAS[2], 'coluna_nova': 1})
+
+    assert usuario.status == 'ATIVO'
+    assert usuario.rosto is None
+    assert usuario.para_dict(('id', 'nome')) == {'id': 2, 'nome': 'Bia'}
+    assert not hasattr(usuario, '__dict__')
+    with pytest.raises(AttributeError):
+        usuario.apelido = 'B'
+
+
+def test_atualizar_recusa_campos_fora_da_lista(consultas):
+    with pytest.raises(ValueError):
+        Usuario.atualizar(1, **{"nome = 'x', cargo": 'GOVERNANTE'})
+    with pytest.raises(ValueError):
+        Usuario.atualizar(1, criado_em=None)
+    with pytest.raises(ValueError):
+        Usuario.atualizar(1)
+    assert consultas == []
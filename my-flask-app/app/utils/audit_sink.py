@@ -0,0 +1,292 @@
+# audit_sink.py - Gravação assíncrona e em lote dos registros de auditoria
+# 🎯 Objetivo: A requisição só enfileira o evento; uma thread grava em lotes
+#
+# - Fila limitada: a requisição nunca espera o banco
+# - Lotes por tamanho (batch_size) ou por tempo (flush_interval), um executemany
+#   e um commit por lote
+# - Banco fora do ar (ou fila cheia): os eventos vão para um arquivo JSONL local
+#   (spill_path), reenviado ao banco assim que um lote volta a ser gravado
+# - Erro de dado (FK, valor inválido) não é banco fora do ar: o lote é regravado um a
+#   um e só os registros ruins são descartados (stats['rejected'])
+# - O reenvio renomeia o arquivo para um .replay.<pid> só do processo (workers do
+#   gunicorn podem dividir o spill_path) e nunca derruba a thread de gravação
+# - shutdown() (registrado no atexit) grava o que restou na fila
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+_STOP = object()
+
+
+class _Flush:
+    """Marcador na fila: grava o lote atual e avisa quem pediu o flush"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class AuditSink:
+    """
+    Fila de auditoria com gravação em lote por uma thread de fundo
+
+    Args:
+        writer: função que grava uma lista de registros (tuplas) no banco e
+                levanta exceção se falhar
+        max_queue: tamanho máximo da fila em memória
+        batch_size: grava ao juntar esta quantidade de eventos
+        flush_interval: ou quando o evento mais antigo esperou estes segundos
+        spill_path: arquivo JSONL de contingência (None = descarta e avisa)
+        unavailable_errors: exceções do writer que significam banco indisponível
+                (lote vai para o arquivo); as demais são erros dos registros
+    """
+
+    def __init__(self, writer, max_queue=10000, batch_size=200, flush_interval=1.0, spill_path=None,
+                 unavailable_errors=(Exception,)):
+        self.writer = writer
+        self.unavailable_errors = unavailable_errors
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'written': 0, 'spilled': 0, 'dropped': 0, 'rejected': 0, 'corrupted': 0}
+
+    # ---------- produtor (thread da requisição) ----------
+
+    def enqueue(self, *registro):
+        """
+        Enfileira um registro sem bloquear
+
+        Returns:
+            bool: False se a fila estava cheia (o registro foi para o arquivo ou descartado)
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(registro)
+            self.stats['enqueued'] += 1
+            return True
+        except queue.Full:
+            self._spill([registro])
+            return False
+
+    def _ensure_started(self):
+        # A thread não sobrevive a um fork (ex.: workers do gunicorn): recria no filho
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+            self._thread.start()
+
+    # ---------- consumidor (thread de fundo) ----------
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is None or item is _STOP or isinstance(item, _Flush):
+                if batch:
+                    self._write(batch)
+                    batch = []
+                if isinstance(item, _Flush):
+                    item.done.set()
+                if item is _STOP:
+                    return
+                continue
+
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+
+    def _write(self, batch):
+        pendentes = self._store(batch)
+        if pendentes:
+            self._spill(pendentes)
+            return
+        self._replay_spill()
+
+    def _store(self, registros):
+        """Grava um lote; devolve os registros que ficaram sem gravar por banco indisponível"""
+        try:
+            self.writer(registros)
+        except self.unavailable_errors as e:
+            print(f"Erro ao gravar auditoria ({len(registros)} eventos): {e}")
+            return registros
+        except Exception as e:
+            print(f"Auditoria com registro inválido ({len(registros)} eventos), gravando um a um: {e}")
+            return self._store_each(registros)
+        self.stats['written'] += len(registros)
+        return []
+
+    def _store_each(self, registros):
+        for i, registro in enumerate(registros):
+            try:
+                self.writer([registro])
+            except self.unavailable_errors as e:
+                print(f"Erro ao gravar auditoria ({len(registros) - i} eventos): {e}")
+                return registros[i:]
+            except Exception as e:
+                self.stats['rejected'] += 1
+                print(f"Auditoria descartada (registro inválido {registro!r}): {e}")
+            else:
+                self.stats['written'] += 1
+        return []
+
+    # ---------- contingência em arquivo ----------
+
+    def _spill(self, registros):
+        if not self.spill_path:
+            self.stats['dropped'] += len(registros)
+            print(f"Auditoria descartada: {len(registros)} eventos (sem arquivo de contingência)")
+            return
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for registro in registros:
+                    f.write(json.dumps([_dump(v) for v in registro]) + '\n')
+        self.stats['spilled'] += len(registros)
+
+    def _replay_spill(self):
+        """Reenvia ao banco os eventos guardados no arquivo de contingência"""
+        if not self.spill_path:
+            return
+        replay_path = f'{self.spill_path}.replay.{os.getpid()}'
+        try:
+            # Sobra de um reenvio interrompido, o arquivo atual e os de processos mortos
+            for origem in [replay_path, self.spill_path] + _orphan_replays(self.spill_path):
+                if origem != replay_path:
+                    try:
+                        # Sob o lock: um _spill em andamento termina de gravar antes da troca
+                        with self._spill_lock:
+                            os.replace(origem, replay_path)
+                    except FileNotFoundError:
+                        continue  # não existe, ou outro worker pegou antes
+                elif not os.path.exists(replay_path):
+                    continue
+                if not self._replay_file(replay_path):
+                    return
+        except Exception as e:
+            # O arquivo fica para a próxima tentativa; a thread de gravação segue viva
+            print(f"Erro ao reenviar auditoria do arquivo: {e}")
+
+    def _replay_file(self, replay_path):
+        """Reenvia um arquivo em lotes; False se o banco caiu de novo (o restante volta ao spill_path)"""
+        pendentes = []
+        completo = True
+        with open(replay_path, encoding='utf-8') as f:
+            lines = iter(f)
+            for line in lines:
+                registro = self._parse(line)
+                if registro is not None:
+                    pendentes.append(registro)
+                if len(pendentes) >= self.batch_size:
+                    if not self._replay_batch(pendentes, lines):
+                        completo = False
+                        break
+                    pendentes = []
+            else:
+                if pendentes:
+                    completo = self._replay_batch(pendentes, lines)
+        os.remove(replay_path)
+        return completo
+
+    def _replay_batch(self, registros, resto):
+        restantes = self._store(registros)
+        if not restantes:
+            return True
+        # Banco caiu de novo: devolve o que faltou deste lote e o restante do arquivo
+        restantes = restantes + [r for r in map(self._parse, resto) if r is not None]
+        self.stats['spilled'] -= len(restantes)
+        self._spill(restantes)
+        return False
+
+    def _parse(self, line):
+        if not line.strip():
+            return None
+        try:
+            return tuple(_load(v) for v in json.loads(line))
+        except (ValueError, TypeError) as e:
+            # Linha truncada (processo morto no meio da escrita) ou corrompida
+            self.stats['corrupted'] += 1
+            print(f"Linha inválida no arquivo de auditoria ignorada: {e}")
+            return None
+
+    # ---------- encerramento ----------
+
+    def flush(self, timeout=5.0):
+        """Grava imediatamente o que já foi enfileirado (scripts e testes)"""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        marker = _Flush()
+        self._queue.put(marker, timeout=timeout)
+        return marker.done.wait(timeout)
+
+    def shutdown(self, timeout=5.0):
+        """Grava o que restou na fila e encerra a thread"""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("Fila de auditoria cheia no encerramento: eventos restantes perdidos")
+            return
+        thread.join(timeout)
+        self._thread = None
+
+    def register_atexit(self):
+        atexit.register(self.shutdown)
+        return self
+
+
+def _orphan_replays(spill_path):
+    """Arquivos .replay.<pid> deixados por processos que já morreram"""
+    if os.name != 'posix':
+        return []
+    orfaos = []
+    for path in glob.glob(f'{glob.escape(spill_path)}.replay.*'):
+        pid = path.rsplit('.', 1)[-1]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            orfaos.append(path)
+        except OSError:
+            pass
+    return orfaos
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
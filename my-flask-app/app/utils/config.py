@@ -0,0 +1,87 @@
+# config.py - Configuração dos apps a partir do ambiente (.env) e dimensionamento dos workers
+# 🎯 Objetivo: Nenhum segredo no código; Main.py, wsgi.py, asgi.py e gunicorn.conf.py lendo o mesmo ambiente
+#
+# - SECRET_KEY: obrigatória em produção (APP_ENV=producao, definido pelo gunicorn.conf.py);
+#   fora dela, sem a variável, usa uma chave temporária do processo e avisa
+# - SESSION_COOKIE_SECURE=1 quando o app está atrás de HTTPS
+# - cpus_disponiveis(): CPUs que o processo pode usar de fato (afinidade e cota do
+#   cgroup, que é o limite de CPU do pod), base do número de workers
+# - WORKER_ROLE: 'completo' (padrão), 'api' (sem FaceID: dashboards e CRUD leves) ou
+#   'face' (workers dedicados às rotas /api/faceid/*, com a pilha facial aquecida)
+
+import math
+import os
+import secrets
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CGROUP_CPU_MAX = '/sys/fs/cgroup/cpu.max'
+PAPEIS = ('completo', 'api', 'face')
+
+_chave_temporaria = None
+
+
+def _ligado(nome, padrao='0'):
+    return os.getenv(nome, padrao).lower() in ('1', 'true', 'sim', 'on')
+
+
+def em_producao():
+    return os.getenv('APP_ENV', '').lower() in ('producao', 'production')
+
+
+def papel_worker():
+    """
+    Papel deste processo na implantação (WORKER_ROLE)
+
+    Raises:
+        RuntimeError: papel desconhecido
+    """
+    papel = os.getenv('WORKER_ROLE', '').lower() or 'completo'
+    if papel not in PAPEIS:
+        raise RuntimeError(f"WORKER_ROLE inválido: {papel!r} (use {', '.join(PAPEIS)})")
+    return papel
+
+
+def secret_key():
+    """
+    Chave de assinatura da sessão
+
+    Raises:
+        RuntimeError: em produção sem SECRET_KEY (sessões forjáveis ou perdidas a cada deploy)
+    """
+    global _chave_temporaria
+    chave = os.getenv('SECRET_KEY')
+    if chave:
+        return chave
+    if em_producao():
+        raise RuntimeError('Defina SECRET_KEY no ambiente (.env) antes de subir o servidor de produção.')
+    if _chave_temporaria is None:
+        print("⚠️ SECRET_KEY não definida: usando chave temporária (as sessões caem a cada reinício)")
+        _chave_temporaria = secrets.token_hex(32)
+    return _chave_temporaria
+
+
+def configurar(app):
+    """Aplica a configuração do ambiente em um app Flask ou Quart"""
+    app.secret_key = secret_key()
+    app.config['SESSION_COOKIE_SECURE'] = _ligado('SESSION_COOKIE_SECURE')
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    return app
+
+
+def cpus_disponiveis(cgroup_path=CGROUP_CPU_MAX):
+    """CPUs que o processo pode usar: afinidade limitada pela cota do cgroup v2 ('max' = sem cota)"""
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cgroup_path, encoding='utf-8') as f:
+            cota, periodo = f.read().split()[:2]
+        if cota != 'max':
+            cpus = min(cpus, math.ceil(int(cota) / int(periodo)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
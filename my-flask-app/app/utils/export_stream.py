@@ -0,0 +1,109 @@
+# export_stream.py - Exportação de relatórios em streaming (CSV e Excel)
+# 🎯 Objetivo: Memória constante independente do período exportado
+#
+# Recebe qualquer iterável de linhas (ex.: models.iterar_tarefas_periodo, que lê
+# de um cursor sem buffer com fetchmany) e escreve à medida que elas chegam:
+#   CSV  - cada lote vira bytes enviados na hora ao navegador
+#   XLSX - xlsxwriter em modo constant_memory grava linha a linha em um arquivo
+#          temporário; o .xlsx é um zip cujo índice só existe no close(), então
+#          o download começa quando a planilha termina de ser gravada
+
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime
+
+import xlsxwriter
+
+CSV_MIMETYPE = 'text/csv; charset=utf-8'
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+FORMATOS = {
+    'csv': CSV_MIMETYPE,
+    'xlsx': XLSX_MIMETYPE,
+}
+
+
+def csv_stream(header, rows, delimiter=';', flush_every=500):
+    """
+    Gera o CSV em pedaços de bytes
+
+    O cabeçalho sai antes da primeira linha do banco. Usa BOM UTF-8 e ';'
+    para o Excel em pt-BR abrir os acentos e as colunas corretamente.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    yield buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= flush_every:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return value
+
+
+def xlsx_stream(header, rows, sheet_name='Relatório', chunk_size=64 * 1024):
+    """
+    Gera o XLSX em pedaços de bytes
+
+    A planilha é escrita em modo constant_memory (uma linha por vez em disco)
+    e o arquivo temporário é removido assim que o envio termina.
+    """
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'dd/mm/yyyy hh:mm',
+            'remove_timezone': True,
+        })
+        sheet = workbook.add_worksheet(sheet_name[:31])
+        bold = workbook.add_format({'bold': True})
+
+        sheet.write_row(0, 0, header, bold)
+        sheet.set_column(0, len(header) - 1, 20)
+        for row_number, row in enumerate(rows, start=1):
+            sheet.write_row(row_number, 0, row)
+        workbook.close()
+
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def stream(formato, header, rows, **options):
+    """Escolhe o gerador pelo formato ('csv' ou 'xlsx')"""
+    if formato == 'csv':
+        return csv_stream(header, rows, **options)
+    if formato == 'xlsx':
+        return xlsx_stream(header, rows, **options)
+    raise ValueError(f'Formato de exportação desconhecido: {formato}')
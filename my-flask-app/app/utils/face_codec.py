@@ -0,0 +1,147 @@
+# face_codec.py - Formato binário dos encodings faciais armazenados em usuario.rosto
+# 🎯 Objetivo: Codificar/decodificar encodings sem pickle e sem depender do OpenCV/dlib
+#
+# Layout (little-endian, 8 bytes de cabeçalho + vetor):
+#
+#   offset  tamanho  campo
+#   0       2        magic b'FE'
+#   2       1        versão do formato (1)
+#   3       1        dtype (1 = float32)
+#   4       2        dimensão (128 para o modelo dlib)
+#   6       2        id do modelo que gerou o encoding
+#   8       4*dim    vetor float32
+#
+# Um encoding de 128 dimensões ocupa 520 bytes (contra ~1,5 KB do formato
+# antigo pickle+base64) e é decodificado com uma view do NumPy, sem cópia.
+
+import base64
+import io
+import pickle
+import struct
+
+import numpy as np
+
+MAGIC = b'FE'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<2sBBHH')
+HEADER_SIZE = HEADER.size
+
+DTYPE_FLOAT32 = 1
+_DTYPES = {DTYPE_FLOAT32: np.dtype('<f4')}
+
+MODEL_DLIB_RESNET_V1 = 1  # dlib_face_recognition_resnet_model_v1 (face_recognition)
+
+
+class EncodingFormatError(ValueError):
+    """Encoding armazenado em formato desconhecido ou corrompido"""
+
+
+def serialize_encoding(encoding, model_id=MODEL_DLIB_RESNET_V1):
+    """
+    Serializa encoding para armazenamento no banco
+
+    Args:
+        encoding: numpy array do encoding
+        model_id: modelo que gerou o encoding
+
+    Returns:
+        bytes: cabeçalho + vetor float32
+    """
+    vector = np.ascontiguousarray(encoding, dtype='<f4').ravel()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, DTYPE_FLOAT32, vector.shape[0], model_id)
+    return header + vector.tobytes()
+
+
+def read_header(data):
+    """
+    Lê o cabeçalho de um encoding binário
+
+    Returns:
+        tuple: (versão, dtype, dimensão, model_id)
+    """
+    if len(data) < HEADER_SIZE:
+        raise EncodingFormatError('Encoding menor que o cabeçalho')
+    magic, version, dtype, dim, model_id = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise EncodingFormatError('Encoding sem cabeçalho do formato binário')
+    if version != FORMAT_VERSION or dtype not in _DTYPES:
+        raise EncodingFormatError(f'Versão {version} / dtype {dtype} de encoding não suportados')
+    if len(data) != HEADER_SIZE + dim * _DTYPES[dtype].itemsize:
+        raise EncodingFormatError('Tamanho do encoding não confere com o cabeçalho')
+    return version, dtype, dim, model_id
+
+
+def is_binary(data):
+    """Indica se o valor já está no formato binário (e não no legado pickle+base64)"""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:2]) == MAGIC
+
+
+def deserialize_encoding(data):
+    """
+    Deserializa encoding do banco de dados
+
+    O formato binário vira uma view float32 sobre o próprio buffer (sem cópia);
+    valores no formato legado (pickle+base64) são lidos com um unpickler
+    restrito a arrays NumPy.
+
+    Args:
+        data: bytes do formato binário, ou string/bytes base64 do formato legado
+
+    Returns:
+        numpy.ndarray: Encoding deserializado
+    """
+    if is_binary(data):
+        _, dtype, dim, _ = read_header(data)
+        return np.frombuffer(data, dtype=_DTYPES[dtype], count=dim, offset=HEADER_SIZE)
+    return deserialize_legacy(data)
+
+
+def deserialize_many(blobs, dim=128):
+    """
+    Decodifica vários encodings binários de uma vez em uma matriz N x dim
+
+    Todos os BLOBs são concatenados e lidos com um dtype estruturado, de modo
+    que a conversão é uma única cópia contígua.
+
+    Raises:
+        EncodingFormatError: se algum BLOB não estiver no formato binário esperado
+    """
+    if not blobs:
+        return np.empty((0, dim), dtype=np.float32)
+
+    record = np.dtype([('header', f'V{HEADER_SIZE}'), ('vector', '<f4', (dim,))])
+    raw = b''.join(blobs)
+    if len(raw) != record.itemsize * len(blobs):
+        raise EncodingFormatError('Encodings com tamanhos diferentes do esperado')
+
+    expected = np.frombuffer(
+        HEADER.pack(MAGIC, FORMAT_VERSION, DTYPE_FLOAT32, dim, MODEL_DLIB_RESNET_V1), dtype=np.uint8
+    )
+    headers = np.frombuffer(raw, dtype=np.uint8).reshape(len(blobs), record.itemsize)[:, :HEADER_SIZE]
+    if not (headers == expected).all():
+        raise EncodingFormatError('Cabeçalhos de encoding divergentes')
+
+    records = np.frombuffer(raw, dtype=record)
+    return np.ascontiguousarray(records['vector'], dtype=np.float32)
+
+
+class _NumpyUnpickler(pickle.Unpickler):
+    """Unpickler que só aceita as classes usadas por um ndarray"""
+
+    _ALLOWED = {
+        ('numpy', 'ndarray'),
+        ('numpy', 'dtype'),
+        ('numpy.core.multiarray', '_reconstruct'),
+        ('numpy._core.multiarray', '_reconstruct'),
+    }
+
+    def find_class(self, module, name):
+        if (module, name) not in self._ALLOWED:
+            raise pickle.UnpicklingError(f'Classe não permitida no encoding: {module}.{name}')
+        return super().find_class(module, name)
+
+
+def deserialize_legacy(encoded):
+    """Lê o formato antigo (ndarray float64 em pickle + base64)"""
+    decoded = base64.b64decode(encoded)
+    return np.asarray(_NumpyUnpickler(io.BytesIO(decoded)).load())
@@ -0,0 +1,248 @@
+# face_executor.py - Pool de processos para o processamento facial
+# 🎯 Objetivo: Tirar HOG/encoding das threads de requisição do Flask
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+
+from app.utils import config, face_stack
+
+
+class FaceExecutorError(Exception):
+    """Falha ao executar um job no pool de processamento facial"""
+
+
+class FaceExecutorBusy(FaceExecutorError):
+    """Fila cheia: o servidor deve responder 503 imediatamente"""
+
+
+class FaceExecutorTimeout(FaceExecutorError):
+    """Job não terminou dentro do tempo limite"""
+
+
+class FaceExecutorUnavailable(FaceExecutorError):
+    """FaceID fora deste worker (WORKER_ROLE=api) ou pilha facial não instalada"""
+
+
+def _init_worker():
+    """Carrega e aquece OpenCV, dlib e os modelos uma vez por processo worker"""
+    try:
+        face_stack.aquecer()
+    except face_stack.FaceStackIndisponivel as e:
+        # Não derruba o pool: os jobs respondem FaceExecutorUnavailable
+        print(f"⚠️ {e}")
+
+
+def _extract_encoding(base64_image):
+    return face_stack.sistema().extract_encoding(base64_image)
+
+
+def _extract_best_encodings(frames, max_candidates):
+    return face_stack.sistema().extract_best_encodings(frames, max_candidates)
+
+
+def _register_face(base64_image):
+    return face_stack.sistema().register_face(base64_image)
+
+
+class FaceExecutor:
+    """
+    Pool limitado de processos para o reconhecimento facial.
+
+    Args:
+        workers: processos no pool (padrão: núcleos disponíveis)
+        max_pending: jobs aguardando além dos que já estão rodando; acima
+            disso ``submit`` levanta FaceExecutorBusy sem enfileirar
+        timeout: segundos que a requisição espera pelo resultado
+        initializer: função executada em cada worker ao iniciar
+        start_method: 'spawn', 'forkserver' ou 'fork'. Com 'forkserver' o
+            servidor de fork importa a pilha facial uma vez e os processos
+            nascem dele (compartilhando essas páginas). 'fork' só é seguro se
+            o pool for criado com o processo ainda com uma única thread: após
+            um BrokenProcessPool ele seria recriado por fork de um worker com
+            threads de requisição em andamento
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=10.0,
+                 initializer=_init_worker, start_method='spawn'):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * 2 if max_pending is None else max_pending
+        self.timeout = timeout
+        self.initializer = initializer
+        self.start_method = start_method
+
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._aquecimento = None
+        self._pid = os.getpid()
+
+    def _verificar_fork(self):
+        """Após fork (workers do gunicorn) os processos e as vagas são do pai: recomeça"""
+        if self._pid != os.getpid():
+            self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+            self._lock = threading.Lock()
+            self._executor = None
+            self._aquecimento = None
+            self._pid = os.getpid()
+
+    def _contexto(self):
+        contexto = multiprocessing.get_context(self.start_method)
+        if self.start_method == 'forkserver':
+            # O servidor de fork tem uma única thread e já traz OpenCV, dlib e os modelos
+            contexto.set_forkserver_preload([face_stack.MODULO])
+        return contexto
+
+    def _get_executor(self):
+        self._verificar_fork()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._contexto(),
+                    initializer=self.initializer
+                )
+            return self._executor
+
+    def start(self):
+        """Sobe os workers antecipadamente (senão sobem no primeiro job)"""
+        return self.warm_up(wait=False)
+
+    def warm_up(self, wait=True, timeout=None):
+        """
+        Sobe os workers e espera cada um carregar a pilha facial
+
+        Usado no boot do worker do gunicorn (wait=False) e pela prontidão
+        (/api/ready): sem esperar, só consulta o aquecimento em andamento. Se
+        algum worker falhou, a próxima chamada tenta de novo.
+
+        Returns:
+            dict: {'pronto', 'workers', 'aquecidos', 'erro'}
+
+        Raises:
+            FaceExecutorUnavailable: se o FaceID não roda neste worker
+        """
+        self._verificar_fork()
+        if not face_stack.habilitado():
+            raise FaceExecutorUnavailable('FaceID não é atendido por este worker (WORKER_ROLE=api)')
+
+        aquecimento = self._aquecimento
+        if aquecimento is None:
+            executor = self._get_executor()
+            aquecimento = self._aquecimento = [executor.submit(face_stack.estado) for _ in range(self.workers)]
+        if wait:
+            wait_futures(aquecimento, timeout=self.timeout * 3 if timeout is None else timeout)
+
+        aquecidos, erro = 0, None
+        for future in aquecimento:
+            if not future.done():
+                continue
+            try:
+                estado = future.result()
+            except Exception as e:
+                self._aquecimento = None
+                erro = str(e) or type(e).__name__
+                continue
+            aquecidos += estado['aquecido']
+            erro = erro or estado['erro']
+        return {
+            'pronto': aquecidos == len(aquecimento),
+            'workers': self.workers,
+            'aquecidos': aquecidos,
+            'erro': erro,
+        }
+
+    def submit(self, fn, *args):
+        """
+        Enfileira um job respeitando o limite da fila
+
+        O slot só é liberado quando o job termina de fato (inclusive após
+        timeout), então jobs lentos continuam contando para a contrapressão.
+
+        Raises:
+            FaceExecutorBusy: se a fila estiver cheia
+            FaceExecutorUnavailable: se o FaceID não roda neste worker
+        """
+        self._verificar_fork()
+        if not face_stack.habilitado():
+            raise FaceExecutorUnavailable('FaceID não é atendido por este worker (WORKER_ROLE=api)')
+        if not self._slots.acquire(blocking=False):
+            raise FaceExecutorBusy('Processamento facial sobrecarregado. Tente novamente em instantes.')
+        try:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                self._reset()
+                future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args, timeout=None):
+        """Executa um job e aguarda o resultado"""
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise FaceExecutorTimeout('Tempo esgotado no processamento facial')
+        except BrokenProcessPool:
+            self._reset()
+            raise FaceExecutorError('Worker de processamento facial encerrado inesperadamente')
+        except face_stack.FaceStackIndisponivel as e:
+            raise FaceExecutorUnavailable(str(e))
+
+    def extract_encoding(self, base64_image):
+        """(encoding, error) do rosto da imagem, calculado em um worker"""
+        return self.run(_extract_encoding, base64_image)
+
+    def extract_best_encodings(self, frames, max_candidates=2):
+        """([(encoding, índice)], error) dos melhores frames da rajada, calculado em um worker"""
+        return self.run(_extract_best_encodings, frames, max_candidates)
+
+    def register_face(self, base64_image):
+        """Resultado de FaceRecognitionSystem.register_face, calculado em um worker"""
+        return self.run(_register_face, base64_image)
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._aquecimento = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait=True):
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._aquecimento = None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Instância global do executor (os processos só sobem no primeiro uso)
+face_executor = FaceExecutor(
+    workers=int(os.getenv('FACEID_WORKERS', 0)) or None,
+    max_pending=int(os.getenv('FACEID_MAX_PENDING')) if os.getenv('FACEID_MAX_PENDING') else None,
+    timeout=float(os.getenv('FACEID_TIMEOUT', 10)),
+    start_method=os.getenv('FACEID_START_METHOD', 'spawn')
+)
+
+
+def prontidao():
+    """
+    Prontidão do worker para o balanceador: (pronto, corpo)
+
+    No papel 'face' só fica pronto com a pilha aquecida em todos os processos;
+    no 'completo' o FaceID aquecendo (ou indisponível) não tira o worker do ar.
+    """
+    papel = config.papel_worker()
+    if not face_stack.habilitado():
+        return True, {'papel': papel, 'faceid': None}
+    faceid = face_executor.warm_up(wait=False)
+    return papel != 'face' or faceid['pronto'], {'papel': papel, 'faceid': faceid}
@@ -0,0 +1,247 @@
+# face_gallery.py - Cache em memória da galeria de encodings do FaceID
+# 🎯 Objetivo: Evitar varrer os BLOBs de usuario.rosto a cada login facial
+
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.utils import face_codec
+from app.utils.face_index import create_index, load_index
+
+
+class FaceGallery:
+    """
+    Galeria de encodings do processo, guardada em um índice de busca (face_index).
+
+    - Carrega sob demanda no primeiro uso: do arquivo persistido, se houver,
+      ou com uma única varredura da tabela
+    - É atualizada incrementalmente pelos writes deste processo (write-through)
+    - A cada ``check_interval`` segundos lê só o contador 'faceid' de
+      versao_recurso (incrementado na transação de cada cadastro ou remoção).
+      Quando ele mudou, compara a versão completa (com COUNT/MAX sobre usuario)
+      e busca apenas as linhas alteradas por outros workers a partir do maior
+      ``rosto_atualizado_em`` já visto, sem recarregar tudo
+    """
+
+    def __init__(self, source=None, check_interval=5.0, dim=128, index_factory=None, persist_path=None):
+        self._source = source
+        self.check_interval = check_interval
+        self.dim = dim
+        self.index_factory = index_factory or (lambda: create_index('flat', dim=dim))
+        self.persist_path = persist_path
+
+        self._lock = threading.RLock()
+        self._index = self.index_factory()
+        self._loaded = False
+        self._version = None  # (contador 'faceid', quantidade, maior rosto_atualizado_em)
+        self._checked_at = 0.0
+
+    @property
+    def source(self):
+        if self._source is None:
+            from app.models.models import Usuario
+            self._source = Usuario
+        return self._source
+
+    def __len__(self):
+        self.ensure_fresh()
+        return len(self._index)
+
+    # ---------- leitura ----------
+
+    def search(self, probe, k=2):
+        """
+        Os k usuários mais próximos do probe
+
+        Returns:
+            tuple: (lista de user_ids, numpy.ndarray de distâncias) em ordem crescente
+        """
+        self.ensure_fresh()
+        with self._lock:
+            return self._index.search(probe, k)
+
+    def ensure_fresh(self):
+        """Carrega na primeira vez e depois verifica a versão do banco por intervalo"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+            return
+
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.check_interval:
+                self._sync()
+
+    def _load(self):
+        if self.persist_path and os.path.exists(self.persist_path):
+            try:
+                self._load_file()
+                return
+            except Exception as e:
+                print(f"Índice FaceID persistido inválido, recarregando do banco: {e}")
+        self.reload()
+
+    def _load_file(self):
+        """Restaura o índice salvo e aplica só o que mudou no banco desde então"""
+        index, metadata = load_index(self.persist_path, self.dim)
+        ultima = metadata.get('version_time') or None
+        self._index = index
+        self._version = (
+            int(metadata.get('version_counter', -1)),  # arquivo antigo, sem contador: sempre sincroniza
+            int(metadata['version_count']),
+            datetime.fromisoformat(ultima) if ultima else None
+        )
+        self._loaded = True
+        self._sync()
+
+    def reload(self):
+        """Recarrega a galeria inteira do banco"""
+        with self._lock:
+            version = self.source.versao_faceid()
+            rows = self.source.buscar_usuarios_com_faceid()
+
+            # Formato binário: uma única cópia para a matriz; legado: linha a linha
+            binary = [row for row in rows if face_codec.is_binary(row['rosto'])]
+            legacy = [row for row in rows if not face_codec.is_binary(row['rosto'])]
+            try:
+                blocks = [face_codec.deserialize_many([row['rosto'] for row in binary], self.dim)]
+                ids = [row['id'] for row in binary]
+            except face_codec.EncodingFormatError:
+                blocks, ids = [], []
+                legacy = rows
+            for row in legacy:
+                encoding = self._decode(row['rosto'])
+                if encoding is not None:
+                    ids.append(row['id'])
+                    blocks.append(np.reshape(encoding, (1, self.dim)))
+
+            index = self.index_factory()
+            index.build(ids, np.concatenate(blocks) if blocks else np.empty((0, self.dim), np.float32))
+            self._index = index
+            self._version = version
+            self._checked_at = time.monotonic()
+            self._loaded = True
+            self.save()
+
+    def _sync(self):
+        """Aplica as alterações feitas por outros processos desde a última versão"""
+        counter = self.source.contador_faceid()
+        self._checked_at = time.monotonic()
+        if self._version is not None and counter == self._version[0]:
+            return
+
+        version = self.source.versao_faceid()
+        if version == self._version:
+            return
+
+        _, _, last_update = self._version or (0, 0, None)
+        if last_update is None:
+            self.reload()
+            return
+
+        # >= : relê também o último segundo já visto (cadastros no mesmo segundo)
+        for row in self.source.buscar_faceid_alterados_desde(last_update):
+            self._upsert_decoded(row['id'], self._decode(row['rosto']))
+
+        # Remoções não mudam o maior timestamp: a contagem denuncia a diferença
+        if len(self._index) != version[1]:
+            ids_banco = set(self.source.listar_ids_com_faceid())
+            for user_id in [i for i in self._index.ids() if i not in ids_banco]:
+                self._index.remove(user_id)
+
+        self._version = version
+
+    # ---------- escrita (write-through) ----------
+
+    def upsert(self, user_id, encoded):
+        """Atualiza o encoding serializado de um usuário, se a galeria já estiver carregada"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._upsert_decoded(user_id, self._decode(encoded) if encoded else None)
+
+    def remove(self, user_id):
+        """Remove um usuário da galeria, se a galeria já estiver carregada"""
+        if not self._loaded:
+            return
+        with self._lock:
+            self._index.remove(user_id)
+
+    def _upsert_decoded(self, user_id, encoding):
+        if encoding is None:
+            self._index.remove(user_id)
+        else:
+            self._index.upsert(user_id, encoding)
+
+    def _decode(self, encoded):
+        try:
+            return face_codec.deserialize_encoding(encoded)
+        except Exception as e:
+            print(f"Erro ao deserializar encoding da galeria: {e}")
+            return None
+
+    # ---------- persistência ----------
+
+    def save(self):
+        """
+        Grava o índice e a versão do banco para um restart rápido
+
+        Cada processo escreve no seu próprio temporário (workers recarregando ao
+        mesmo tempo não se atropelam). Falhar aqui (disco cheio ou somente
+        leitura) não afeta a galeria em memória: só avisa.
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        if not self.persist_path or self._version is None:
+            return False
+        with self._lock:
+            counter, count, ultima = self._version
+            tmp = None
+            try:
+                fd, tmp = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(self.persist_path)),
+                    prefix=f'{os.path.basename(self.persist_path)}.', suffix='.tmp.npz'
+                )
+                os.close(fd)
+                self._index.save(
+                    tmp, version_counter=counter, version_count=count,
+                    version_time=ultima.isoformat() if ultima else ''
+                )
+                os.replace(tmp, self.persist_path)
+                return True
+            except Exception as e:
+                print(f"Erro ao persistir o índice FaceID em {self.persist_path}: {e}")
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
+                return False
+
+    def invalidate(self):
+        """Descarta o cache; o próximo uso recarrega do banco"""
+        with self._lock:
+            self._loaded = False
+
+
+def _index_factory():
+    kind = os.getenv('FACEID_INDEX', 'flat')
+    if kind == 'ivf':
+        return create_index(
+            'ivf',
+            nlist=int(os.getenv('FACEID_NLIST', 0)) or None,
+            nprobe=int(os.getenv('FACEID_NPROBE', 8))
+        )
+    return create_index(kind)
+
+
+# Instância global da galeria (uma por processo)
+face_gallery = FaceGallery(
+    index_factory=_index_factory,
+    persist_path=os.getenv('FACEID_INDEX_PATH') or None
+)
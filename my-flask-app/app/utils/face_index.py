@@ -0,0 +1,302 @@
+# face_index.py - Índices de busca por vizinho mais próximo para a galeria FaceID
+# 🎯 Objetivo: Identificação sublinear em galerias grandes, só com NumPy
+#
+# FlatIndex  - busca exata por força bruta (um produto matriz-vetor)
+# IVFIndex   - inverted file: k-means agrupa os encodings em listas; a busca
+#              visita apenas as `nprobe` listas mais próximas do probe e
+#              reordena os candidatos pela distância exata
+
+import numpy as np
+
+from app.utils.face_matching import face_distances
+
+
+class FlatIndex:
+    """Encodings em uma matriz contígua float32, indexados por id"""
+
+    kind = 'flat'
+
+    def __init__(self, dim=128):
+        self.dim = dim
+        self._matrix = np.empty((16, dim), dtype=np.float32)
+        self._norms = np.empty(16, dtype=np.float32)
+        self._ids = []
+        self._rows = {}  # id -> linha da matriz
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def ids(self):
+        return list(self._ids)
+
+    def vectors(self):
+        return self._matrix[:len(self._ids)]
+
+    def get(self, item_id):
+        """Encoding armazenado para o id"""
+        return self._matrix[self._rows[item_id]]
+
+    def build(self, ids, vectors):
+        """Substitui o conteúdo do índice"""
+        n = len(ids)
+        capacity = max(n, 16)
+        self._matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        self._norms = np.empty(capacity, dtype=np.float32)
+        if n:
+            self._matrix[:n] = vectors
+            self._norms[:n] = np.einsum('ij,ij->i', self._matrix[:n], self._matrix[:n])
+        self._ids = list(ids)
+        self._rows = {item_id: i for i, item_id in enumerate(self._ids)}
+
+    def upsert(self, item_id, vector):
+        row = self._rows.get(item_id)
+        if row is None:
+            row = len(self._ids)
+            if row == self._matrix.shape[0]:
+                self._grow()
+            self._ids.append(item_id)
+            self._rows[item_id] = row
+        self._matrix[row] = vector
+        self._norms[row] = self._matrix[row] @ self._matrix[row]
+
+    def remove(self, item_id):
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        # Move a última linha para o buraco: remoção O(D) sem realocar
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._norms[row] = self._norms[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] * 2
+        n = len(self._ids)
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        norms = np.empty(capacity, dtype=np.float32)
+        matrix[:n] = self._matrix[:n]
+        norms[:n] = self._norms[:n]
+        self._matrix, self._norms = matrix, norms
+
+    def search(self, probe, k=2):
+        """
+        Retorna os k ids mais próximos do probe
+
+        Returns:
+            tuple: (lista de ids, numpy.ndarray de distâncias) em ordem crescente
+        """
+        n = len(self._ids)
+        if n == 0:
+            return [], np.empty(0, dtype=np.float32)
+        distances = face_distances(self._matrix[:n], probe, self._norms[:n])
+        k = min(k, n)
+        top = np.argpartition(distances, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(distances[top])]
+        return [self._ids[i] for i in top], distances[top]
+
+    def save(self, path, **metadata):
+        """Persiste o índice em um .npz (metadados extras são gravados junto)"""
+        np.savez(
+            path, kind=self.kind, ids=np.array(self._ids), vectors=self.vectors(),
+            **{f'meta_{k}': v for k, v in metadata.items()}
+        )
+
+    @classmethod
+    def _from_npz(cls, data, dim):
+        index = cls(dim=dim)
+        index.build(data['ids'].tolist(), data['vectors'])
+        return index
+
+
+class IVFIndex:
+    """
+    Índice IVF (inverted file) com reordenação exata.
+
+    Args:
+        dim: dimensão dos encodings
+        nlist: quantidade de listas (padrão: ~sqrt(N) no treino)
+        nprobe: listas visitadas por busca; maior = mais recall, mais custo
+        min_train: abaixo desse tamanho o índice treina com 1 lista (= busca exata)
+        retrain_factor: re-treina quando a galeria cresce esse fator desde o último treino
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, dim=128, nlist=None, nprobe=8, min_train=1024, retrain_factor=4.0, seed=0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.retrain_factor = retrain_factor
+        self.seed = seed
+
+        self._centroids = np.zeros((1, dim), dtype=np.float32)
+        self._lists = [FlatIndex(dim)]
+        self._where = {}  # id -> número da lista
+        self._trained_size = 0
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, item_id):
+        return item_id in self._where
+
+    def ids(self):
+        return list(self._where)
+
+    def vectors(self):
+        return self._vectors_for(self.ids())
+
+    # ---------- treino ----------
+
+    def build(self, ids, vectors):
+        """Treina os centróides (k-means) e distribui os encodings nas listas"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        n = len(ids)
+        nlist = 1 if n < self.min_train else (self.nlist or max(1, int(np.sqrt(n))))
+        self._centroids = self._kmeans(vectors, nlist) if nlist > 1 else (
+            vectors.mean(axis=0, keepdims=True) if n else np.zeros((1, self.dim), dtype=np.float32)
+        )
+        self._assign_all(ids, vectors)
+        self._trained_size = n
+
+    def _assign_all(self, ids, vectors, assignment=None):
+        if assignment is None:
+            assignment = self._nearest_centroid(vectors) if len(ids) else np.empty(0, dtype=np.int64)
+        self._lists = []
+        self._where = {}
+        for list_no in range(self._centroids.shape[0]):
+            members = np.flatnonzero(assignment == list_no)
+            lst = FlatIndex(self.dim)
+            lst.build([ids[i] for i in members], vectors[members])
+            self._lists.append(lst)
+            for i in members:
+                self._where[ids[i]] = list_no
+
+    def _kmeans(self, vectors, k, iterations=10):
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), k * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=k, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest(sample, centroids)
+            for c in range(k):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+                else:
+                    centroids[c] = sample[rng.integers(len(sample))]
+        return centroids
+
+    @staticmethod
+    def _nearest(vectors, centroids):
+        # argmin ||v - c||² = argmin (||c||² - 2 v·c)
+        scores = np.einsum('ij,ij->i', centroids, centroids)[None, :] - 2.0 * (vectors @ centroids.T)
+        return scores.argmin(axis=1)
+
+    def _nearest_centroid(self, vectors):
+        return self._nearest(np.atleast_2d(vectors), self._centroids)
+
+    # ---------- atualização incremental ----------
+
+    def upsert(self, item_id, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        list_no = int(self._nearest_centroid(vector)[0])
+        current = self._where.get(item_id)
+        if current is not None and current != list_no:
+            self._lists[current].remove(item_id)
+        self._lists[list_no].upsert(item_id, vector)
+        self._where[item_id] = list_no
+
+        if len(self._where) >= max(self.min_train, self._trained_size * self.retrain_factor):
+            self.build(self.ids(), self._vectors_for(self.ids()))
+
+    def _vectors_for(self, ids):
+        out = np.empty((len(ids), self.dim), dtype=np.float32)
+        for i, item_id in enumerate(ids):
+            out[i] = self._lists[self._where[item_id]].get(item_id)
+        return out
+
+    def remove(self, item_id):
+        list_no = self._where.pop(item_id, None)
+        if list_no is not None:
+            self._lists[list_no].remove(item_id)
+
+    # ---------- busca ----------
+
+    def search(self, probe, k=2):
+        """
+        Retorna os k ids mais próximos entre as `nprobe` listas mais próximas
+
+        Returns:
+            tuple: (lista de ids, numpy.ndarray de distâncias) em ordem crescente
+        """
+        if not self._where:
+            return [], np.empty(0, dtype=np.float32)
+
+        probe = np.asarray(probe, dtype=np.float32)
+        nprobe = min(self.nprobe, self._centroids.shape[0])
+        coarse = face_distances(self._centroids, probe)
+        lists = np.argpartition(coarse, nprobe - 1)[:nprobe] if nprobe < len(coarse) else range(len(coarse))
+
+        ids, distances = [], []
+        for list_no in lists:
+            list_ids, list_distances = self._lists[list_no].search(probe, k)
+            ids.extend(list_ids)
+            distances.append(list_distances)
+        if not ids:
+            return [], np.empty(0, dtype=np.float32)
+
+        distances = np.concatenate(distances)
+        order = np.argsort(distances)[:k]
+        return [ids[i] for i in order], distances[order]
+
+    # ---------- persistência ----------
+
+    def save(self, path, **metadata):
+        """Persiste centróides, ids, vetores e a lista de cada id em um .npz"""
+        ids = self.ids()
+        np.savez(
+            path, kind=self.kind, ids=np.array(ids), vectors=self._vectors_for(ids),
+            assignment=np.array([self._where[i] for i in ids], dtype=np.int64),
+            centroids=self._centroids, nprobe=self.nprobe,
+            **{f'meta_{k}': v for k, v in metadata.items()}
+        )
+
+    @classmethod
+    def _from_npz(cls, data, dim):
+        index = cls(dim=dim, nprobe=int(data['nprobe']))
+        index._centroids = data['centroids'].astype(np.float32)
+        ids = data['ids'].tolist()
+        index._assign_all(ids, data['vectors'].astype(np.float32), data['assignment'])
+        index._trained_size = len(ids)
+        return index
+
+
+_KINDS = {FlatIndex.kind: FlatIndex, IVFIndex.kind: IVFIndex}
+
+
+def create_index(kind='flat', dim=128, **options):
+    """Cria um índice pelo nome ('flat' ou 'ivf')"""
+    if kind not in _KINDS:
+        raise ValueError(f'Tipo de índice desconhecido: {kind}')
+    return _KINDS[kind](dim=dim, **options)
+
+
+def load_index(path, dim=128):
+    """
+    Carrega um índice salvo com save()
+
+    Returns:
+        tuple: (índice, dict de metadados)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        index = _KINDS[str(data['kind'])]._from_npz(data, dim)
+        metadata = {k[len('meta_'):]: data[k].item() for k in data.files if k.startswith('meta_')}
+    return index, metadata
@@ -0,0 +1,146 @@
+# face_matching.py - Comparação 1:N de encodings faciais com NumPy
+# 🎯 Objetivo: Identificar o usuário mais próximo em uma única operação matricial
+
+import os
+
+import numpy as np
+
+# Distância máxima para considerar correspondência (menor = mais rigoroso)
+DEFAULT_TOLERANCE = float(os.getenv('FACEID_TOLERANCE', 0.6))
+
+
+def stack_encodings(encodings, dtype=np.float32):
+    """
+    Empilha encodings em uma matriz contígua (N x D)
+
+    Args:
+        encodings: sequência de vetores de mesma dimensão
+
+    Returns:
+        numpy.ndarray: matriz C-contígua, vazia (0 x 0) se não houver encodings
+    """
+    if len(encodings) == 0:
+        return np.empty((0, 0), dtype=dtype)
+    return np.ascontiguousarray(np.vstack(encodings), dtype=dtype)
+
+
+def squared_norms(matrix):
+    """Normas quadradas por linha, pré-calculáveis para uma galeria fixa"""
+    return np.einsum('ij,ij->i', matrix, matrix)
+
+
+def face_distances(gallery, probe, gallery_norms=None):
+    """
+    Distâncias euclidianas entre o probe e todas as linhas da galeria
+
+    Usa ||g - p||² = ||g||² - 2·g·p + ||p||², ou seja, um único produto
+    matriz-vetor em vez de N subtrações.
+
+    Args:
+        gallery: matriz N x D de encodings conhecidos
+        probe: vetor D do rosto a identificar
+        gallery_norms: normas quadradas da galeria (opcional, evita recalcular)
+
+    Returns:
+        numpy.ndarray: vetor N de distâncias
+    """
+    probe = np.asarray(probe, dtype=gallery.dtype)
+    if gallery_norms is None:
+        gallery_norms = squared_norms(gallery)
+    sq = gallery_norms - 2.0 * (gallery @ probe) + probe @ probe
+    np.maximum(sq, 0.0, out=sq)
+    return np.sqrt(sq)
+
+
+def summarize(ids, distances, tolerance=DEFAULT_TOLERANCE):
+    """
+    Resume os vizinhos mais próximos (já ordenados) em uma decisão de identificação
+
+    Args:
+        ids: ids dos vizinhos em ordem crescente de distância
+        distances: distâncias correspondentes
+        tolerance: distância máxima para considerar correspondência
+
+    Returns:
+        dict: {'match': bool, 'user_id', 'distance': float, 'confidence': float,
+               'runner_up_id', 'runner_up_distance': float, 'margin': float}
+    """
+    result = {
+        'match': False,
+        'user_id': None,
+        'distance': None,
+        'confidence': 0.0,
+        'runner_up_id': None,
+        'runner_up_distance': None,
+        'margin': None
+    }
+    if len(ids) == 0:
+        return result
+
+    best_distance = float(distances[0])
+    if len(ids) > 1:
+        result['runner_up_id'] = ids[1]
+        result['runner_up_distance'] = float(distances[1])
+        result['margin'] = float(distances[1]) - best_distance
+
+    result.update({
+        'match': best_distance <= tolerance,
+        'user_id': ids[0],
+        'distance': best_distance,
+        'confidence': (1 - best_distance) * 100
+    })
+    return result
+
+
+def identify(gallery, ids, probe, tolerance=DEFAULT_TOLERANCE, gallery_norms=None):
+    """
+    Identifica o encoding mais próximo do probe na galeria (busca exata)
+
+    Args:
+        gallery: matriz N x D de encodings conhecidos
+        ids: sequência de N identificadores alinhada às linhas da galeria
+        probe: vetor D do rosto a identificar
+        tolerance: distância máxima para considerar correspondência
+        gallery_norms: normas quadradas da galeria (opcional)
+
+    Returns:
+        dict: mesmo formato de summarize
+    """
+    if gallery.shape[0] == 0:
+        return summarize([], [], tolerance)
+
+    distances = face_distances(gallery, probe, gallery_norms)
+
+    if distances.shape[0] == 1:
+        top = np.array([0])
+    else:
+        # As duas menores distâncias sem ordenar o vetor inteiro
+        top = np.argpartition(distances, 1)[:2]
+        top = top[np.argsort(distances[top])]
+
+    return summarize([ids[i] for i in top], distances[top], tolerance)
+
+
+def decide(result):
+    """
+    Formata o resultado de summarize/identify para a camada de controller
+
+    Returns:
+        dict: {'success': bool, 'user_id', 'distance': float, 'margin': float,
+               'confidence': float, 'message': str}
+    """
+    confidence = round(result['confidence'], 2)
+    return {
+        'success': result['match'],
+        'user_id': result['user_id'] if result['match'] else None,
+        'distance': result['distance'],
+        'margin': result['margin'],
+        'confidence': confidence,
+        'message': (f'Autenticação bem-sucedida! Confiança: {confidence}%' if result['match']
+                    else f'Rosto não reconhecido. Confiança: {confidence}%')
+    }
+
+
+def match(probe, gallery, ids, gallery_norms=None, tolerance=DEFAULT_TOLERANCE):
+    """Identifica o probe na galeria e formata o resultado (ver decide)"""
+    return decide(identify(gallery, ids, probe, tolerance=tolerance, gallery_norms=gallery_norms))
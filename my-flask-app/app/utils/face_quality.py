@@ -0,0 +1,197 @@
+# face_quality.py - Portão de qualidade em cascata para imagens do FaceID
+# 🎯 Objetivo: Rejeitar frames escuros, sem contraste ou borrados em microssegundos,
+#              antes de gastar uma detecção HOG
+#
+# Ordem da cascata (do mais barato para o mais caro):
+#   1. tamanho            - só o shape da imagem
+#   2. brilho médio       - média da miniatura em tons de cinza
+#   3. contraste          - desvio padrão da miniatura
+#   4. nitidez            - variância do Laplaciano da miniatura
+#   5. detecção de rosto  - feita pelo chamador, só para frames aprovados
+
+import os
+
+import cv2
+
+# Códigos de motivo devolvidos pelo portão
+QUALITY_OK = 'OK'
+TOO_SMALL = 'TOO_SMALL'
+TOO_DARK = 'TOO_DARK'
+LOW_CONTRAST = 'LOW_CONTRAST'
+BLURRY = 'BLURRY'
+NO_FACE = 'NO_FACE'
+MULTIPLE_FACES = 'MULTIPLE_FACES'
+FACE_TOO_FAR = 'FACE_TOO_FAR'
+INVALID_IMAGE = 'INVALID_IMAGE'
+
+MESSAGES = {
+    QUALITY_OK: 'Imagem válida',
+    TOO_SMALL: 'Imagem muito pequena. Use uma resolução maior',
+    TOO_DARK: 'Imagem muito escura. Melhore a iluminação',
+    LOW_CONTRAST: 'Imagem sem contraste. Evite luz direta na câmera ou fundo uniforme',
+    BLURRY: 'Imagem borrada. Mantenha o rosto parado em frente à câmera',
+    NO_FACE: 'Nenhum rosto detectado. Posicione seu rosto na câmera',
+    MULTIPLE_FACES: 'Múltiplos rostos detectados. Apenas um rosto deve estar visível',
+    FACE_TOO_FAR: 'Rosto muito distante. Aproxime-se da câmera',
+    INVALID_IMAGE: 'Erro ao processar imagem',
+}
+
+
+def gray_thumbnail(image, size=160):
+    """
+    Miniatura em tons de cinza (lado maior <= size)
+
+    Reduz antes de converter, então a conversão de cor roda sobre poucos pixels.
+    """
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if size and longest > size:
+        scale = size / longest
+        image = cv2.resize(
+            image, (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def measure(gray):
+    """
+    Métricas baratas de uma miniatura em tons de cinza
+
+    Returns:
+        dict: {'brightness': média, 'contrast': desvio padrão, 'sharpness': variância do Laplaciano}
+    """
+    mean, std = cv2.meanStdDev(gray)
+    return {
+        'brightness': float(mean[0][0]),
+        'contrast': float(std[0][0]),
+        'sharpness': float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+    }
+
+
+def result(code, metrics=None):
+    """Resultado estruturado do portão"""
+    return {
+        'valid': code == QUALITY_OK,
+        'code': code,
+        'message': MESSAGES[code],
+        'metrics': metrics or {},
+    }
+
+
+class QualityGate:
+    """
+    Limiares da cascata de qualidade
+
+    Args:
+        min_size: menor lado aceito da imagem original, em pixels
+        thumbnail_size: lado maior da miniatura usada nas métricas
+        min_brightness: brilho médio mínimo (0-255)
+        min_contrast: desvio padrão mínimo dos tons de cinza
+        min_sharpness: variância mínima do Laplaciano na miniatura
+        min_face_ratio: altura mínima do rosto em relação à altura da imagem
+    """
+
+    def __init__(self, min_size=200, thumbnail_size=160, min_brightness=50.0,
+                 min_contrast=20.0, min_sharpness=15.0, min_face_ratio=0.2):
+        self.min_size = min_size
+        self.thumbnail_size = thumbnail_size
+        self.min_brightness = min_brightness
+        self.min_contrast = min_contrast
+        self.min_sharpness = min_sharpness
+        self.min_face_ratio = min_face_ratio
+
+    def check_size(self, shape):
+        height, width = shape[:2]
+        if self.min_size and (width < self.min_size or height < self.min_size):
+            return result(TOO_SMALL)
+        return None
+
+    def check_thumbnail(self, gray):
+        """
+        Brilho, contraste e nitidez da miniatura, nessa ordem
+
+        Returns:
+            dict: resultado do portão (code QUALITY_OK se passou)
+        """
+        metrics = measure(gray)
+        if metrics['brightness'] < self.min_brightness:
+            return result(TOO_DARK, metrics)
+        if metrics['contrast'] < self.min_contrast:
+            return result(LOW_CONTRAST, metrics)
+        if metrics['sharpness'] < self.min_sharpness:
+            return result(BLURRY, metrics)
+        return result(QUALITY_OK, metrics)
+
+    def check_cheap(self, image, gray=None):
+        """
+        Etapas baratas da cascata (sem detecção)
+
+        Args:
+            image: imagem original (só o shape é usado)
+            gray: miniatura já calculada (opcional)
+        """
+        too_small = self.check_size(image.shape)
+        if too_small:
+            return too_small
+        if gray is None:
+            gray = gray_thumbnail(image, self.thumbnail_size)
+        return self.check_thumbnail(gray)
+
+    def check_faces(self, face_locations, image_height, metrics=None):
+        """Última etapa: exatamente um rosto, grande o suficiente na imagem"""
+        if len(face_locations) == 0:
+            return result(NO_FACE, metrics)
+        if len(face_locations) > 1:
+            return result(MULTIPLE_FACES, metrics)
+        top, _, bottom, _ = face_locations[0]
+        if bottom - top < image_height * self.min_face_ratio:
+            return result(FACE_TOO_FAR, metrics)
+        return result(QUALITY_OK, metrics)
+
+
+def frame_score(sharpness, brightness, face_ratio):
+    """Nota de 0 a 1 de um frame aprovado: nitidez, tamanho do rosto e brilho perto do meio"""
+    sharpness = min(sharpness / 200.0, 1.0)
+    size_score = min(face_ratio / 0.4, 1.0)
+    brightness = 1.0 - min(abs(brightness - 128.0) / 128.0, 1.0)
+    return 0.5 * sharpness + 0.3 * size_score + 0.2 * brightness
+
+
+def best_frames(scores, max_candidates=2):
+    """
+    Índices dos melhores frames de uma rajada (só os com nota > 0), do melhor para o pior
+
+    Args:
+        scores: resultados de FaceRecognitionSystem.score_frame, na ordem dos frames
+        max_candidates: quantos frames seguem para o encoding completo
+
+    Returns:
+        tuple: (lista de índices, mensagem de erro se nenhum frame serviu)
+    """
+    ranked = sorted(
+        (i for i, score in enumerate(scores) if score['score'] > 0),
+        key=lambda i: scores[i]['score'], reverse=True
+    )
+    if not ranked:
+        messages = [score['message'] for score in scores if score['message']]
+        return [], messages[0] if messages else 'Nenhum rosto detectado'
+    return ranked[:max_candidates], None
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def gate_from_env():
+    """QualityGate com os limiares das variáveis FACEID_MIN_*"""
+    return QualityGate(
+        min_size=int(_env_float('FACEID_MIN_SIZE', 200)),
+        thumbnail_size=int(_env_float('FACEID_QUALITY_SIZE', 160)),
+        min_brightness=_env_float('FACEID_MIN_BRIGHTNESS', 50),
+        min_contrast=_env_float('FACEID_MIN_CONTRAST', 20),
+        min_sharpness=_env_float('FACEID_MIN_SHARPNESS', 15),
+        min_face_ratio=_env_float('FACEID_MIN_FACE_RATIO', 0.2),
+    )
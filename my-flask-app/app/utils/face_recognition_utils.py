@@ -3,28 +3,112 @@
 # 🔧 Prioridade: FACEID
 # 📱 Mobile: SIM | 🌙 Dark Mode: SIM
 
+import os
+
 import cv2
 import face_recognition
+from face_recognition import api as face_recognition_api
 import numpy as np
 import base64
 from io import BytesIO
 from PIL import Image
-import pickle
+
+from app.utils import face_codec, face_matching, face_quality
+
+
+class FaceImage:
+    """
+    Imagem em processamento no pipeline de reconhecimento facial
+
+    Guarda os resultados intermediários (miniatura, localizações, landmarks)
+    calculados sob demanda e reutilizados pelas etapas seguintes, de modo que a
+    detecção HOG roda uma única vez por imagem.
+    """
+
+    def __init__(self, system, image):
+        self.system = system
+        self.image = image
+        self._thumbnail_gray = None
+        self._face_locations = None
+        self._landmarks = None
+        self._detection_image = None
+        self.scale = 1.0
+
+    @property
+    def thumbnail_gray(self):
+        """Miniatura em tons de cinza usada pelas etapas baratas do portão de qualidade"""
+        if self._thumbnail_gray is None:
+            self._thumbnail_gray = face_quality.gray_thumbnail(
+                self.image, self.system.quality_gate.thumbnail_size
+            )
+        return self._thumbnail_gray
+
+    @property
+    def detection_image(self):
+        """Cópia reduzida para a detecção (lado maior <= system.detection_size)"""
+        if self._detection_image is None:
+            height, width = self.image.shape[:2]
+            longest = max(height, width)
+            target = self.system.detection_size
+            if target and longest > target:
+                self.scale = target / longest
+                size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+                self._detection_image = cv2.resize(self.image, size, interpolation=cv2.INTER_AREA)
+            else:
+                self.scale = 1.0
+                self._detection_image = self.image
+        return self._detection_image
+
+    @property
+    def face_locations(self):
+        """Rostos detectados na imagem reduzida, em coordenadas da resolução original"""
+        if self._face_locations is None:
+            small = self.detection_image
+            locations = self.system.detect_faces(small)
+            if self.scale != 1.0:
+                height, width = self.image.shape[:2]
+                locations = [
+                    (max(0, int(top / self.scale)), min(width, int(right / self.scale)),
+                     min(height, int(bottom / self.scale)), max(0, int(left / self.scale)))
+                    for top, right, bottom, left in locations
+                ]
+            self._face_locations = locations
+        return self._face_locations
+
+    @property
+    def landmarks(self):
+        """Landmarks brutos do dlib (modelo de 5 pontos) para cada rosto detectado"""
+        if self._landmarks is None:
+            self._landmarks = face_recognition_api._raw_face_landmarks(
+                self.image, self.face_locations, model='small'
+            )
+        return self._landmarks
 
 
 class FaceRecognitionSystem:
     """Sistema completo de reconhecimento facial"""
     
-    def __init__(self):
-        self.tolerance = 0.6  # Tolerância para comparação (menor = mais rigoroso)
-        self.model = "hog"  # Modelo: 'hog' (CPU) ou 'cnn' (GPU)
+    def __init__(self, tolerance=0.6, model="hog", detection_size=320, upsample=1, max_decode_size=1280,
+                 quality_gate=None):
+        self.tolerance = tolerance  # Tolerância para comparação (menor = mais rigoroso)
+        self.model = model  # Modelo: 'hog' (CPU) ou 'cnn' (GPU)
+        # Velocidade x precisão da detecção: lado maior da imagem usada pelo HOG
+        # (o rosto só precisa de ~150px para um bom encoding) e quantas vezes
+        # o detector amplia a imagem para achar rostos pequenos
+        self.detection_size = detection_size
+        self.upsample = upsample
+        # Lado maior máximo ao decodificar (JPEG usa decodificação reduzida via DCT)
+        self.max_decode_size = max_decode_size
+        # Limiares da cascata de qualidade (tamanho, brilho, contraste, nitidez, rosto)
+        self.quality_gate = quality_gate or face_quality.QualityGate()
     
-    def process_image_from_base64(self, base64_string):
+    def process_image_from_base64(self, base64_string, max_size=None):
         """
         Processa imagem em base64 e retorna array numpy
         
         Args:
             base64_string: String base64 da imagem
+            max_size: lado maior máximo (padrão: self.max_decode_size)
             
         Returns:
             numpy.ndarray: Imagem processada ou None se falhar
@@ -38,6 +122,16 @@ class FaceRecognitionSystem:
             image_data = base64.b64decode(base64_string)
             image = Image.open(BytesIO(image_data))
             
+            # JPEG: decodifica direto em escala reduzida (1/2, 1/4, 1/8) quando
+            # a imagem é muito maior que o necessário
+            max_size = max_size or self.max_decode_size
+            if max_size:
+                limit = (max_size, max_size)
+                if image.format == 'JPEG':
+                    image.draft('RGB', limit)
+                if max(image.size) > max_size:
+                    image.thumbnail(limit, Image.LANCZOS)
+            
             # Converte para RGB (face_recognition usa RGB)
             image_rgb = np.array(image.convert('RGB'))
             
@@ -45,6 +139,20 @@ class FaceRecognitionSystem:
         except Exception as e:
             print(f"Erro ao processar imagem base64: {e}")
             return None
+
+    def analyze(self, image):
+        """
+        Inicia o pipeline para uma imagem já decodificada
+
+        Args:
+            image: numpy array (RGB) ou FaceImage já em processamento
+
+        Returns:
+            FaceImage: contexto compartilhado pelas etapas de validação e encoding
+        """
+        if isinstance(image, FaceImage):
+            return image
+        return FaceImage(self, image)
     
     def detect_faces(self, image):
         """
@@ -57,7 +165,9 @@ class FaceRecognitionSystem:
             list: Lista de localizações dos rostos [(top, right, bottom, left), ...]
         """
         try:
-            face_locations = face_recognition.face_locations(image, model=self.model)
+            face_locations = face_recognition.face_locations(
+                image, number_of_times_to_upsample=self.upsample, model=self.model
+            )
             return face_locations
         except Exception as e:
             print(f"Erro ao detectar rostos: {e}")
@@ -67,15 +177,17 @@ class FaceRecognitionSystem:
         """
         Gera encoding (vetor de características) do rosto na imagem
         
+        Reaproveita a detecção e os landmarks já calculados no FaceImage.
+        
         Args:
-            image: numpy array da imagem
+            image: numpy array da imagem ou FaceImage
             
         Returns:
-            tuple: (encoding, face_location) ou (None, None) se falhar
+            tuple: (encoding, error) ou (None, mensagem) se falhar
         """
         try:
-            # Detecta rostos
-            face_locations = self.detect_faces(image)
+            face = self.analyze(image)
+            face_locations = face.face_locations
             
             if len(face_locations) == 0:
                 return None, "Nenhum rosto detectado na imagem"
@@ -83,13 +195,15 @@ class FaceRecognitionSystem:
             if len(face_locations) > 1:
                 return None, "Múltiplos rostos detectados. Use uma foto com apenas um rosto"
             
-            # Gera encoding do rosto
-            face_encodings = face_recognition.face_encodings(image, face_locations)
-            
-            if len(face_encodings) == 0:
+            # Gera encoding a partir dos landmarks já extraídos (sem nova detecção)
+            landmarks = face.landmarks
+            if len(landmarks) == 0:
                 return None, "Não foi possível gerar encoding do rosto"
             
-            return face_encodings[0], None
+            encoding = np.array(
+                face_recognition_api.face_encoder.compute_face_descriptor(face.image, landmarks[0], 1)
+            )
+            return encoding, None
         
         except Exception as e:
             print(f"Erro ao gerar encoding: {e}")
@@ -122,47 +236,41 @@ class FaceRecognitionSystem:
             print(f"Erro ao comparar rostos: {e}")
             return False, 0.0
     
-    def validate_image_quality(self, image):
+    def validate_image_quality(self, image, detect=True):
         """
         Valida qualidade da imagem para reconhecimento facial
         
+        Cascata do mais barato para o mais caro: tamanho, brilho, contraste e
+        nitidez sobre uma miniatura em tons de cinza; a detecção de rosto só
+        roda para imagens aprovadas nessas etapas.
+        
         Args:
-            image: numpy array da imagem
+            image: numpy array da imagem ou FaceImage
+            detect: se False, para após as etapas baratas (sem detecção)
             
         Returns:
-            tuple: (valid: bool, message: str)
+            dict: {'valid': bool, 'code': str (face_quality.*), 'message': str, 'metrics': dict}
         """
         try:
-            # Verifica dimensões mínimas
-            height, width = image.shape[:2]
-            if width < 200 or height < 200:
-                return False, "Imagem muito pequena. Use uma resolução maior"
-            
-            # Verifica se há rosto
-            face_locations = self.detect_faces(image)
-            if len(face_locations) == 0:
-                return False, "Nenhum rosto detectado. Posicione seu rosto na câmera"
+            face = self.analyze(image)
+            gate = self.quality_gate
             
-            if len(face_locations) > 1:
-                return False, "Múltiplos rostos detectados. Apenas um rosto deve estar visível"
-            
-            # Verifica tamanho do rosto na imagem (deve ocupar pelo menos 20% da altura)
-            top, right, bottom, left = face_locations[0]
-            face_height = bottom - top
-            if face_height < height * 0.2:
-                return False, "Rosto muito distante. Aproxime-se da câmera"
+            quality = gate.check_size(face.image.shape)
+            if quality:
+                return quality
             
-            # Verifica iluminação básica (não muito escura)
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-            mean_brightness = np.mean(gray)
-            if mean_brightness < 50:
-                return False, "Imagem muito escura. Melhore a iluminação"
+            quality = gate.check_thumbnail(face.thumbnail_gray)
+            if not quality['valid'] or not detect:
+                return quality
             
-            return True, "Imagem válida"
+            # Só agora a detecção (compartilhada com o encoding)
+            return gate.check_faces(face.face_locations, face.image.shape[0], quality['metrics'])
         
         except Exception as e:
             print(f"Erro ao validar qualidade: {e}")
-            return False, f"Erro na validação: {str(e)}"
+            quality = face_quality.result(face_quality.INVALID_IMAGE)
+            quality['message'] = f"Erro na validação: {str(e)}"
+            return quality
     
     def serialize_encoding(self, encoding):
         """
@@ -172,13 +280,10 @@ class FaceRecognitionSystem:
             encoding: numpy array do encoding
             
         Returns:
-            str: Encoding serializado em base64
+            bytes: Encoding no formato binário de face_codec (cabeçalho + float32)
         """
         try:
-            # Serializa com pickle e converte para base64
-            pickled = pickle.dumps(encoding)
-            encoded = base64.b64encode(pickled).decode('utf-8')
-            return encoded
+            return face_codec.serialize_encoding(encoding)
         except Exception as e:
             print(f"Erro ao serializar encoding: {e}")
             return None
@@ -188,16 +293,13 @@ class FaceRecognitionSystem:
         Deserializa encoding do banco de dados
         
         Args:
-            encoded_string: String base64 do encoding
+            encoded_string: Encoding binário (ou string base64 do formato legado)
             
         Returns:
             numpy.ndarray: Encoding deserializado
         """
         try:
-            # Decodifica base64 e deserializa com pickle
-            decoded = base64.b64decode(encoded_string)
-            encoding = pickle.loads(decoded)
-            return encoding
+            return face_codec.deserialize_encoding(encoded_string)
         except Exception as e:
             print(f"Erro ao deserializar encoding: {e}")
             return None
@@ -210,7 +312,7 @@ class FaceRecognitionSystem:
             base64_image: Imagem em base64
             
         Returns:
-            dict: {'success': bool, 'encoding': str, 'message': str}
+            dict: {'success': bool, 'encoding': bytes, 'message': str}
         """
         try:
             # Processa imagem
@@ -222,17 +324,21 @@ class FaceRecognitionSystem:
                     'message': 'Erro ao processar imagem'
                 }
             
+            # Pipeline: validação e encoding compartilham a mesma detecção
+            face = self.analyze(image)
+            
             # Valida qualidade
-            valid, message = self.validate_image_quality(image)
-            if not valid:
+            quality = self.validate_image_quality(face)
+            if not quality['valid']:
                 return {
                     'success': False,
                     'encoding': None,
-                    'message': message
+                    'message': quality['message'],
+                    'code': quality['code']
                 }
             
             # Gera encoding
-            encoding, error = self.encode_face(image)
+            encoding, error = self.encode_face(face)
             if encoding is None:
                 return {
                     'success': False,
@@ -326,6 +432,170 @@ class FaceRecognitionSystem:
                 'message': f'Erro na autenticação: {str(e)}'
             }
 
+    def extract_encoding(self, base64_image):
+        """
+        Decodifica a imagem e gera o encoding do rosto uma única vez
+
+        Args:
+            base64_image: Imagem em base64
+
+        Returns:
+            tuple: (encoding, error) - encoding None com mensagem de erro se falhar
+        """
+        image = self.process_image_from_base64(base64_image)
+        if image is None:
+            return None, 'Erro ao processar imagem'
+
+        # Frames escuros ou borrados são rejeitados antes da detecção HOG
+        face = self.analyze(image)
+        quality = self.validate_image_quality(face, detect=False)
+        if not quality['valid']:
+            return None, quality['message']
+        return self.encode_face(face)
+
+    def score_frame(self, base64_image, size=160):
+        """
+        Nota barata de qualidade de um frame para escolher o melhor de uma rajada
+
+        Decodifica em baixa resolução (JPEG reduzido) e mede nitidez (variância
+        do Laplaciano), brilho e tamanho do rosto com o HOG sobre a miniatura,
+        mesmo com FACEID_MODEL=cnn: a nota só ordena os frames, e a CNN em CPU
+        em cada frame da rajada custaria mais que o login inteiro. O modelo
+        configurado (self.model) fica para a detecção final dos escolhidos.
+        Frames reprovados nas etapas baratas do portão de qualidade recebem
+        nota 0 sem passar pela detecção.
+
+        Args:
+            base64_image: Imagem em base64
+            size: lado maior da miniatura usada na avaliação
+
+        Returns:
+            dict: {'score': float (0 = inutilizável), 'sharpness', 'brightness',
+                   'face_ratio', 'message'}
+        """
+        result = {'score': 0.0, 'sharpness': 0.0, 'brightness': 0.0, 'face_ratio': 0.0, 'message': ''}
+        thumb = self.process_image_from_base64(base64_image, max_size=size)
+        if thumb is None:
+            result['message'] = 'Erro ao processar imagem'
+            return result
+
+        quality = self.quality_gate.check_thumbnail(face_quality.gray_thumbnail(thumb, size))
+        result['brightness'] = quality['metrics']['brightness']
+        result['sharpness'] = quality['metrics']['sharpness']
+        if not quality['valid']:
+            result['message'] = quality['message']
+            return result
+
+        # Ampliação igual à do encoding (acha os mesmos rostos pequenos); modelo sempre HOG
+        faces = face_recognition.face_locations(thumb, number_of_times_to_upsample=self.upsample, model='hog')
+        if len(faces) != 1:
+            result['message'] = 'Nenhum rosto detectado' if not faces else 'Múltiplos rostos detectados'
+            return result
+
+        top, _, bottom, _ = faces[0]
+        result['face_ratio'] = (bottom - top) / thumb.shape[0]
+
+        result['score'] = face_quality.frame_score(result['sharpness'], result['brightness'], result['face_ratio'])
+        return result
+
+    def extract_best_encodings(self, frames, max_candidates=2):
+        """
+        Escolhe os melhores frames de uma rajada e gera encoding só para eles
+
+        Args:
+            frames: lista de imagens em base64
+            max_candidates: quantos frames (no máximo) passam pelo encoding completo
+
+        Returns:
+            tuple: (lista de (encoding, índice do frame), mensagem de erro)
+        """
+        best, error = face_quality.best_frames([self.score_frame(frame) for frame in frames], max_candidates)
+        if not best:
+            return [], error
+
+        encodings = []
+        for i in best:
+            encoding, error = self.extract_encoding(frames[i])
+            if encoding is not None:
+                encodings.append((encoding, i))
+        return encodings, (None if encodings else error)
+
+    def identify_face(self, base64_image, known_encodings, user_ids, gallery_norms=None):
+        """
+        Identifica (1:N) o rosto da imagem entre todos os encodings cadastrados
+
+        O probe é codificado uma única vez e comparado com a galeria inteira
+        em uma única operação matricial.
+
+        Args:
+            base64_image: Imagem em base64
+            known_encodings: matriz N x 128 de encodings cadastrados
+            user_ids: lista de N ids alinhada às linhas de known_encodings
+            gallery_norms: normas quadradas pré-calculadas da galeria (opcional)
+
+        Returns:
+            dict: {'success': bool, 'user_id', 'distance': float, 'margin': float,
+                   'confidence': float, 'message': str}
+        """
+        try:
+            probe, error = self.extract_encoding(base64_image)
+            if probe is None:
+                return {
+                    'success': False,
+                    'user_id': None,
+                    'distance': None,
+                    'margin': None,
+                    'confidence': 0.0,
+                    'message': error or 'Nenhum rosto detectado'
+                }
+
+            return self.match_encoding(probe, known_encodings, user_ids, gallery_norms)
+
+        except Exception as e:
+            print(f"Erro na identificação facial: {e}")
+            return {
+                'success': False,
+                'user_id': None,
+                'distance': None,
+                'margin': None,
+                'confidence': 0.0,
+                'message': f'Erro na identificação: {str(e)}'
+            }
+
+    def warm_up(self):
+        """
+        Roda detecção, landmarks e encoding uma vez em uma imagem vazia
+
+        Os modelos do dlib são lidos no import, mas as páginas só entram na
+        memória (e os caches internos só são montados) na primeira chamada:
+        assim o primeiro login não paga esse custo.
+        """
+        blank = np.zeros((self.detection_size or 160, self.detection_size or 160, 3), dtype=np.uint8)
+        face_recognition.face_locations(blank, number_of_times_to_upsample=0, model=self.model)
+        location = [(0, blank.shape[1], blank.shape[0], 0)]
+        landmarks = face_recognition_api._raw_face_landmarks(blank, location, model='small')
+        face_recognition_api.face_encoder.compute_face_descriptor(blank, landmarks[0], 1)
+
+    def match_encoding(self, probe, known_encodings, user_ids, gallery_norms=None):
+        """
+        Compara um encoding já calculado com a galeria (1:N)
+
+        Returns:
+            dict: mesmo formato de identify_face
+        """
+        return face_matching.match(
+            probe, known_encodings, user_ids,
+            gallery_norms=gallery_norms, tolerance=self.tolerance
+        )
+
 
-# Instância global do sistema
-face_system = FaceRecognitionSystem()
+def criar_sistema():
+    """FaceRecognitionSystem configurado pelas variáveis FACEID_* (use app.utils.face_stack)"""
+    return FaceRecognitionSystem(
+        tolerance=face_matching.DEFAULT_TOLERANCE,
+        model=os.getenv('FACEID_MODEL', 'hog'),
+        detection_size=int(os.getenv('FACEID_DETECTION_SIZE', 320)),
+        upsample=int(os.getenv('FACEID_UPSAMPLE', 1)),
+        max_decode_size=int(os.getenv('FACEID_MAX_DECODE_SIZE', 1280)),
+        quality_gate=face_quality.gate_from_env()
+    )
@@ -0,0 +1,84 @@
+# face_stack.py - Fachada da pilha de reconhecimento facial (OpenCV, dlib, modelos)
+# 🎯 Objetivo: A pilha só entra no processo que processa rostos, e só no primeiro uso
+#
+# - sistema(): importa face_recognition_utils e cria o FaceRecognitionSystem na
+#   primeira chamada; dashboards, CLIs e testes que não chamam nunca importam cv2/dlib
+# - aquecer(): carrega e roda uma detecção vazia, para o primeiro login não pagar o
+#   custo (boot dos processos do face_executor, preload do gunicorn)
+# - habilitado(): WORKER_ROLE=api desliga o FaceID no processo; as rotas /api/faceid/*
+#   ficam com os workers WORKER_ROLE=face
+
+import importlib
+import threading
+import time
+
+from app.utils import config
+
+MODULO = 'app.utils.face_recognition_utils'
+
+_lock = threading.Lock()
+_sistema = None
+_erro = None
+_aquecido_em = None
+
+
+class FaceStackIndisponivel(ImportError):
+    """OpenCV/face_recognition não instalados (ou falharam ao carregar) neste ambiente"""
+
+
+def habilitado():
+    """FaceID atendido por este processo (WORKER_ROLE diferente de 'api')"""
+    return config.papel_worker() != 'api'
+
+
+def carregado():
+    return _sistema is not None
+
+
+def sistema():
+    """
+    FaceRecognitionSystem do processo, criado no primeiro uso
+
+    Raises:
+        FaceStackIndisponivel: se a pilha não puder ser importada
+    """
+    global _sistema, _erro
+    if _sistema is None:
+        with _lock:
+            if _sistema is None:
+                if _erro:
+                    raise FaceStackIndisponivel(_erro)
+                try:
+                    modulo = importlib.import_module(MODULO)
+                except ImportError as e:
+                    _erro = f'Reconhecimento facial indisponível: {e}'
+                    raise FaceStackIndisponivel(_erro) from e
+                _sistema = modulo.criar_sistema()
+    return _sistema
+
+
+def aquecer():
+    """
+    Carrega a pilha e exercita os modelos uma vez (idempotente)
+
+    Raises:
+        FaceStackIndisponivel: se a pilha não puder ser importada
+    """
+    global _aquecido_em
+    atual = sistema()
+    with _lock:
+        if _aquecido_em is None:
+            inicio = time.perf_counter()
+            atual.warm_up()
+            _aquecido_em = time.perf_counter() - inicio
+    return estado()
+
+
+def estado():
+    """Situação da pilha neste processo (usado pela prontidão do face_executor)"""
+    return {
+        'carregado': carregado(),
+        'aquecido': _aquecido_em is not None,
+        'segundos_aquecimento': round(_aquecido_em, 3) if _aquecido_em is not None else None,
+        'erro': _erro,
+    }
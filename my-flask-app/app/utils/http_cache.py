@@ -0,0 +1,111 @@
+# http_cache.py - Cache HTTP condicional (ETag / Last-Modified) para as APIs de leitura
+# 🎯 Objetivo: Responder 304 sem rodar a consulta principal quando nada mudou
+#
+# O validador de cada rota é barato (versão do recurso ou snapshot já em cache).
+# O ETag inclui a URL completa e a identidade da sessão (e-mail e papel), então
+# a visão de um GOVERNANTE nunca valida o cache de um FUNCIONARIO e vice-versa.
+# Cache-Control: private, no-cache -> só o navegador guarda, e sempre revalida.
+
+import hashlib
+import json
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+
+def _identidade(sessao):
+    return [sessao.get('user_email'), sessao.get('user_role'), sessao.get('user')]
+
+
+def calcular_etag(material, req=None, sessao=None):
+    """Hash do material do validador + URL + identidade da sessão"""
+    req = request if req is None else req
+    sessao = session if sessao is None else sessao
+    bruto = json.dumps([req.full_path, _identidade(sessao), material], default=str, sort_keys=True)
+    return hashlib.sha1(bruto.encode('utf-8')).hexdigest()
+
+
+def _utc(momento):
+    if momento is None:
+        return None
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    return momento.replace(microsecond=0)
+
+
+def _nao_modificado(req, etag, ultima):
+    if req.if_none_match:
+        return req.if_none_match.contains_weak(etag)
+    since = req.if_modified_since
+    return bool(ultima and since and ultima <= since)
+
+
+def _marcar(response, etag, ultima):
+    response.set_etag(etag, weak=True)
+    if ultima:
+        response.last_modified = ultima
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def condicional(validador):
+    """
+    Decorator de rota: ETag/Last-Modified a partir de ``validador()``
+
+    Args:
+        validador: função sem argumentos que devolve (material, última alteração
+                   ou None), ou None quando a rota não deve ser cacheada nesta
+                   requisição (ex.: parâmetros inválidos)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if current_app.config.get('TESTING'):
+                return view(*args, **kwargs)
+
+            validacao = validador()
+            if validacao is None:
+                return view(*args, **kwargs)
+            material, ultima = validacao
+            etag = calcular_etag(material)
+            ultima = _utc(ultima)
+
+            if _nao_modificado(request, etag, ultima):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            return _marcar(response, etag, ultima)
+        return wrapper
+    return decorator
+
+
+def condicional_async(validador):
+    """Como ``condicional``, para views e validadores ``async`` do app Quart (asgi.py)"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            from quart import current_app as app, make_response as criar, request as req, session as sessao
+
+            if app.config.get('TESTING'):
+                return await view(*args, **kwargs)
+
+            validacao = await validador()
+            if validacao is None:
+                return await view(*args, **kwargs)
+            material, ultima = validacao
+            etag = calcular_etag(material, req, sessao)
+            ultima = _utc(ultima)
+
+            if _nao_modificado(req, etag, ultima):
+                response = app.response_class('', status=304)
+            else:
+                response = await criar(await view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            return _marcar(response, etag, ultima)
+        return wrapper
+    return decorator
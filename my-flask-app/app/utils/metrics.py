@@ -0,0 +1,411 @@
+# metrics.py - Métricas de requisições e SQL no formato texto do Prometheus
+# 🎯 Objetivo: Saber onde o tempo vai (rotas, consultas, checkout do pool) sem dependências novas
+#
+# - Histograma de latência e contador por rota (regra do Flask, não a URL: cardinalidade fixa)
+# - Requisições em andamento
+# - Cursores embrulhados: quantidade, tempo e linhas por instrução normalizada
+#   (literais e listas IN/VALUES viram '?') e os totais de cada requisição
+# - Tempo de checkout de conexão do pool
+# - Log de requisições e consultas lentas (METRICS_SLOW_REQUEST_MS / METRICS_SLOW_QUERY_MS)
+#
+# Os valores são do processo: com vários workers, cada um expõe os seus em /metrics.
+# /metrics só responde com METRICS_TOKEN definido (Authorization: Bearer <token>).
+
+import functools
+import os
+import re
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+MAX_STATEMENT_LEN = 160
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items):
+        return [f'{self.name}{_labels(self.labelnames, key)} {_number(value)}' for key, value in items]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valor atual; com ``function`` o valor é lido na hora de exportar"""
+
+    type = 'gauge'
+
+    def __init__(self, name, help, labelnames=(), function=None):
+        super().__init__(name, help, labelnames)
+        self.function = function
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        if self.function is not None:
+            try:
+                self.set(self.function())
+            except Exception as e:
+                print(f"Erro ao ler métrica {self.name}: {e}")
+        return super().render()
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_items(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, key, [le])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    'http_requests_total', 'Requisições HTTP atendidas', ('method', 'route', 'status')))
+http_latency = registry.register(Histogram(
+    'http_request_duration_seconds', 'Latência das requisições por rota', ('method', 'route')))
+http_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'Requisições em andamento neste processo'))
+
+db_queries = registry.register(Counter(
+    'db_queries_total', 'Consultas executadas por instrução normalizada', ('statement',)))
+db_query_latency = registry.register(Histogram(
+    'db_query_duration_seconds', 'Tempo de execução por instrução normalizada', ('statement',), QUERY_BUCKETS))
+db_rows = registry.register(Counter(
+    'db_query_rows_total', 'Linhas lidas ou afetadas por instrução normalizada', ('statement',)))
+db_request_queries = registry.register(Histogram(
+    'db_request_queries', 'Consultas por requisição', ('route',), COUNT_BUCKETS))
+db_request_seconds = registry.register(Histogram(
+    'db_request_seconds', 'Tempo em SQL por requisição', ('route',), LATENCY_BUCKETS))
+db_pool_checkout = registry.register(Histogram(
+    'db_pool_checkout_seconds', 'Espera para obter uma conexão do pool', ('outcome',), QUERY_BUCKETS))
+
+
+def _pool_in_use():
+    from app.models import db_pool
+
+    return db_pool.get_pool().checked_out
+
+
+db_pool_in_use = registry.register(Gauge(
+    'db_pool_connections_in_use', 'Conexões emprestadas do pool', function=_pool_in_use))
+
+
+def _ms_from_env(name):
+    value = os.getenv(name, '')
+    return float(value) / 1000 if value else None
+
+
+SLOW_REQUEST_SECONDS = _ms_from_env('METRICS_SLOW_REQUEST_MS')
+SLOW_QUERY_SECONDS = _ms_from_env('METRICS_SLOW_QUERY_MS')
+
+
+# ---------- SQL ----------
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_sql(sql):
+    """
+    Forma estável de uma instrução para usar como rótulo
+
+    "SELECT id FROM usuario WHERE id IN (%s, %s, %s)" -> "SELECT id FROM usuario WHERE id IN (...)"
+
+    Em cache: o app usa um conjunto fixo de instruções (as do repositório), e
+    isto roda em todo execute e fetch.
+    """
+    sql = sql.decode('utf-8', 'replace') if isinstance(sql, bytes) else str(sql)
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip()
+    sql = _LIST.sub('(...)', sql)
+    sql = _LISTS.sub('(...)', sql)
+    return sql[:MAX_STATEMENT_LEN]
+
+
+def _request_stats():
+    """Totais de SQL da requisição atual (None fora de requisições)"""
+    from flask import g, has_request_context
+
+    if not has_request_context():
+        return None
+    return g.get('_metrics_db')
+
+
+def _record_query(sql, seconds, rows):
+    statement = normalize_sql(sql)
+    db_queries.inc(statement=statement)
+    db_query_latency.observe(seconds, statement=statement)
+    if rows:
+        db_rows.inc(rows, statement=statement)
+
+    stats = _request_stats()
+    if stats is not None:
+        stats['queries'] += 1
+        stats['seconds'] += seconds
+        stats['rows'] += rows
+
+    if SLOW_QUERY_SECONDS is not None and seconds >= SLOW_QUERY_SECONDS:
+        print(f"[lento] SQL {seconds * 1000:.0f}ms ({rows} linhas): {statement}")
+
+
+_FETCHES_ROWS = ('SELECT', 'SHOW', 'EXPLAIN', 'WITH', 'DESCRIBE')
+
+
+class InstrumentedCursor:
+    """
+    Cursor que mede cada execute/executemany
+
+    As linhas de SELECT são contadas conforme são lidas (fetch*); as de
+    INSERT/UPDATE/DELETE vêm do rowcount.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._sql = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._add_rows(1)
+            yield row
+
+    def execute(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            self._executed(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            self._executed(sql, time.perf_counter() - start)
+
+    def _executed(self, sql, elapsed):
+        fetches = str(sql).lstrip().upper().startswith(_FETCHES_ROWS)
+        rows = 0 if fetches else max(getattr(self._cursor, 'rowcount', 0) or 0, 0)
+        self._sql = sql if fetches else None
+        _record_query(sql, elapsed, rows)
+
+    def _add_rows(self, rows):
+        if not rows or self._sql is None:
+            return
+        db_rows.inc(rows, statement=normalize_sql(self._sql))
+        stats = _request_stats()
+        if stats is not None:
+            stats['rows'] += rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._add_rows(1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._add_rows(len(rows))
+        return rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def record_checkout(seconds, ok=True):
+    db_pool_checkout.observe(seconds, outcome='ok' if ok else 'timeout')
+
+
+# ---------- Flask ----------
+
+def _route():
+    from flask import request
+
+    return request.url_rule.rule if request.url_rule is not None else '<sem rota>'
+
+
+def _before_request():
+    from flask import g
+
+    g._metrics_start = time.perf_counter()
+    g._metrics_db = {'queries': 0, 'seconds': 0.0, 'rows': 0}
+    http_in_flight.inc()
+
+
+def _finish(status):
+    from flask import g, request
+
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    http_in_flight.dec()
+
+    route = _route()
+    http_requests.inc(method=request.method, route=route, status=status)
+    http_latency.observe(elapsed, method=request.method, route=route)
+
+    stats = g.pop('_metrics_db', None) or {'queries': 0, 'seconds': 0.0, 'rows': 0}
+    db_request_queries.observe(stats['queries'], route=route)
+    db_request_seconds.observe(stats['seconds'], route=route)
+
+    if SLOW_REQUEST_SECONDS is not None and elapsed >= SLOW_REQUEST_SECONDS:
+        print(f"[lento] {request.method} {request.path} {status} {elapsed * 1000:.0f}ms "
+              f"({stats['queries']} consultas, {stats['seconds'] * 1000:.0f}ms em SQL, {stats['rows']} linhas)")
+
+
+def _after_request(response):
+    _finish(response.status_code)
+    return response
+
+
+def _teardown_request(exc=None):
+    # Só chega aqui com a requisição pendente se uma exceção pulou o after_request
+    _finish(500)
+
+
+def init_app(app):
+    """Liga a instrumentação das requisições e dos cursores (METRICS_ENABLED=0 desliga)"""
+    from app.models import db_pool
+
+    if os.getenv('METRICS_ENABLED', '1') in ('0', 'false', 'False'):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    db_pool.instrumentar(cursor=InstrumentedCursor, checkout=record_checkout)
+
+
+def render():
+    return registry.render()
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
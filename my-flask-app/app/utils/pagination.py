@@ -0,0 +1,136 @@
+# pagination.py - Paginação por cursor (keyset) para as listagens da API
+# 🎯 Objetivo: Páginas de custo constante, sem OFFSET e sem trazer a tabela inteira
+#
+# A página seguinte começa logo após a última linha enviada:
+#   WHERE ... AND (data < %s OR (data = %s AND id < %s)) ORDER BY data DESC, id DESC LIMIT n+1
+# O cliente recebe os valores dessa última linha como um token opaco (base64).
+
+import base64
+import json
+import os
+from datetime import date, datetime, timedelta
+
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+
+
+class InvalidCursorError(ValueError):
+    """Token de continuação malformado ou de outra listagem"""
+
+
+def page_size(requested=None, default=None, maximum=None):
+    """Tamanho de página pedido pelo cliente, limitado a [1, PAGE_SIZE_MAX]"""
+    default = default or PAGE_SIZE_DEFAULT
+    maximum = maximum or PAGE_SIZE_MAX
+    try:
+        size = int(requested) if requested not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'td': value.total_seconds()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'td' in value:
+            return timedelta(seconds=value['td'])
+    return value
+
+
+class Keyset:
+    """
+    Ordenação de uma listagem e o cursor correspondente
+
+    Args:
+        name: identifica a listagem (um token de outra listagem é rejeitado)
+        columns: colunas SQL da ordenação, da mais para a menos significativa;
+                 a última deve ser única (ex.: id). A chave na linha do resultado
+                 é o nome sem o prefixo da tabela ('p.data' -> 'data')
+        descending: ordem decrescente (padrão) ou crescente para todas as colunas
+
+    Exemplo:
+        keyset = Keyset('ponto', 'p.data', 'p.id')
+        filtro, params = keyset.where(token)
+        sql = f"SELECT ... WHERE p.usuario_id = %s {filtro} {keyset.order_by()} LIMIT %s"
+        cursor.execute(sql, (usuario_id, *params, limite + 1))
+        linhas, proximo = keyset.page(cursor.fetchall(), limite)
+    """
+
+    def __init__(self, name, *columns, descending=True):
+        self.name = name
+        self.columns = columns
+        self.keys = [column.split('.')[-1] for column in columns]
+        self.descending = descending
+
+    # ---------- token ----------
+
+    def encode(self, row):
+        """Token opaco com os valores de ordenação da linha"""
+        payload = {'k': self.name, 'v': [_dump(row[key]) for key in self.keys]}
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode(self, token):
+        """Valores de ordenação guardados no token"""
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            payload = json.loads(raw)
+            values = [_load(value) for value in payload['v']]
+        except Exception:
+            raise InvalidCursorError('Cursor de paginação inválido')
+        if payload.get('k') != self.name or len(values) != len(self.columns):
+            raise InvalidCursorError('Cursor de paginação inválido')
+        return values
+
+    # ---------- SQL ----------
+
+    def where(self, token=None, prefix='AND'):
+        """
+        Condição que pula as linhas já enviadas
+
+        Returns:
+            tuple: (fragmento SQL, parâmetros); ('', []) na primeira página
+        """
+        if not token:
+            return '', []
+        values = self.decode(token)
+        op = '<' if self.descending else '>'
+
+        # (a, b, c) após (x, y, z): a op x OR (a = x AND b op y) OR (a = x AND b = y AND c op z)
+        terms, params = [], []
+        for i, column in enumerate(self.columns):
+            parts = [f'{prev} = %s' for prev in self.columns[:i]] + [f'{column} {op} %s']
+            terms.append('(' + ' AND '.join(parts) + ')')
+            params.extend(values[:i] + [values[i]])
+        return f"{prefix} ({' OR '.join(terms)})", params
+
+    def order_by(self):
+        direction = 'DESC' if self.descending else 'ASC'
+        return 'ORDER BY ' + ', '.join(f'{column} {direction}' for column in self.columns)
+
+    # ---------- resultado ----------
+
+    def page(self, rows, limit):
+        """
+        Corta o resultado buscado com LIMIT limit + 1
+
+        Returns:
+            tuple: (linhas da página, token da próxima página ou None)
+        """
+        if len(rows) <= limit:
+            return list(rows), None
+        rows = list(rows[:limit])
+        return rows, self.encode(rows[-1])
@@ -0,0 +1,87 @@
+# spreadsheet.py - Leitura em streaming de planilhas CSV e XLSX
+# 🎯 Objetivo: Importações grandes sem carregar o arquivo inteiro na memória
+#
+# Cada linha vira um dict {coluna normalizada: valor em texto}; a primeira
+# linha da planilha é o cabeçalho. XLSX usa openpyxl em modo read_only.
+
+import csv
+import io
+
+FORMATOS = ('csv', 'xlsx')
+
+
+def formato_do_arquivo(nome):
+    """'csv' ou 'xlsx' pela extensão do arquivo (None se não suportado)"""
+    extensao = (nome or '').rsplit('.', 1)[-1].lower()
+    return extensao if extensao in FORMATOS else None
+
+
+def _normalizar(coluna):
+    return str(coluna or '').strip().lower()
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def iter_csv(arquivo, encoding='utf-8-sig'):
+    """
+    Linhas de um CSV binário ou texto (delimitador ',' ou ';' detectado)
+
+    Yields:
+        tuple: (número da linha na planilha, dict da linha)
+    """
+    texto = io.TextIOWrapper(arquivo, encoding=encoding, newline='') if 'b' in getattr(arquivo, 'mode', 'b') else arquivo
+    amostra = texto.read(4096)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(_reencadear(amostra, texto), dialeto)
+
+    cabecalho = [_normalizar(c) for c in next(leitor, [])]
+    for numero, valores in enumerate(leitor, start=2):
+        if not any(v.strip() for v in valores):
+            continue
+        yield numero, {coluna: _texto(valor) for coluna, valor in zip(cabecalho, valores)}
+
+
+def _reencadear(amostra, texto):
+    """Devolve a amostra lida pelo Sniffer seguida do restante do arquivo, linha a linha"""
+    restante = texto.readline()
+    yield from io.StringIO(amostra + restante)
+    yield from texto
+
+
+def iter_xlsx(arquivo):
+    """
+    Linhas da primeira aba de um XLSX (openpyxl read_only: memória constante)
+
+    Yields:
+        tuple: (número da linha na planilha, dict da linha)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [_normalizar(c) for c in next(linhas, ())]
+        for numero, valores in enumerate(linhas, start=2):
+            if not any(v not in (None, '') for v in valores):
+                continue
+            yield numero, {coluna: _texto(valor) for coluna, valor in zip(cabecalho, valores)}
+    finally:
+        workbook.close()
+
+
+def iter_registros(arquivo, formato):
+    """Escolhe o leitor pelo formato ('csv' ou 'xlsx')"""
+    if formato == 'csv':
+        return iter_csv(arquivo)
+    if formato == 'xlsx':
+        return iter_xlsx(arquivo)
+    raise ValueError(f'Formato de planilha desconhecido: {formato}')
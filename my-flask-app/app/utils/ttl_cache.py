@@ -0,0 +1,52 @@
+# ttl_cache.py - Cache em memória com expiração por tempo
+# 🎯 Objetivo: Reaproveitar resultados caros por alguns segundos entre requisições
+
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Cache chave -> valor com validade de ``ttl`` segundos
+
+    get_or_set calcula o valor uma única vez por chave expirada, mesmo com
+    várias threads pedindo ao mesmo tempo.
+    """
+
+    def __init__(self, ttl=30.0, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._data = {}  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None or item[0] <= self._clock():
+            return default
+        return item[1]
+
+    def set(self, key, value):
+        self._data[key] = (self._clock() + self.ttl, value)
+
+    def get_or_set(self, key, factory):
+        item = self._data.get(key)
+        if item is not None and item[0] > self._clock():
+            return item[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > self._clock():
+                return item[1]
+            value = factory()
+            self.set(key, value)
+            return value
+
+    def invalidate(self, key=None):
+        """Remove uma chave (ou tudo, se key for None)"""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
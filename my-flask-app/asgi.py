@@ -0,0 +1,29 @@
+"""
+App ASGI (Quart) com as APIs JSON em modo assíncrono.
+
+Tarefas, ponto, dashboard, auditoria, listagem de usuários e FaceID respondem
+nas mesmas URLs do app Flask, mas cada requisição que espera o MySQL só ocupa
+uma corrotina: um processo mantém centenas delas em andamento com um pool de
+DB_ASYNC_POOL_SIZE conexões (aiomysql). Páginas, login e relatórios continuam
+no Main.py; a sessão é o mesmo cookie assinado, então o proxy pode mandar
+/api/* e /usuarios/listar para cá e o resto para o app Flask.
+
+Uso (a partir de my-flask-app/):
+    hypercorn asgi:app --bind 0.0.0.0:5001
+    hypercorn asgi:app --bind 0.0.0.0:5001 --workers 2
+
+Variáveis: as mesmas SECRET_KEY e DB_* do .env, mais DB_ASYNC_POOL_SIZE (padrão 50).
+O FaceID e a auditoria ainda usam o pool síncrono (db_pool), em threads.
+"""
+
+from quart import Quart
+
+from app.models import db_async
+from app.routes.routes_async import api
+from app.utils import config
+
+app = Quart(__name__)
+config.configurar(app)  # a mesma SECRET_KEY do Main.py: vale a sessão do login
+
+db_async.init_app(app)
+app.register_blueprint(api)
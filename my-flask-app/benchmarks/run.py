@@ -0,0 +1,309 @@
+"""
+Benchmark dos endpoints e do matching facial contra um banco SQLite local.
+
+Roda os controllers e models reais (Main.app, sem TESTING) em um banco
+populado com volumes de produção (benchmarks/seed.py) e mede latência
+(p50/p90/p95/p99) e vazão por endpoint. Os números valem para comparar
+versões do código na mesma máquina, não para prever o MySQL de produção.
+
+Uso (a partir de my-flask-app/):
+    python -m benchmarks.run                                   # escala padrão
+    python -m benchmarks.run --escala teste --iteracoes 30
+    python -m benchmarks.run --salvar-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --tolerancia 0.25
+
+Com --baseline, termina com código 1 se o p95 de algum caso piorar mais que a
+tolerância (e mais que --piso-ms, para ignorar ruído em casos muito rápidos).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.models import db_pool, resumos
+from app.models.db_pool import ConnectionPool
+from benchmarks import seed, sqlite_db
+
+Caso = namedtuple('Caso', 'nome executar')
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+# ---------- ambiente ----------
+
+def preparar(escala, diretorio, hoje=None):
+    """Cria e popula o banco e aponta o pool do app para ele"""
+    hoje = hoje or date.today()
+    path = os.path.join(diretorio, 'benchmark.sqlite3')
+    sqlite_db.criar_banco(path)
+
+    inicio = time.perf_counter()
+    contagem = seed.popular(path, escala, hoje)
+    db_pool.set_pool(ConnectionPool(lambda: sqlite_db.conectar(path), pool_size=4, max_overflow=4))
+    resumos.reconciliar(dias=escala.dias_ponto + 1, hoje=hoje)
+    contagem['segundos'] = time.perf_counter() - inicio
+    return contagem
+
+
+def encerrar():
+    from app.models.models import auditoria_sink
+
+    auditoria_sink.flush()
+    db_pool.set_pool(None)
+
+
+def _sessao(client, papel='GOVERNANTE'):
+    with client.session_transaction() as sessao:
+        sessao['user'] = 'Benchmark'
+        sessao['user_role'] = papel
+        sessao['user_email'] = 'benchmark@saneamento.gov.br'
+
+
+# ---------- casos ----------
+
+def casos_http(escala, hoje):
+    from app.controllers.controller import DashboardController
+
+    com_ponto = range(1, escala.usuarios_com_ponto + 1)
+    livres = max(1, escala.usuarios - escala.usuarios_com_ponto)
+
+    def usuario_livre(i):
+        return escala.usuarios_com_ponto + 1 + i % livres
+
+    def listar_usuarios(client, i, rng):
+        return client.get('/usuarios/listar?limit=50')
+
+    def tarefas(client, i, rng):
+        return client.get(f'/api/tarefas?usuario_id={rng.randint(1, escala.usuarios)}')
+
+    def historico(client, i, rng):
+        return client.get(f'/api/ponto/historico?usuario_id={rng.choice(com_ponto)}')
+
+    def dashboard(client, i, rng):
+        DashboardController._cache.invalidate()
+        return client.get('/api/dashboard-data')
+
+    def registrar(client, i, rng):
+        dia = hoje + timedelta(days=1 + i // livres)
+        return client.post('/api/ponto/registrar', json={
+            'usuario_id': usuario_livre(i), 'data': dia.isoformat(), 'hora_entrada': '07:30:00'
+        })
+
+    def sincronizar(client, i, rng):
+        # Dias bem à frente dos usados por registrar: os lotes nunca colidem com eles
+        registros = []
+        for j in range(50):
+            n = i * 50 + j
+            dia = hoje + timedelta(days=5000 + n // livres)
+            registros.append({
+                'chave': f'bench-{n}', 'usuario_id': usuario_livre(n),
+                'data': dia.isoformat(), 'hora_entrada': '07:30'
+            })
+        return client.post('/api/ponto/sincronizar', json={'registros': registros})
+
+    def exportar(client, i, rng):
+        return client.get('/relatorios/exportar?period=month&formato=csv')
+
+    def faceid_check(client, i, rng):
+        return client.get(f'/api/faceid/check/{rng.randint(1, escala.usuarios)}')
+
+    return [
+        Caso('usuarios/listar', listar_usuarios),
+        Caso('api/tarefas', tarefas),
+        Caso('api/ponto/historico', historico),
+        Caso('api/dashboard-data (cache frio)', dashboard),
+        Caso('api/ponto/registrar', registrar),
+        Caso('api/ponto/sincronizar (50)', sincronizar),
+        Caso('relatorios/exportar csv (mês)', exportar),
+        Caso('api/faceid/check', faceid_check),
+    ]
+
+
+def casos_face(escala):
+    """Busca 1:N em galerias sintéticas de 128 dimensões carregadas do banco"""
+    from app.models.models import Usuario
+    from app.utils import face_matching, face_stack
+    from app.utils.face_gallery import FaceGallery
+    from app.utils.face_index import create_index
+
+    galerias = {
+        'flat': FaceGallery(source=Usuario, check_interval=3600),
+        'ivf': FaceGallery(source=Usuario, check_interval=3600,
+                           index_factory=lambda: create_index('ivf', dim=128)),
+    }
+    conhecidos = seed.encodings_sinteticos(escala.rostos, semente=seed.SEMENTE)
+    ids = list(range(1, escala.rostos + 1))
+    normas = face_matching.squared_norms(conhecidos)
+
+    def probe(rng):
+        alvo = conhecidos[rng.randrange(escala.rostos)]
+        return seed.probe_de(alvo, semente=rng.randint(0, 2 ** 31))
+
+    def busca(tipo):
+        def executar(client, i, rng):
+            galerias[tipo].search(probe(rng), k=2)
+        return executar
+
+    casos = [Caso(f'face: galeria {tipo} (k=2)', busca(tipo)) for tipo in galerias]
+
+    try:
+        face_system = face_stack.sistema()
+    except face_stack.FaceStackIndisponivel as e:
+        print(f"⚠️ FaceRecognitionSystem indisponível ({e}): caso match_encoding ignorado")
+    else:
+        def match(client, i, rng):
+            face_system.match_encoding(probe(rng), conhecidos, ids, gallery_norms=normas)
+        casos.append(Caso('face: FaceRecognitionSystem.match_encoding', match))
+
+    for galeria in galerias.values():
+        galeria.ensure_fresh()
+    return casos
+
+
+# ---------- medição ----------
+
+def medir(caso, client, iteracoes, aquecimento=None, semente=0):
+    """
+    Executa o caso e resume as latências
+
+    Returns:
+        dict: {'p50', 'p90', 'p95', 'p99', 'media', 'max' (ms), 'rps', 'n', 'erros'}
+    """
+    rng = random.Random(semente)
+    aquecimento = max(1, iteracoes // 10) if aquecimento is None else aquecimento
+    tempos, erros, primeiro_erro = [], 0, None
+
+    for i in range(aquecimento + iteracoes):
+        inicio = time.perf_counter()
+        resposta = caso.executar(client, i, rng)
+        if resposta is not None:
+            resposta.get_data()
+            resposta.close()
+        decorrido = time.perf_counter() - inicio
+
+        if resposta is not None and resposta.status_code >= 400:
+            erros += 1
+            primeiro_erro = primeiro_erro or f'{resposta.status_code} {resposta.get_data(as_text=True)[:200]}'
+        if i >= aquecimento:
+            tempos.append(decorrido)
+
+    tempos_ms = np.array(tempos) * 1000
+    resultado = {f'p{p}': float(np.percentile(tempos_ms, p)) for p in PERCENTIS}
+    resultado.update({
+        'media': float(tempos_ms.mean()),
+        'max': float(tempos_ms.max()),
+        'rps': len(tempos) / sum(tempos) if sum(tempos) else 0.0,
+        'n': len(tempos),
+        'erros': erros,
+    })
+    if primeiro_erro:
+        resultado['primeiro_erro'] = primeiro_erro
+    return resultado
+
+
+def executar(escala_nome='padrao', iteracoes=200, diretorio=None, filtro=None):
+    """
+    Prepara o banco, roda todos os casos e devolve os resultados
+
+    Returns:
+        dict: {'escala': nome, 'dados': contagem de linhas, 'casos': {nome: medição}}
+    """
+    from Main import app
+
+    escala = seed.ESCALAS[escala_nome]
+    hoje = date.today()
+    with tempfile.TemporaryDirectory(dir=diretorio) as pasta:
+        dados = preparar(escala, pasta, hoje)
+        try:
+            client = app.test_client()
+            _sessao(client)
+            resultados = {}
+            for caso in casos_http(escala, hoje) + casos_face(escala):
+                if filtro and filtro not in caso.nome:
+                    continue
+                resultados[caso.nome] = medir(caso, client, iteracoes)
+        finally:
+            encerrar()
+    return {'escala': escala_nome, 'dados': dados, 'casos': resultados}
+
+
+# ---------- baseline ----------
+
+def comparar(resultados, baseline, tolerancia=0.2, piso_ms=1.0, metrica='p95'):
+    """
+    Casos cujo percentil piorou além da tolerância em relação ao baseline
+
+    Returns:
+        list: (nome, atual ms, baseline ms)
+    """
+    regressoes = []
+    for nome, atual in resultados['casos'].items():
+        base = baseline.get('casos', {}).get(nome)
+        if not base:
+            continue
+        limite = max(base[metrica] * (1 + tolerancia), base[metrica] + piso_ms)
+        if atual[metrica] > limite:
+            regressoes.append((nome, atual[metrica], base[metrica]))
+    return regressoes
+
+
+def _relatar(resultados):
+    dados = resultados['dados']
+    print(f"📦 Escala '{resultados['escala']}': " + ', '.join(
+        f'{tabela}={quantidade}' for tabela, quantidade in dados.items() if tabela != 'segundos'
+    ) + f" (gerado em {dados['segundos']:.1f}s)")
+    print(f"{'caso':<45} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'req/s':>9} {'erros':>6}")
+    for nome, r in resultados['casos'].items():
+        print(f"{nome:<45} {r['p50']:>8.2f} {r['p90']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} "
+              f"{r['rps']:>9.1f} {r['erros']:>6}")
+        if r.get('primeiro_erro'):
+            print(f"   ❌ {r['primeiro_erro']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', default='padrao', choices=sorted(seed.ESCALAS))
+    parser.add_argument('--iteracoes', type=int, default=200, help='medições por caso (após o aquecimento)')
+    parser.add_argument('--caso', help='roda só os casos cujo nome contém este texto')
+    parser.add_argument('--saida', help='grava os resultados completos em JSON')
+    parser.add_argument('--baseline', help='JSON de uma execução anterior para detectar regressões')
+    parser.add_argument('--salvar-baseline', metavar='ARQUIVO', help='grava esta execução como baseline')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='piora relativa aceita no p95 (0.2 = 20%%)')
+    parser.add_argument('--piso-ms', type=float, default=1.0, help='piora absoluta mínima para contar regressão')
+    args = parser.parse_args()
+
+    resultados = executar(args.escala, args.iteracoes, filtro=args.caso)
+    _relatar(resultados)
+
+    for destino in filter(None, [args.saida, args.salvar_baseline]):
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados gravados em {destino}")
+
+    falhou = any(r['erros'] for r in resultados['casos'].values())
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('escala') != resultados['escala']:
+            print(f"⚠️ Baseline gerado na escala '{baseline.get('escala')}', comparação pouco confiável")
+        regressoes = comparar(resultados, baseline, args.tolerancia, args.piso_ms)
+        for nome, atual, base in regressoes:
+            print(f"❌ Regressão em {nome}: p95 {atual:.2f}ms (baseline {base:.2f}ms)")
+        if not regressoes:
+            print("✅ Nenhuma regressão em relação ao baseline")
+        falhou = falhou or bool(regressoes)
+
+    if falhou:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# seed.py - Massa de dados sintética para os benchmarks
+# 🎯 Objetivo: Volumes de produção (milhares de usuários, anos de ponto) gerados em segundos
+#
+# Tudo é determinístico (random.Random(semente)): duas execuções na mesma escala
+# geram o mesmo banco, então os tempos são comparáveis entre versões do código.
+
+import random
+import sqlite3
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.utils import face_codec
+
+Escala = namedtuple('Escala', 'usuarios usuarios_com_ponto dias_ponto tarefas funcionarios_por_tarefa rostos')
+
+ESCALAS = {
+    # Testes automatizados: segundos
+    'teste': Escala(200, 50, 60, 500, 2, 100),
+    # Padrão do benchmark: 10 mil usuários, 2 anos de ponto para as equipes de campo
+    'padrao': Escala(10000, 2000, 730, 100000, 3, 10000),
+    # Todos os usuários com 3 anos de ponto (~7,8 milhões de linhas)
+    'completa': Escala(10000, 10000, 1095, 300000, 3, 10000),
+}
+
+DEPARTAMENTOS = ['Operação', 'Tratamento de Água', 'Esgoto', 'Manutenção', 'Atendimento', 'TI', 'Administrativo']
+CARGOS = ['FUNCIONARIO'] * 8 + ['SUPERVISOR', 'MASTER']
+STATUS_TAREFA = ['PENDENTE', 'ANDAMENTO', 'CONCLUIDA', 'CONCLUIDA']
+
+LOTE = 50000
+SEMENTE = 42
+
+
+def popular(path, escala, hoje=None, semente=SEMENTE):
+    """
+    Preenche o banco SQLite com a escala pedida
+
+    Returns:
+        dict: quantidade de linhas por tabela
+    """
+    hoje = hoje or date.today()
+    rng = random.Random(semente)
+    conn = sqlite3.connect(path)
+    contagem = {}
+
+    contagem['usuario'] = _usuarios(conn, escala, rng, hoje, semente)
+    contagem['ponto'] = _pontos(conn, escala, rng, hoje)
+    contagem['tarefa'], contagem['funcionario_tarefa'] = _tarefas(conn, escala, rng, hoje)
+    conn.execute(
+        "INSERT INTO versao_recurso (nome, versao, atualizado_em) VALUES ('usuario', 1, ?), ('tarefa', 1, ?)",
+        (f'{hoje} 00:00:00', f'{hoje} 00:00:00')
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    # O ANALYZE do SQLite conta as chaves de idempotência NULL como um único valor
+    # repetido e passa a ignorar o índice; o MySQL não estima NULLs assim
+    conn.execute(
+        "UPDATE sqlite_stat1 SET stat = ? WHERE idx = 'uq_ponto_chave_idempotencia'",
+        (f"{contagem['ponto']} 1",)
+    )
+    conn.commit()
+    conn.close()
+    return contagem
+
+
+def _usuarios(conn, escala, rng, hoje, semente):
+    # Os mesmos vetores podem ser regerados com encodings_sinteticos(rostos, semente)
+    vetores = encodings_sinteticos(escala.rostos, semente=semente)
+    linhas = []
+    for i in range(1, escala.usuarios + 1):
+        rosto = face_codec.serialize_encoding(vetores[i - 1]) if i <= escala.rostos else None
+        linhas.append((
+            i, f'Usuário {i:05d}', f'usuario{i}@saneamento.gov.br', 'senha123',
+            'MASTER' if i == 1 else rng.choice(CARGOS), rng.choice(DEPARTAMENTOS), 'ATIVO',
+            rosto, f'{hoje} 00:00:00' if rosto else None,
+        ))
+    conn.executemany("""
+        INSERT INTO usuario (id, nome, email, senha, cargo, departamento, status, rosto, rosto_atualizado_em)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, linhas)
+    conn.commit()
+    return len(linhas)
+
+
+def _pontos(conn, escala, rng, hoje):
+    """Um registro por dia útil para cada usuário das equipes de campo; ~3% de faltas"""
+    dias = [hoje - timedelta(days=d) for d in range(escala.dias_ponto - 1, -1, -1)]
+    dias = [dia.isoformat() for dia in dias if dia.weekday() < 5]
+    total, lote = 0, []
+    for usuario_id in range(1, escala.usuarios_com_ponto + 1):
+        for dia in dias:
+            if rng.random() < 0.03:
+                lote.append((usuario_id, dia, None, None, None, 'FALTA'))
+            else:
+                entrada = 7 * 60 + rng.randint(0, 90)
+                saida = entrada + 8 * 60 + rng.randint(0, 60)
+                lote.append((
+                    usuario_id, dia, _hhmm(entrada), _hhmm(saida), _hhmm(saida - entrada), 'REGISTRADO'
+                ))
+            if len(lote) >= LOTE:
+                total += _inserir_pontos(conn, lote)
+                lote = []
+    total += _inserir_pontos(conn, lote)
+    return total
+
+
+def _inserir_pontos(conn, lote):
+    conn.executemany("""
+        INSERT INTO ponto (usuario_id, data, hora_entrada, hora_saida, total_horas, status)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, lote)
+    conn.commit()
+    return len(lote)
+
+
+def _tarefas(conn, escala, rng, hoje):
+    inicio = datetime.combine(hoje, datetime.min.time()) - timedelta(days=escala.dias_ponto)
+    segundos = escala.dias_ponto * 86400
+    gerentes = list(range(1, max(2, escala.usuarios // 20)))
+    tarefas, vinculos = [], []
+    for tarefa_id in range(1, escala.tarefas + 1):
+        criada = inicio + timedelta(seconds=rng.randint(0, segundos))
+        status = rng.choice(STATUS_TAREFA)
+        concluida = criada + timedelta(hours=rng.randint(1, 240)) if status == 'CONCLUIDA' else None
+        tarefas.append((
+            tarefa_id, f'Tarefa {tarefa_id}', 'Inspeção de rede', status,
+            criada.strftime('%Y-%m-%d %H:%M:%S'),
+            concluida.strftime('%Y-%m-%d %H:%M:%S') if concluida else None,
+            rng.choice(gerentes),
+        ))
+        for funcionario_id in rng.sample(range(1, escala.usuarios + 1), escala.funcionarios_por_tarefa):
+            vinculos.append((tarefa_id, funcionario_id))
+    conn.executemany("""
+        INSERT INTO tarefa (id, titulo, descricao, status, data_criacao, data_conclusao, gerente_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, tarefas)
+    conn.executemany("INSERT INTO funcionario_tarefa (tarefa_id, funcionario_id) VALUES (?, ?)", vinculos)
+    conn.commit()
+    return len(tarefas), len(vinculos)
+
+
+def _hhmm(minutos):
+    return f'{minutos // 60:02d}:{minutos % 60:02d}:00'
+
+
+def encodings_sinteticos(quantidade, dim=128, semente=0):
+    """
+    Encodings parecidos com os do dlib: vetores de norma ~1, distância típica
+    entre pessoas diferentes bem acima da tolerância de 0,6
+    """
+    rng = np.random.default_rng(semente)
+    vetores = rng.normal(0, 1, (quantidade, dim)).astype(np.float32)
+    vetores /= np.linalg.norm(vetores, axis=1, keepdims=True)
+    return vetores
+
+
+def probe_de(encoding, ruido=0.02, semente=0):
+    """Nova 'foto' da mesma pessoa: o encoding com um pouco de ruído"""
+    rng = np.random.default_rng(semente)
+    return (encoding + rng.normal(0, ruido, encoding.shape)).astype(np.float32)
@@ -0,0 +1,322 @@
+# sqlite_db.py - Banco SQLite no lugar do MySQL para benchmarks e testes de integração
+# 🎯 Objetivo: Rodar os controllers e models reais sem um servidor MySQL
+#
+# Imita o que o app usa do mysql-connector:
+# - cursor(dictionary=True), execute/executemany, fetch*, rowcount, lastrowid
+# - tipos devolvidos: DATE -> date, DATETIME -> datetime, TIME -> timedelta
+# - IntegrityError de chave única com errno ER_DUP_ENTRY
+# e traduz o dialeto: %s, NOW(), GET_LOCK, INSERT IGNORE e
+# INSERT ... ON DUPLICATE KEY UPDATE (vira upsert do SQLite).
+# AsyncSQLiteConnection oferece o mesmo banco para o pool de app/models/db_async.py.
+#
+# Não é um MySQL: planos de execução, locks e tempos absolutos são outros.
+# Serve para comparar versões do código entre si, na mesma máquina.
+
+import asyncio
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from mysql.connector import IntegrityError, errorcode
+
+SCHEMA = """
+CREATE TABLE usuario (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    senha VARCHAR(255) NOT NULL,
+    cargo VARCHAR(20) NOT NULL,
+    status VARCHAR(20) DEFAULT 'ATIVO',
+    departamento VARCHAR(100),
+    ultimo_acesso DATETIME,
+    rosto BLOB,
+    rosto_atualizado_em DATETIME,
+    criado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_usuario_rosto_atualizado ON usuario (rosto_atualizado_em);
+CREATE INDEX idx_usuario_nome ON usuario (nome, id);
+
+CREATE TABLE tarefa (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo VARCHAR(100) NOT NULL,
+    descricao TEXT,
+    status VARCHAR(20) DEFAULT 'PENDENTE',
+    data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+    data_conclusao DATETIME,
+    gerente_id INTEGER REFERENCES usuario(id),
+    criado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_tarefa_data_criacao ON tarefa (data_criacao, id);
+
+CREATE TABLE funcionario_tarefa (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tarefa_id INTEGER NOT NULL REFERENCES tarefa(id),
+    funcionario_id INTEGER NOT NULL REFERENCES usuario(id)
+);
+CREATE INDEX idx_ft_funcionario_tarefa ON funcionario_tarefa (funcionario_id, tarefa_id);
+
+CREATE TABLE ponto (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL REFERENCES usuario(id),
+    data DATE NOT NULL,
+    hora_entrada TIME,
+    hora_saida TIME,
+    total_horas TIME,
+    status VARCHAR(20) DEFAULT 'REGISTRADO',
+    criado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+    chave_idempotencia VARCHAR(64)
+);
+CREATE UNIQUE INDEX uq_ponto_usuario_data ON ponto (usuario_id, data);
+CREATE UNIQUE INDEX uq_ponto_chave_idempotencia ON ponto (chave_idempotencia);
+
+CREATE TABLE auditoria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    acao VARCHAR(100) NOT NULL,
+    data_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+    ip VARCHAR(45),
+    status VARCHAR(20) DEFAULT 'SUCESSO'
+);
+CREATE INDEX idx_auditoria_data_hora ON auditoria (data_hora);
+CREATE INDEX idx_auditoria_usuario_data ON auditoria (usuario_id, data_hora);
+
+CREATE TABLE resumo_ponto_dia (
+    dia DATE NOT NULL,
+    departamento VARCHAR(100) NOT NULL DEFAULT '',
+    registros INTEGER NOT NULL DEFAULT 0,
+    faltas INTEGER NOT NULL DEFAULT 0,
+    justificados INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, departamento)
+);
+
+CREATE TABLE resumo_tarefa_dia (
+    dia DATE NOT NULL,
+    departamento VARCHAR(100) NOT NULL DEFAULT '',
+    criadas INTEGER NOT NULL DEFAULT 0,
+    concluidas INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, departamento)
+);
+
+CREATE TABLE versao_recurso (
+    nome VARCHAR(100) PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0,
+    atualizado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+# ---------- tipos ----------
+
+def _hora(valor):
+    segundos = int(valor.total_seconds())
+    return f'{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}'
+
+
+def _ler_hora(bruto):
+    partes = [int(p) for p in bruto.decode().split(':')]
+    return timedelta(hours=partes[0], minutes=partes[1], seconds=partes[2] if len(partes) > 2 else 0)
+
+
+def _ler_data_hora(bruto):
+    return datetime.fromisoformat(bruto.decode())
+
+
+def _ler_data(bruto):
+    texto = bruto.decode()
+    return date.fromisoformat(texto[:10])
+
+
+sqlite3.register_adapter(datetime, lambda v: v.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_adapter(timedelta, _hora)
+sqlite3.register_converter('DATE', _ler_data)
+sqlite3.register_converter('DATETIME', _ler_data_hora)
+sqlite3.register_converter('TIME', _ler_hora)
+
+
+# ---------- dialeto ----------
+
+_UPSERT = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_INSERT_SELECT = re.compile(r'^(\s*INSERT\s+INTO\s+\w+\s*\([^)]*\))\s*(SELECT\b.*)$', re.IGNORECASE | re.DOTALL)
+_ALIAS_FINAL = re.compile(r'\)\s+(?:AS\s+)?(\w+)\s*$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def traduzir(sql):
+    """SQL do MySQL usado pelo app -> SQL do SQLite"""
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\bINSERT\s+IGNORE\b', 'INSERT OR IGNORE', sql, flags=re.IGNORECASE)
+
+    partes = _UPSERT.split(sql, maxsplit=1)
+    if len(partes) == 2:
+        insercao, atualizacao = partes
+        insert_select = _INSERT_SELECT.match(insercao)
+        if insert_select:
+            cabecalho, consulta = insert_select.groups()
+            # Valores da tabela derivada (ex.: novos.registros) = linha que seria inserida
+            alias = _ALIAS_FINAL.search(consulta.strip())
+            if alias:
+                atualizacao = re.sub(rf'\b{alias.group(1)}\.', 'excluded.', atualizacao)
+            # WHERE true: desfaz a ambiguidade do parser do SQLite entre JOIN ... ON e ON CONFLICT
+            insercao = f'{cabecalho} SELECT * FROM ({consulta}) WHERE true'
+        atualizacao = re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', atualizacao, flags=re.IGNORECASE)
+        sql = f'{insercao} ON CONFLICT DO UPDATE SET {atualizacao}'
+    return sql
+
+
+def _agora():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+# ---------- conexão ----------
+
+class SQLiteCursor:
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self.dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(traduzir(sql), tuple(params or ()))
+        except sqlite3.IntegrityError as e:
+            raise _erro_integridade(e) from e
+
+    def executemany(self, sql, linhas):
+        try:
+            self._cursor.executemany(traduzir(sql), [tuple(linha) for linha in linhas])
+        except sqlite3.IntegrityError as e:
+            raise _erro_integridade(e) from e
+
+    def _linha(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {coluna[0]: valor for coluna, valor in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._linha(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._linha(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._linha(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._linha(row)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    def close(self):
+        self._cursor.close()
+
+
+def _erro_integridade(e):
+    errno = errorcode.ER_DUP_ENTRY if 'UNIQUE' in str(e) else errorcode.ER_NO_REFERENCED_ROW_2
+    return IntegrityError(msg=str(e), errno=errno)
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(
+            path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False, timeout=30
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.create_function('NOW', 0, _agora)
+        self._conn.create_function('GET_LOCK', 2, lambda nome, espera: 1)
+        self._conn.create_function('RELEASE_LOCK', 1, lambda nome: 1)
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._conn, dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def ping(self, reconnect=False):
+        self._conn.execute('SELECT 1')
+
+    def close(self):
+        self._conn.close()
+
+
+class AsyncSQLiteConnection:
+    """
+    SQLiteConnection com a interface das conexões de app/models/db_async.py
+
+    Cada operação roda em uma thread (asyncio.to_thread), como a espera de rede
+    de um driver assíncrono: o event loop segue atendendo outras requisições.
+    """
+
+    def __init__(self, path):
+        self._conn = SQLiteConnection(path)
+
+    def _rodar(self, metodo, sql, params, linhas=False):
+        cursor = self._conn.cursor(dictionary=True)
+        try:
+            getattr(cursor, metodo)(sql, params)
+            return cursor.fetchall() if linhas else cursor.rowcount
+        finally:
+            cursor.close()
+
+    async def fetchall(self, sql, params=()):
+        return await asyncio.to_thread(self._rodar, 'execute', sql, params, True)
+
+    async def execute(self, sql, params=()):
+        return await asyncio.to_thread(self._rodar, 'execute', sql, params)
+
+    async def executemany(self, sql, linhas):
+        return await asyncio.to_thread(self._rodar, 'executemany', sql, linhas)
+
+    async def commit(self):
+        await asyncio.to_thread(self._conn.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self._conn.rollback)
+
+    async def ping(self):
+        await asyncio.to_thread(self._conn.ping)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def close(self):
+        self._conn.close()
+
+
+def criar_banco(path):
+    """Cria o schema (tabelas base + o que as migrações adicionam) em um arquivo novo"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+
+
+def conectar(path):
+    return SQLiteConnection(path)
+
+
+async def conectar_async(path):
+    return AsyncSQLiteConnection(path)
@@ -0,0 +1 @@
+# conftest.py - Raiz dos testes: coloca my-flask-app/ no sys.path (Main, app.*, database.*)
@@ -0,0 +1,49 @@
+"""
+Importa usuários em lote de uma planilha CSV ou XLSX.
+
+A primeira linha é o cabeçalho: nome, email, senha, cargo, departamento e,
+opcionalmente, status (vazio = ATIVO). As regras são as mesmas do cadastro
+pela tela; linhas com erro são listadas no final e não impedem as demais.
+
+Uso (a partir de my-flask-app/):
+    python -m database.importar_usuarios usuarios.xlsx
+    python -m database.importar_usuarios usuarios.csv --lote 1000
+    python -m database.importar_usuarios usuarios.csv --simular
+"""
+
+import argparse
+import sys
+import time
+
+from app.controllers.controller import UsuarioController
+from app.utils import spreadsheet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('arquivo', help='planilha .csv ou .xlsx')
+    parser.add_argument('--lote', type=int, default=500, help='linhas por transação')
+    parser.add_argument('--simular', action='store_true', help='só valida, sem gravar')
+    args = parser.parse_args()
+
+    formato = spreadsheet.formato_do_arquivo(args.arquivo)
+    if not formato:
+        print("❌ Formato não suportado. Use CSV ou XLSX.")
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    with open(args.arquivo, 'rb') as arquivo:
+        relatorio = UsuarioController.importar_usuarios(
+            spreadsheet.iter_registros(arquivo, formato), args.lote, args.simular
+        )
+    duracao = time.perf_counter() - inicio
+
+    for erro in relatorio['erros']:
+        print(f"   ❌ linha {erro['linha']} ({erro['email'] or 'sem email'}): {erro['message']}")
+    print(f"✅ {relatorio['message']} ({duracao:.1f}s)")
+    if relatorio['erros']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
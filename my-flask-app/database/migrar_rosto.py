@@ -0,0 +1,80 @@
+"""
+Migra usuario.rosto do formato legado (pickle + base64) para o formato binário.
+
+Uso (a partir de my-flask-app/):
+    python -m database.migrar_rosto            # converte
+    python -m database.migrar_rosto --dry-run  # apenas conta
+"""
+
+import argparse
+
+from app.models.db_pool import get_pool
+from app.utils import face_codec
+
+
+def migrar(batch_size=500, dry_run=False):
+    """
+    Converte os encodings em lotes ordenados por id.
+
+    Returns:
+        dict: {'convertidos': int, 'ja_binarios': int, 'invalidos': list[int]}
+    """
+    conn = get_pool().connect()
+    resumo = {'convertidos': 0, 'ja_binarios': 0, 'invalidos': []}
+    ultimo_id = 0
+
+    try:
+        while True:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT id, rosto FROM usuario "
+                "WHERE id > %s AND rosto IS NOT NULL AND rosto != '' "
+                "ORDER BY id LIMIT %s",
+                (ultimo_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+            ultimo_id = rows[-1]['id']
+
+            updates = []
+            for row in rows:
+                if face_codec.is_binary(row['rosto']):
+                    resumo['ja_binarios'] += 1
+                    continue
+                try:
+                    encoding = face_codec.deserialize_legacy(row['rosto'])
+                    updates.append((face_codec.serialize_encoding(encoding), row['id']))
+                except Exception as e:
+                    print(f"⚠️ Usuário {row['id']}: encoding ilegível ({e})")
+                    resumo['invalidos'].append(row['id'])
+
+            if updates and not dry_run:
+                cursor = conn.cursor()
+                cursor.executemany("UPDATE usuario SET rosto = %s WHERE id = %s", updates)
+                conn.commit()
+                cursor.close()
+            resumo['convertidos'] += len(updates)
+            print(f"📦 Lote até id {ultimo_id}: {len(updates)} convertidos")
+    finally:
+        conn.close()
+
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help='não grava, apenas relata')
+    args = parser.parse_args()
+
+    resumo = migrar(args.batch_size, args.dry_run)
+    acao = 'seriam convertidos' if args.dry_run else 'convertidos'
+    print(f"✅ {resumo['convertidos']} encodings {acao}, {resumo['ja_binarios']} já no formato binário")
+    if resumo['invalidos']:
+        print(f"❌ Encodings ilegíveis (ids): {resumo['invalidos']}")
+
+
+if __name__ == "__main__":
+    main()
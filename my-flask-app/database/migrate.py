@@ -0,0 +1,233 @@
+"""
+Migrações versionadas do schema (pasta database/migrations).
+
+Cada arquivo NNNN_nome.py define:
+    DESCRICAO  - texto curto
+    upgrade(cursor)  - aplica a migração (DDL do MySQL não é transacional:
+                       cada passo deve poder ser reexecutado com segurança)
+    CHECKS     - (opcional) lista de Check: consultas do app que devem usar
+                 os índices criados, verificadas com EXPLAIN
+
+As versões aplicadas ficam na tabela schema_migrations.
+
+Uso (a partir de my-flask-app/):
+    python -m database.migrate            # aplica as pendentes e verifica os índices
+    python -m database.migrate status     # lista aplicadas e pendentes
+    python -m database.migrate check      # só roda os EXPLAIN de todas as migrações
+"""
+
+import argparse
+import importlib.util
+import os
+import re
+import sys
+from collections import namedtuple
+
+from app.models.db_pool import get_pool
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+LOCK_NAME = 'schema_migrations'
+
+Migracao = namedtuple('Migracao', 'versao nome modulo')
+
+# tabela: nome (ou alias) da tabela como aparece na coluna `table` do EXPLAIN
+Check = namedtuple('Check', 'descricao sql params tabela indice')
+
+
+# ---------- helpers para as migrações ----------
+
+def coluna_existe(cursor, tabela, coluna):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (tabela, coluna)
+    )
+    return _primeiro_valor(cursor.fetchone()) > 0
+
+
+def indice_existe(cursor, tabela, indice):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (tabela, indice)
+    )
+    return _primeiro_valor(cursor.fetchone()) > 0
+
+
+def criar_indice(cursor, tabela, indice, colunas, unico=False):
+    """CREATE INDEX apenas se ainda não existir"""
+    if indice_existe(cursor, tabela, indice):
+        print(f"   ↪️ {tabela}.{indice} já existe")
+        return
+    tipo = 'UNIQUE INDEX' if unico else 'INDEX'
+    cursor.execute(f"CREATE {tipo} {indice} ON {tabela} ({', '.join(colunas)})")
+    print(f"   ➕ {tabela}.{indice} ({', '.join(colunas)})")
+
+
+def _primeiro_valor(row):
+    if isinstance(row, dict):
+        return next(iter(row.values()))
+    return row[0]
+
+
+# ---------- descoberta ----------
+
+def descobrir(pasta=MIGRATIONS_DIR):
+    """Migrações da pasta, em ordem de versão"""
+    migracoes = []
+    for arquivo in sorted(os.listdir(pasta)):
+        match = re.match(r'^(\d+)_(\w+)\.py$', arquivo)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(f'migracao_{match.group(1)}', os.path.join(pasta, arquivo))
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        migracoes.append(Migracao(int(match.group(1)), match.group(2), modulo))
+
+    versoes = [m.versao for m in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise ValueError(f"Versões de migração duplicadas em {pasta}")
+    return sorted(migracoes, key=lambda m: m.versao)
+
+
+def pendentes(migracoes, aplicadas, alvo=None):
+    return [m for m in migracoes if m.versao not in aplicadas and (alvo is None or m.versao <= alvo)]
+
+
+# ---------- banco ----------
+
+def garantir_tabela(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INT PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL,
+            aplicada_em DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def versoes_aplicadas(cursor):
+    cursor.execute("SELECT versao FROM schema_migrations")
+    return {_primeiro_valor(row) for row in cursor.fetchall()}
+
+
+def verificar(cursor, checks):
+    """
+    Roda EXPLAIN nas consultas e confere o índice escolhido
+
+    Returns:
+        list: (Check, situação, índice usado) com situação 'ok', 'aviso'
+              (índice disponível mas não escolhido, comum em tabelas pequenas)
+              ou 'falha' (índice nem aparece em possible_keys)
+    """
+    resultados = []
+    for check in checks:
+        cursor.execute(f"EXPLAIN {check.sql}", check.params)
+        linhas = [row for row in cursor.fetchall() if row.get('table') == check.tabela]
+        usado = linhas[0].get('key') if linhas else None
+        possiveis = (linhas[0].get('possible_keys') or '') if linhas else ''
+        if usado == check.indice:
+            situacao = 'ok'
+        elif check.indice in possiveis.split(','):
+            situacao = 'aviso'
+        else:
+            situacao = 'falha'
+        resultados.append((check, situacao, usado))
+    return resultados
+
+
+def _relatar(resultados):
+    icones = {'ok': '✅', 'aviso': '⚠️', 'falha': '❌'}
+    for check, situacao, usado in resultados:
+        print(f"   {icones[situacao]} {check.descricao}: {check.tabela} usa {usado or 'nenhum índice'}"
+              f" (esperado {check.indice})")
+    return all(situacao != 'falha' for _, situacao, _ in resultados)
+
+
+def migrar(alvo=None, checar=True):
+    """
+    Aplica as migrações pendentes (até ``alvo``, se informado)
+
+    Returns:
+        bool: False se alguma verificação de índice falhou
+    """
+    conn = get_pool().connect()
+    cursor = conn.cursor(dictionary=True)
+    ok = True
+    try:
+        # Impede dois deploys migrando ao mesmo tempo
+        cursor.execute("SELECT GET_LOCK(%s, 30) AS obtido", (LOCK_NAME,))
+        if not cursor.fetchone()['obtido']:
+            raise RuntimeError('Outra migração está em andamento')
+
+        garantir_tabela(cursor)
+        migracoes = pendentes(descobrir(), versoes_aplicadas(cursor), alvo)
+        if not migracoes:
+            print("✅ Schema atualizado, nenhuma migração pendente")
+
+        for migracao in migracoes:
+            print(f"📦 {migracao.versao:04d} {migracao.nome}: {migracao.modulo.DESCRICAO}")
+            migracao.modulo.upgrade(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (versao, nome) VALUES (%s, %s)",
+                (migracao.versao, migracao.nome)
+            )
+            conn.commit()
+
+            checks = getattr(migracao.modulo, 'CHECKS', [])
+            if checar and checks:
+                ok = _relatar(verificar(cursor, checks)) and ok
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+    return ok
+
+
+def checar_todas():
+    """Roda os EXPLAIN de todas as migrações aplicadas"""
+    conn = get_pool().connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        garantir_tabela(cursor)
+        aplicadas = versoes_aplicadas(cursor)
+        checks = [c for m in descobrir() if m.versao in aplicadas for c in getattr(m.modulo, 'CHECKS', [])]
+        return _relatar(verificar(cursor, checks))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def status():
+    conn = get_pool().connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        garantir_tabela(cursor)
+        aplicadas = versoes_aplicadas(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+    for migracao in descobrir():
+        marca = '✅' if migracao.versao in aplicadas else '⏳'
+        print(f"{marca} {migracao.versao:04d} {migracao.nome}: {migracao.modulo.DESCRICAO}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('comando', nargs='?', default='up', choices=['up', 'status', 'check'])
+    parser.add_argument('--alvo', type=int, help='aplica somente até esta versão')
+    parser.add_argument('--sem-check', action='store_true', help='não roda os EXPLAIN após migrar')
+    args = parser.parse_args()
+
+    if args.comando == 'status':
+        status()
+        return
+    ok = checar_todas() if args.comando == 'check' else migrar(args.alvo, not args.sem_check)
+    if not ok:
+        print("❌ Consultas sem o índice esperado")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
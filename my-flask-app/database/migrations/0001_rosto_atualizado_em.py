@@ -0,0 +1,22 @@
+"""Coluna de versão do FaceID usada pela sincronização da galeria em memória"""
+
+from database.migrate import Check, coluna_existe, criar_indice
+
+DESCRICAO = 'usuario.rosto_atualizado_em + índice para a sincronização da galeria FaceID'
+
+
+def upgrade(cursor):
+    if not coluna_existe(cursor, 'usuario', 'rosto_atualizado_em'):
+        cursor.execute("ALTER TABLE usuario ADD COLUMN rosto_atualizado_em DATETIME AFTER rosto")
+        # Rostos já cadastrados entram na galeria com a data da migração
+        cursor.execute("UPDATE usuario SET rosto_atualizado_em = NOW() WHERE rosto IS NOT NULL")
+    criar_indice(cursor, 'usuario', 'idx_usuario_rosto_atualizado', ['rosto_atualizado_em'])
+
+
+CHECKS = [
+    Check(
+        'galeria FaceID: alterações desde a última versão',
+        "SELECT id, rosto FROM usuario WHERE rosto_atualizado_em >= %s",
+        ('2025-01-01 00:00:00',), 'usuario', 'idx_usuario_rosto_atualizado'
+    ),
+]
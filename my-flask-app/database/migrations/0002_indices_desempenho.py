@@ -0,0 +1,65 @@
+"""Índices compostos das consultas frequentes e unicidade do ponto diário"""
+
+from database.migrate import Check, criar_indice, indice_existe
+
+DESCRICAO = 'índices de ponto, tarefa, funcionario_tarefa, auditoria e usuario; ponto único por usuário/dia'
+
+
+def upgrade(cursor):
+    # Duplicatas antigas (corrida do SELECT-then-INSERT) impedem a chave única:
+    # mantém o primeiro registro de cada usuário/dia
+    if not indice_existe(cursor, 'ponto', 'uq_ponto_usuario_data'):
+        cursor.execute("""
+            DELETE p1 FROM ponto p1
+            JOIN ponto p2 ON p1.usuario_id = p2.usuario_id AND p1.data = p2.data AND p1.id > p2.id
+        """)
+        if cursor.rowcount:
+            print(f"   🧹 {cursor.rowcount} pontos duplicados removidos")
+    criar_indice(cursor, 'ponto', 'uq_ponto_usuario_data', ['usuario_id', 'data'], unico=True)
+
+    criar_indice(cursor, 'tarefa', 'idx_tarefa_data_criacao', ['data_criacao', 'id'])
+    criar_indice(cursor, 'funcionario_tarefa', 'idx_ft_funcionario_tarefa', ['funcionario_id', 'tarefa_id'])
+    criar_indice(cursor, 'auditoria', 'idx_auditoria_data_hora', ['data_hora'])
+    criar_indice(cursor, 'auditoria', 'idx_auditoria_usuario_data', ['usuario_id', 'data_hora'])
+    criar_indice(cursor, 'usuario', 'idx_usuario_nome', ['nome', 'id'])
+
+
+CHECKS = [
+    Check(
+        'histórico de ponto (keyset data DESC, id DESC)',
+        "SELECT id, data, hora_entrada, hora_saida, total_horas, status FROM ponto "
+        "WHERE usuario_id=%s ORDER BY data DESC, id DESC LIMIT %s",
+        (1, 51), 'ponto', 'uq_ponto_usuario_data'
+    ),
+    Check(
+        'registro de ponto (duplicidade por usuário/dia)',
+        "SELECT id FROM ponto WHERE usuario_id=%s AND data=%s",
+        (1, '2025-01-01'), 'ponto', 'uq_ponto_usuario_data'
+    ),
+    Check(
+        'tarefas do funcionário',
+        "SELECT t.id FROM tarefa t JOIN funcionario_tarefa ft ON t.id = ft.tarefa_id "
+        "WHERE ft.funcionario_id = %s ORDER BY t.data_criacao DESC, t.id DESC LIMIT %s",
+        (1, 51), 'ft', 'idx_ft_funcionario_tarefa'
+    ),
+    Check(
+        'relatório de tarefas por período',
+        "SELECT t.id FROM tarefa t WHERE t.data_criacao >= %s AND t.data_criacao <= %s",
+        ('2025-01-01', '2025-01-07'), 't', 'idx_tarefa_data_criacao'
+    ),
+    Check(
+        'auditoria por período',
+        "SELECT id FROM auditoria WHERE data_hora >= %s AND data_hora <= %s",
+        ('2025-01-01', '2025-01-07'), 'auditoria', 'idx_auditoria_data_hora'
+    ),
+    Check(
+        'auditoria por usuário',
+        "SELECT id FROM auditoria WHERE usuario_id = %s AND data_hora >= %s",
+        (1, '2025-01-01'), 'auditoria', 'idx_auditoria_usuario_data'
+    ),
+    Check(
+        'listagem de usuários (keyset nome, id)',
+        "SELECT id, nome FROM usuario WHERE nome > %s ORDER BY nome, id LIMIT %s",
+        ('A', 51), 'usuario', 'idx_usuario_nome'
+    ),
+]
@@ -0,0 +1,71 @@
+"""Tabelas de resumo por dia/departamento lidas pelo dashboard"""
+
+from database.migrate import Check
+
+DESCRICAO = 'resumo_ponto_dia e resumo_tarefa_dia (rollups do dashboard) + carga inicial'
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_ponto_dia (
+            dia DATE NOT NULL,
+            departamento VARCHAR(100) NOT NULL DEFAULT '',
+            registros INT NOT NULL DEFAULT 0,
+            faltas INT NOT NULL DEFAULT 0,
+            justificados INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, departamento)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_tarefa_dia (
+            dia DATE NOT NULL,
+            departamento VARCHAR(100) NOT NULL DEFAULT '',
+            criadas INT NOT NULL DEFAULT 0,
+            concluidas INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, departamento)
+        )
+    """)
+
+    # Carga inicial com todo o histórico (depois, só a janela recente é reconciliada).
+    # SQL congelado aqui: reexecutar a migração não depende do repositório atual
+    cursor.execute("DELETE FROM resumo_ponto_dia")
+    cursor.execute("""
+        INSERT INTO resumo_ponto_dia (dia, departamento, registros, faltas, justificados)
+        SELECT p.data, COALESCE(u.departamento, ''),
+               SUM(p.status = 'REGISTRADO'), SUM(p.status = 'FALTA'), SUM(p.status = 'JUSTIFICADO')
+        FROM ponto p
+        JOIN usuario u ON u.id = p.usuario_id
+        GROUP BY p.data, COALESCE(u.departamento, '')
+    """)
+    linhas_ponto = cursor.rowcount
+
+    cursor.execute("DELETE FROM resumo_tarefa_dia")
+    cursor.execute("""
+        INSERT INTO resumo_tarefa_dia (dia, departamento, criadas, concluidas)
+        SELECT dia, departamento, SUM(criadas), SUM(concluidas)
+        FROM (
+            SELECT DATE(t.data_criacao) AS dia, COALESCE(u.departamento, '') AS departamento,
+                   1 AS criadas, 0 AS concluidas
+            FROM tarefa t LEFT JOIN usuario u ON u.id = t.gerente_id
+            UNION ALL
+            SELECT DATE(t.data_conclusao), COALESCE(u.departamento, ''), 0, 1
+            FROM tarefa t LEFT JOIN usuario u ON u.id = t.gerente_id
+            WHERE t.status = 'CONCLUIDA' AND t.data_conclusao IS NOT NULL
+        ) eventos
+        GROUP BY dia, departamento
+    """)
+    print(f"   📊 Resumos carregados: {linhas_ponto} linhas de ponto, {cursor.rowcount} de tarefa")
+
+CHECKS = [
+    Check(
+        'dashboard: ponto do dia',
+        "SELECT departamento, registros, faltas FROM resumo_ponto_dia WHERE dia = %s",
+        ('2025-01-01',), 'resumo_ponto_dia', 'PRIMARY'
+    ),
+    Check(
+        'dashboard: tarefas da janela de eficiência',
+        "SELECT departamento, SUM(criadas), SUM(concluidas) FROM resumo_tarefa_dia "
+        "WHERE dia >= %s AND dia <= %s GROUP BY departamento",
+        ('2025-01-01', '2025-01-30'), 'resumo_tarefa_dia', 'PRIMARY'
+    ),
+]
@@ -0,0 +1,24 @@
+"""Versão por recurso para os validadores de cache HTTP (ETag/Last-Modified)"""
+
+from database.migrate import Check
+
+DESCRICAO = 'tabela versao_recurso (incrementada nos writes de usuario, tarefa e ponto)'
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS versao_recurso (
+            nome VARCHAR(100) PRIMARY KEY,
+            versao BIGINT NOT NULL DEFAULT 0,
+            atualizado_em DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+CHECKS = [
+    Check(
+        'validador de cache por recurso',
+        "SELECT nome, versao, atualizado_em FROM versao_recurso WHERE nome IN (%s, %s)",
+        ('usuario', 'tarefa'), 'versao_recurso', 'PRIMARY'
+    ),
+]
@@ -0,0 +1,21 @@
+"""Chave de idempotência do ponto enviada pelos dispositivos na sincronização em lote"""
+
+from database.migrate import Check, coluna_existe, criar_indice
+
+DESCRICAO = 'ponto.chave_idempotencia (única) para a sincronização offline'
+
+
+def upgrade(cursor):
+    if not coluna_existe(cursor, 'ponto', 'chave_idempotencia'):
+        # NULL nos registros antigos e nos feitos pela tela: a chave única ignora NULLs
+        cursor.execute("ALTER TABLE ponto ADD COLUMN chave_idempotencia VARCHAR(64) NULL")
+    criar_indice(cursor, 'ponto', 'uq_ponto_chave_idempotencia', ['chave_idempotencia'], unico=True)
+
+
+CHECKS = [
+    Check(
+        'sincronização de ponto: chaves já aplicadas',
+        "SELECT chave_idempotencia FROM ponto WHERE chave_idempotencia IN (%s, %s)",
+        ('a', 'b'), 'ponto', 'uq_ponto_chave_idempotencia'
+    ),
+]
@@ -0,0 +1,45 @@
+"""
+Recalcula os resumos do dashboard a partir de ponto e tarefa.
+
+Corrige a janela recente para alterações feitas sem passar pelos incrementos
+(conclusão de tarefas, exclusões, SQL manual). Agendar no cron, por exemplo
+a cada 15 minutos:
+    */15 * * * * cd my-flask-app && python -m database.reconciliar_resumos
+
+Uso (a partir de my-flask-app/):
+    python -m database.reconciliar_resumos            # últimos 35 dias
+    python -m database.reconciliar_resumos --dias 400
+"""
+
+import argparse
+
+from app.models.db_pool import get_pool
+from app.models.resumos import reconciliar
+
+LOCK_NAME = 'reconciliar_resumos'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dias', type=int, default=35, help='tamanho da janela recalculada')
+    args = parser.parse_args()
+
+    # Evita duas reconciliações simultâneas (cron em mais de um servidor)
+    conn = get_pool().connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+        if not cursor.fetchone()[0]:
+            print("⏭️ Reconciliação já em andamento em outro processo")
+            return
+        resumo = reconciliar(args.dias)
+        print(f"✅ Resumos desde {resumo['inicio']}: {resumo['ponto']} linhas de ponto, {resumo['tarefa']} de tarefa")
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# gunicorn.conf.py - Servidor de produção do app Flask (gunicorn -c gunicorn.conf.py wsgi:app)
+# 🎯 Objetivo: Workers pré-fork dimensionados pela CPU do pod, app pré-carregado e reciclagem periódica
+#
+# - preload_app: wsgi.py carrega o app uma vez no master; gc.freeze() antes do fork evita
+#   que o coletor de lixo suje essas páginas nos workers. A pilha facial (OpenCV/dlib)
+#   fica no servidor de fork do pool facial de cada worker (FACEID_START_METHOD)
+# - workers = CPUs disponíveis (cota do cgroup, mínimo 2), threads por worker para esconder a
+#   latência do MySQL; pool de conexões e pool facial dimensionados a partir disso
+# - max_requests + jitter: cada worker é reciclado depois de N requisições (memória
+#   fragmentada não se acumula) sem que todos reiniciem juntos
+# - Reload gracioso: kill -HUP <master> sobe workers novos e encerra os antigos após
+#   terminarem as requisições (graceful_timeout). Com preload_app o código do app não
+#   é relido no HUP: deploy de código novo = reiniciar o master (ou o pod)
+#
+# - WORKER_ROLE: 'api' sobe workers leves, sem a pilha facial; 'face' sobe workers
+#   dedicados ao FaceID (o proxy manda /api/faceid/* para eles), prontos em /api/ready
+#   só depois de aquecer; 'completo' (padrão) faz as duas coisas
+#
+# Tudo pode ser sobrescrito pelo ambiente: WEB_CONCURRENCY, GUNICORN_THREADS,
+# GUNICORN_BIND, GUNICORN_MAX_REQUESTS, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT.
+
+import gc
+import os
+
+from app.utils.config import cpus_disponiveis, papel_worker
+
+os.environ.setdefault('APP_ENV', 'producao')
+
+_cpus = cpus_disponiveis()
+_papel = papel_worker()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+# Mínimo 2: enquanto um worker é reciclado (max_requests) o outro continua atendendo
+workers = int(os.getenv('WEB_CONCURRENCY') or 0) or max(2, _cpus)
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+preload_app = True
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Heartbeat dos workers em memória (disco do container pode ser lento ou somente leitura)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+
+# Padrões quando o .env não define: uma conexão por thread no pool de cada worker e o
+# pool facial dividindo as CPUs entre os workers (não um processo por núcleo em cada um)
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+os.environ.setdefault('DB_POOL_MAX_OVERFLOW', str(max(2, threads // 2)))
+os.environ.setdefault('FACEID_WORKERS', str(max(1, _cpus // workers)))
+# Processos faciais nascem de um servidor de fork por worker, que importa a pilha facial
+# uma vez: compartilham os modelos sem forkar o worker, que já tem threads rodando
+# (o pool é recriado depois de um BrokenProcessPool, em plena atividade)
+os.environ.setdefault('FACEID_START_METHOD', 'forkserver')
+
+
+def when_ready(server):
+    # App já pré-carregado, nenhum worker criado ainda
+    import wsgi
+
+    gc.freeze()
+    server.log.info(
+        f"{workers} workers x {threads} threads ({_cpus} CPUs disponíveis), papel {_papel}, "
+        f"pilha facial {'pré-carregada' if wsgi.face_precarregado else 'não pré-carregada'}"
+    )
+
+
+def post_fork(server, worker):
+    # Sobe o pool facial (servidor de fork + processos) e começa o aquecimento; a
+    # prontidão acompanha. Pool de conexões e fila de auditoria detectam o fork
+    # sozinhos (pid)
+    from app.utils import face_stack
+    from app.utils.face_executor import face_executor
+
+    if face_stack.habilitado():
+        face_executor.warm_up(wait=False)
+
+
+def worker_exit(server, worker):
+    from app.models.models import auditoria_sink
+    from app.utils.face_executor import face_executor
+
+    auditoria_sink.shutdown()
+    face_executor.shutdown(wait=False)
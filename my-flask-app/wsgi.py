@@ -0,0 +1,41 @@
+"""
+Entrada WSGI de produção do app Flask (gunicorn).
+
+Com preload_app (gunicorn.conf.py) este módulo é importado uma vez no master:
+o app e as bibliotecas pesadas ficam carregados antes do fork, e os workers
+compartilham essas páginas de memória (copy-on-write) em vez de cada um carregar
+a sua cópia. A pilha facial (OpenCV, dlib e os arquivos de modelo) só é
+carregada aqui com FACEID_START_METHOD=fork; no padrão (forkserver) ela vive no
+servidor de fork do pool facial. Com WORKER_ROLE=api ela nunca é carregada (ver
+app/utils/face_stack.py).
+
+Uso (a partir de my-flask-app/):
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Nada aqui abre conexão com o banco: pool, fila de auditoria e pool facial são
+criados em cada worker, no primeiro uso.
+"""
+
+from Main import app
+from app.utils import face_stack
+from app.utils.face_executor import face_executor
+
+
+def precarregar():
+    """Importa no master o que é pesado e só de leitura"""
+    import numpy  # noqa: F401
+    import xlsxwriter  # noqa: F401
+
+    # Só vale com fork: com forkserver a pilha é importada pelo servidor de fork,
+    # por spawn cada processo facial carrega a sua, e no papel 'api' ela nunca é usada
+    if not face_stack.habilitado() or face_executor.start_method != 'fork':
+        return False
+    try:
+        face_stack.aquecer()  # OpenCV, dlib e modelos, já exercitados
+    except face_stack.FaceStackIndisponivel as e:
+        print(f"⚠️ Pilha facial não pré-carregada ({e}): o FaceID ficará indisponível")
+        return False
+    return True
+
+
+face_precarregado = precarregar()